@@ -15,7 +15,9 @@ export const quizAPI = {
   generate: (params) => api.get(`/quiz/generate`, { params }),
   getById: (id) => api.get(`/quiz/${id}`),
   submit: (data) => api.post(`/quiz/submit`, data),
-  getModelPaper: () => api.get(`/quiz/model-paper`),
+  getModelPaper: (blueprint) => (blueprint
+    ? api.post(`/quiz/model-paper`, { blueprint })
+    : api.get(`/quiz/model-paper`)),
   getHistory: () => api.get(`/quiz/history`),
   getTopics: (params) => api.get(`/quiz/topics`, { params })
 };
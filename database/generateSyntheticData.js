@@ -10,6 +10,7 @@ const SyllabusTopic = require('../server/models/SyllabusTopic');
 const Question = require('../server/models/Question');
 const PerformanceData = require('../server/models/PerformanceData');
 const bcrypt = require('bcryptjs');
+const syllabusGraph = require('../ml-services/syllabus_graph.json');
 
 // Grade 10 Topics (Sinhala)
 const grade10Topics = [
@@ -99,6 +100,10 @@ async function generateSyllabusTopics() {
   console.log('📚 Generating Syllabus Topics...');
   
   const topics = [];
+  // Prerequisite edges shared with the projection simulation
+  const prerequisites = Object.fromEntries(
+    syllabusGraph.map(t => [t.topicId, t.prerequisites])
+  );
   
   // Grade 10 topics
   for (const topic of grade10Topics) {
@@ -122,7 +127,8 @@ async function generateSyllabusTopics() {
       topicName: topic.name,
       topicNameSinhala: topic.sinhala,
       grade: 10,
-      subTopics
+      subTopics,
+      prerequisites: prerequisites[topic.id] || []
     });
   }
   
@@ -147,7 +153,8 @@ async function generateSyllabusTopics() {
       topicName: topic.name,
       topicNameSinhala: topic.sinhala,
       grade: 11,
-      subTopics
+      subTopics,
+      prerequisites: prerequisites[topic.id] || []
     });
   }
   
@@ -9,6 +9,11 @@ import pickle
 import os
 from datetime import datetime
 
+from question_store import QuestionStore, DEFAULT_QUESTION_BANK_PATH
+from cat_engine import (CATSession, CATSessionStore, prior_mean_from_score,
+                        DEFAULT_TARGET_SE, DEFAULT_MAX_ITEMS)
+from paper_assembly import parse_blueprint, assemble_paper
+
 app = Flask(__name__)
 CORS(app)
 
@@ -16,62 +21,14 @@ CORS(app)
 stress_model = None
 stress_model_path = 'models/stress_model.pkl'
 
-# Sample question bank for quiz generation
-SAMPLE_QUESTIONS = {
-    'algebra': [
-        {
-            'question': 'If $x + 5 = 12$, what is the value of $x$?',
-            'options': ['7', '17', '2', '10'],
-            'correctAnswer': 0,
-            'difficulty': 'easy',
-            'topic': 'algebra',
-            'syllabusUnit': 'Basic Algebra',
-            'marks': 1
-        },
-        {
-            'question': 'Solve for $x$: $2x^2 - 8x + 6 = 0$',
-            'options': ['$x = 1$ or $x = 3$', '$x = 2$ or $x = 4$', '$x = -1$ or $x = -3$', 'No solution'],
-            'correctAnswer': 0,
-            'difficulty': 'medium',
-            'topic': 'algebra',
-            'syllabusUnit': 'Quadratic Equations',
-            'marks': 2
-        }
-    ],
-    'geometry': [
-        {
-            'question': 'What is the area of a circle with radius 7 cm? (Use $\\pi = \\frac{22}{7}$)',
-            'options': ['154 cm²', '44 cm²', '22 cm²', '308 cm²'],
-            'correctAnswer': 0,
-            'difficulty': 'easy',
-            'topic': 'geometry',
-            'syllabusUnit': 'Circles',
-            'marks': 1
-        }
-    ],
-    'trigonometry': [
-        {
-            'question': 'If $\\sin \\theta = \\frac{1}{2}$, what is the value of $\\cos \\theta$?',
-            'options': ['$\\frac{\\sqrt{3}}{2}$', '$\\frac{1}{2}$', '$\\frac{\\sqrt{2}}{2}$', '1'],
-            'correctAnswer': 0,
-            'difficulty': 'medium',
-            'topic': 'trigonometry',
-            'syllabusUnit': 'Trigonometric Ratios',
-            'marks': 1
-        }
-    ],
-    'statistics': [
-        {
-            'question': 'What is the mean of the numbers 5, 7, 9, 11, 13?',
-            'options': ['8', '9', '10', '11'],
-            'correctAnswer': 1,
-            'difficulty': 'easy',
-            'topic': 'statistics',
-            'syllabusUnit': 'Central Tendency',
-            'marks': 1
-        }
-    ]
-}
+# Question bank, loaded once at startup (read-only, shared by all requests)
+question_store = None
+
+# Questions drawn per topic for an adaptive quiz
+QUESTIONS_PER_TOPIC = 2
+
+# Adaptive test (CAT) sessions in progress
+cat_sessions = CATSessionStore()
 
 def load_or_train_stress_model():
     """Load existing stress model or train a new one"""
@@ -117,13 +74,33 @@ def load_or_train_stress_model():
     
     print(f"Trained new stress model. Accuracy: {stress_model.score(X_test, y_test):.2f}")
 
+def load_question_store():
+    """Load the question bank (QUESTION_BANK_PATH, e.g. a mongoexport of the questions collection)"""
+    global question_store
+    
+    path = os.environ.get('QUESTION_BANK_PATH', DEFAULT_QUESTION_BANK_PATH)
+    question_store = QuestionStore.load(path)
+    print(f"Loaded question bank: {len(question_store)} questions from {path}")
+    missing_ids = len(question_store) - len(question_store.rows_by_id)
+    if missing_ids:
+        print(f"⚠ {missing_ids} questions have no questionId: they get positional ids "
+              f"and cannot be excluded from model papers")
+
 def initialize_models():
     """Initialize all ML models"""
     load_or_train_stress_model()
+    load_question_store()
 
 # Initialize on startup
 initialize_models()
 
+def parse_seed(data):
+    """Optional 'seed' of a request (a non-negative integer)"""
+    seed = data.get('seed')
+    if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool) or seed < 0):
+        raise ValueError("'seed' must be a non-negative integer")
+    return seed
+
 @app.route('/health', methods=['GET'])
 def health():
     return jsonify({'status': 'OK', 'message': 'ML Service is running'})
@@ -142,6 +119,9 @@ def generate_quiz():
         # Determine difficulty based on user performance
         avg_score = user_performance.get('averageScore', 50)
         
+        if quiz_type == 'cat':
+            return start_cat_session(data, avg_score)
+        
         if avg_score >= 80:
             target_difficulty = 'hard'
         elif avg_score >= 60:
@@ -149,33 +129,33 @@ def generate_quiz():
         else:
             target_difficulty = 'easy'
         
-        # Select questions based on topic and difficulty
-        selected_questions = []
-        topics_to_use = [topic] if topic else ['algebra', 'geometry', 'trigonometry', 'statistics']
+        # Select questions based on topic and difficulty (without replacement)
+        try:
+            rng = np.random.default_rng(parse_seed(data))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        selected_rows = []
+        topics_to_use = [topic] if topic else question_store.topics
         
         for topic_name in topics_to_use:
-            if topic_name in SAMPLE_QUESTIONS:
-                topic_questions = [q for q in SAMPLE_QUESTIONS[topic_name] 
-                                 if q['difficulty'] == target_difficulty or difficulty == 'mixed']
-                if not topic_questions:
-                    # Fallback to any difficulty
-                    topic_questions = SAMPLE_QUESTIONS[topic_name]
-                
-                selected_questions.extend(topic_questions[:2])  # Take 2 per topic
+            topic_rows = question_store.select(
+                topic=topic_name,
+                difficulty=None if difficulty == 'mixed' else target_difficulty
+            )
+            if len(topic_rows) == 0:
+                # Fallback to any difficulty
+                topic_rows = question_store.select(topic=topic_name)
+            
+            selected_rows.extend(question_store.sample(topic_rows, QUESTIONS_PER_TOPIC, rng))
         
         # Limit total questions
         num_questions = 10 if quiz_type == 'adaptive' else 25
-        selected_questions = selected_questions[:num_questions]
         
-        # Add IRT parameters (Item Response Theory)
-        for i, q in enumerate(selected_questions):
-            q['questionId'] = f'q_{i+1}'
-            q['irtParameters'] = {
-                'discrimination': np.random.uniform(0.5, 2.0),
-                'difficulty': np.random.uniform(-2, 2),
-                'guessing': 0.25 if len(q['options']) == 4 else 0.5
-            }
-            q['explanation'] = f"Explanation for question {i+1}"
+        # Per-request copies with IRT parameters (Item Response Theory)
+        selected_questions = question_store.materialize(
+            selected_rows[:num_questions], id_prefix='q_',
+            explanation_prefix='Explanation for question'
+        )
         
         return jsonify({
             'success': True,
@@ -191,6 +171,90 @@ def generate_quiz():
         print(f"Error generating quiz: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def cat_question(session):
+    """Next question of an adaptive test, or None once it has finished"""
+    row = session.next_item()
+    if row is None:
+        return None
+    return question_store.materialize(
+        [row], id_prefix='cat_q_', explanation_prefix='Explanation for question',
+        start=len(session.positions) + 1
+    )[0]
+
+def start_cat_session(data, avg_score):
+    """
+    Start an adaptive test: items are picked one at a time by maximum
+    Fisher information at the student's current ability estimate
+    """
+    topic = data.get('topic')
+    try:
+        session = CATSession(
+            question_store,
+            eligible_rows=question_store.select(topic=topic) if topic else None,
+            model=data.get('irtModel', '3PL'),
+            prior_mean=prior_mean_from_score(avg_score),
+            target_se=float(data.get('targetStandardError', DEFAULT_TARGET_SE)),
+            max_items=int(data.get('maxQuestions', DEFAULT_MAX_ITEMS))
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if session.num_items == 0:
+        return jsonify({'success': False, 'error': f"No questions for topic '{topic}'"}), 404
+    
+    question = cat_question(session)
+    if question is None:
+        return jsonify({'success': False,
+                        'error': 'The adaptive test ended before its first question'}), 400
+    cat_sessions.add(session)
+    return jsonify({
+        'success': True,
+        'questions': [question],
+        'catSession': session.summary(),
+        'timeLimit': session.max_items * 2  # 2 minutes per question
+    })
+
+@app.route('/cat/answer', methods=['POST'])
+def cat_answer():
+    """Score the current adaptive test question and return the next one"""
+    try:
+        data = request.json
+        session = cat_sessions.get(data.get('sessionId'))
+        if session is None:
+            return jsonify({'success': False, 'error': 'CAT session not found'}), 404
+        
+        with session.lock:
+            if session.pending is None:
+                return jsonify({'success': False, 'error': 'No question awaiting an answer',
+                                'catSession': session.summary()}), 409
+            
+            if 'isCorrect' in data:
+                correct = bool(data['isCorrect'])
+            else:
+                question = dict(question_store.documents[session.bank_row(session.pending)])
+                correct = data.get('answer') == question.get('correctAnswer')
+            session.record(correct)
+            question = cat_question(session)
+            
+            return jsonify({
+                'success': True,
+                'correct': correct,
+                'questions': [question] if question else [],
+                'catSession': session.summary()
+            })
+    
+    except Exception as e:
+        print(f"Error scoring CAT answer: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/cat/<session_id>', methods=['GET'])
+def cat_status(session_id):
+    """Ability estimate and progress of an adaptive test"""
+    session = cat_sessions.get(session_id)
+    if session is None:
+        return jsonify({'success': False, 'error': 'CAT session not found'}), 404
+    with session.lock:
+        return jsonify({'success': True, 'catSession': session.summary()})
+
 @app.route('/generate-model-paper', methods=['POST'])
 def generate_model_paper():
     """Generate full model paper (exam simulation)"""
@@ -199,27 +263,24 @@ def generate_model_paper():
         user_id = data.get('userId')
         user_performance = data.get('userPerformance', {})
         
-        # Model paper should have questions from all topics
-        all_questions = []
-        for topic, questions in SAMPLE_QUESTIONS.items():
-            all_questions.extend(questions)
-        
-        # Select 25 questions (full exam)
-        selected_questions = all_questions[:25]
+        # Model paper assembled to the exam blueprint (topic quotas, marks per unit,
+        # difficulty mix, recently seen questions excluded), kept in bank (topic) order
+        try:
+            blueprint = parse_blueprint(data.get('blueprint'))
+            rng = np.random.default_rng(parse_seed(data))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        rows, blueprint_report = assemble_paper(question_store, blueprint, rng)
         
-        # Add question IDs and IRT parameters
-        for i, q in enumerate(selected_questions):
-            q['questionId'] = f'mp_q_{i+1}'
-            q['irtParameters'] = {
-                'discrimination': np.random.uniform(0.5, 2.0),
-                'difficulty': np.random.uniform(-2, 2),
-                'guessing': 0.25
-            }
-            q['explanation'] = f"Model paper question {i+1}"
+        # Per-request copies with question IDs and IRT parameters
+        selected_questions = question_store.materialize(
+            rows, id_prefix='mp_q_', explanation_prefix='Model paper question'
+        )
         
         return jsonify({
             'success': True,
             'questions': selected_questions,
+            'blueprintReport': blueprint_report,
             'timeLimit': 180  # 3 hours
         })
     
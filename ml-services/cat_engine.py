@@ -0,0 +1,248 @@
+"""
+Computerized Adaptive Testing (CAT) Engine
+Picks each next item by maximum Fisher information under a 2PL/3PL IRT model
+"""
+
+import uuid
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+from question_store import QuestionStore
+
+IRT_MODELS = ('2PL', '3PL')
+
+# Logistic scaling constant (1.702 approximates the normal ogive)
+IRT_SCALING = 1.702
+
+# Quadrature grid of the ability posterior
+ABILITY_GRID = np.linspace(-4.0, 4.0, 161)
+
+# Spread of the ability prior (the standard error before any answer)
+DEFAULT_PRIOR_SD = 1.0
+
+# Stopping rule: standard error reached, or the item limit
+DEFAULT_TARGET_SE = 0.3
+DEFAULT_MAX_ITEMS = 30
+
+# Sessions kept in memory; the least recently used is dropped beyond this
+MAX_CAT_SESSIONS = 10000
+
+# Item parameter sets kept for reuse (least recently used dropped beyond this);
+# (store, rows, model) -> ItemParameters
+MAX_ITEM_PARAMETER_SETS = 64
+_item_parameters = OrderedDict()
+_item_parameters_lock = threading.Lock()
+
+
+def response_probability(theta, a, b, c) -> np.ndarray:
+    """P(correct | theta) under the 3PL model (2PL when c = 0); broadcasts"""
+    return c + (1.0 - c) / (1.0 + np.exp(-IRT_SCALING * a * (theta - b)))
+
+
+class ItemParameters:
+    """
+    IRT parameters of a set of bank items, laid out for information sweeps
+
+    float32 columns with the constant factors precomputed: one sweep over
+    50k items is a handful of in-place array operations (~0.2 ms).
+    Shared read-only by every session over the same items.
+    """
+
+    def __init__(self, store: QuestionStore, rows: Optional[np.ndarray], model: str):
+        select = slice(None) if rows is None else rows
+        a = store.discrimination[select].astype(np.float32)
+        self.b = store.irt_difficulty[select].astype(np.float32)
+        self.c = (store.guessing[select] if model == '3PL' else np.zeros(len(a))).astype(np.float32)
+        self.scaled_discrimination = np.float32(IRT_SCALING) * a
+        self.information_scale = self.scaled_discrimination ** 2 * (1 - self.c)
+        for column in (self.b, self.c, self.scaled_discrimination, self.information_scale):
+            column.setflags(write=False)
+
+    def __len__(self) -> int:
+        return len(self.b)
+
+    @classmethod
+    def for_rows(cls, store: QuestionStore, rows: Optional[np.ndarray],
+                 model: str) -> 'ItemParameters':
+        """
+        Parameters of the given rows
+
+        Cached by identity for the whole bank and select() results (which never
+        change), up to MAX_ITEM_PARAMETER_SETS sets; empty row sets are not cached.
+        """
+        if rows is not None and len(rows) == 0:
+            return cls(store, rows, model)
+        key = (id(store), None if rows is None else id(rows), model)
+        with _item_parameters_lock:
+            cached = _item_parameters.get(key)
+            if cached is not None:
+                _item_parameters.move_to_end(key)
+                return cached[2]
+        parameters = cls(store, rows, model)
+        with _item_parameters_lock:
+            # The cache keeps the store and rows alive, so their ids stay unique
+            _item_parameters[key] = (store, rows, parameters)
+            while len(_item_parameters) > MAX_ITEM_PARAMETER_SETS:
+                _item_parameters.popitem(last=False)
+        return parameters
+
+    def information(self, theta: float) -> np.ndarray:
+        """
+        Fisher information of every item at ability theta
+
+        I = (D a)^2 * (Q / P) * ((P - c) / (1 - c))^2 which, with
+        z = exp(-D a (theta - b)) and P* = 1 / (1 + z), is
+        (D a)^2 (1 - c) z P*^3 / P; for 2PL (c = 0) it reduces to (D a)^2 P Q.
+        """
+        z = np.subtract(np.float32(theta), self.b)
+        z *= self.scaled_discrimination
+        np.negative(z, out=z)
+        np.exp(z, out=z)
+        p_star = z + 1
+        np.reciprocal(p_star, out=p_star)
+        p = 1 - self.c
+        p *= p_star
+        p += self.c
+        information = p_star * p_star
+        information *= p_star
+        information *= z
+        information *= self.information_scale
+        information /= p
+        return information
+
+
+def prior_mean_from_score(average_score: float) -> float:
+    """Starting ability from a student's average score (50% -> 0, 0% / 100% -> -2 / +2)"""
+    return float(np.clip((average_score - 50.0) / 25.0, -2.0, 2.0))
+
+
+class CATSession:
+    """
+    One adaptive test: ability posterior, administered items and responses
+
+    The ability estimate is the posterior mean (EAP) over ABILITY_GRID with a
+    normal prior, updated after every answer; its standard deviation is the
+    standard error. Each next item maximizes Fisher information at the
+    current estimate, computed over all eligible items at once.
+    """
+
+    def __init__(self, store: QuestionStore, eligible_rows: Optional[np.ndarray] = None,
+                 model: str = '3PL', prior_mean: float = 0.0,
+                 prior_sd: float = DEFAULT_PRIOR_SD,
+                 target_se: float = DEFAULT_TARGET_SE, max_items: int = DEFAULT_MAX_ITEMS):
+        """
+        Args:
+            store: Question bank with IRT parameters
+            eligible_rows: Bank rows the test may use (default: the whole bank)
+            model: '2PL' (no guessing) or '3PL'
+            prior_mean: Starting ability estimate
+            prior_sd: Spread of the ability prior
+            target_se: Stop once the standard error is at most this
+            max_items: Stop after this many items
+
+        Raises:
+            ValueError: On an unknown model, max_items < 1, or a target_se
+                outside (0, prior_sd), which would end the test before its
+                first item
+        """
+        if model not in IRT_MODELS:
+            raise ValueError(f"Unknown IRT model '{model}'")
+        if max_items < 1:
+            raise ValueError("The test needs at least one item (max_items >= 1)")
+        if not 0 < target_se < prior_sd:
+            raise ValueError(f"The target standard error must be between 0 and {prior_sd}")
+        self.session_id = uuid.uuid4().hex
+        self.store = store
+        self.model = model
+        self.target_se = target_se
+        self.max_items = max_items
+
+        self.rows = eligible_rows
+        self.items = ItemParameters.for_rows(store, eligible_rows, model)
+        self.num_items = len(self.items)
+
+        self.log_posterior = -0.5 * ((ABILITY_GRID - prior_mean) / prior_sd) ** 2
+        self.positions = []
+        self.responses = []
+        self.pending = None
+        self.ability, self.standard_error = self.estimate()
+        self.lock = threading.Lock()
+
+    def estimate(self):
+        """EAP ability estimate and its standard error"""
+        weights = np.exp(self.log_posterior - self.log_posterior.max())
+        weights /= weights.sum()
+        ability = float(weights @ ABILITY_GRID)
+        return ability, float(np.sqrt(weights @ (ABILITY_GRID - ability) ** 2))
+
+    @property
+    def finished(self) -> bool:
+        return (self.standard_error <= self.target_se or len(self.positions) >= self.max_items
+                or len(self.positions) >= self.num_items)
+
+    def bank_row(self, position: int) -> int:
+        return int(position if self.rows is None else self.rows[position])
+
+    def next_item(self) -> Optional[int]:
+        """
+        Bank row of the most informative unadministered item at the current
+        ability estimate (None once the test is finished)
+        """
+        if self.pending is not None:
+            return self.bank_row(self.pending)
+        if self.finished:
+            return None
+        information = self.items.information(self.ability)
+        information[self.positions] = -np.inf
+        self.pending = int(np.argmax(information))
+        return self.bank_row(self.pending)
+
+    def record(self, correct: bool):
+        """Score the pending item and update the ability posterior"""
+        if self.pending is None:
+            raise ValueError("No item is awaiting an answer")
+        row = self.bank_row(self.pending)
+        p = response_probability(ABILITY_GRID, self.store.discrimination[row],
+                                 self.store.irt_difficulty[row],
+                                 self.store.guessing[row] if self.model == '3PL' else 0.0)
+        self.log_posterior += np.log(p if correct else 1.0 - p)
+        self.positions.append(self.pending)
+        self.responses.append(bool(correct))
+        self.pending = None
+        self.ability, self.standard_error = self.estimate()
+
+    def summary(self) -> Dict:
+        return {
+            'sessionId': self.session_id,
+            'model': self.model,
+            'ability': self.ability,
+            'standardError': self.standard_error,
+            'itemsAdministered': len(self.positions),
+            'correctAnswers': sum(self.responses),
+            'finished': self.finished
+        }
+
+
+class CATSessionStore:
+    """Active CAT sessions by id, bounded to MAX_CAT_SESSIONS (least recently used dropped)"""
+
+    def __init__(self, max_sessions: int = MAX_CAT_SESSIONS):
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+
+    def add(self, session: CATSession):
+        with self.lock:
+            self.sessions[session.session_id] = session
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+
+    def get(self, session_id: str) -> Optional[CATSession]:
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is not None:
+                self.sessions.move_to_end(session_id)
+            return session
@@ -16,6 +16,16 @@ from typing import List, Dict, Tuple, Optional
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
 warnings.filterwarnings('ignore', category=UserWarning)
 
+# Riemann (trapezoid) steps of integrated gradients; 32 keeps the
+# completeness error around 1e-3 at interactive latency
+IG_STEPS = 32
+
+# Upper bound of requested steps: every step is one full sequence in the batch
+MAX_IG_STEPS = 256
+
+# Components of one interaction in the model's concatenated input
+INTERACTION_COMPONENTS = ['question', 'topic', 'correctness', 'time', 'attempts']
+
 class DKTModel:
     """
     Deep Knowledge Tracing Model using LSTM/GRU
@@ -48,9 +58,11 @@ class DKTModel:
         self.topic_to_id = {}
         self.id_to_topic = {}
         self.scaler_params = {}
+        self._ig_gradients = None
         
     def build_model(self):
         """Build the DKT neural network architecture"""
+        self._ig_gradients = None
         
         # Input layers
         question_input = tf.keras.layers.Input(shape=(None,), name='question_input')
@@ -254,7 +266,19 @@ class DKTModel:
         if self.model is None:
             raise ValueError("Model not loaded. Call load_model() first.")
         
-        # Prepare sequence
+        # Predict
+        predictions = self.model.predict(self.encode_history(student_history), verbose=0)
+        
+        # Return last timestep (current knowledge state)
+        return predictions[0, -1, :]
+    
+    def encode_history(self, student_history: List[Dict]) -> List[np.ndarray]:
+        """
+        Model inputs for one student's history (a batch of one sequence)
+        
+        Returns:
+            [questions, topics, correctness, time, attempts]
+        """
         max_length = len(student_history)
         questions = np.zeros((1, max_length), dtype=np.int32)
         topics = np.zeros((1, max_length), dtype=np.int32)
@@ -269,14 +293,104 @@ class DKTModel:
             time_taken[0, i, 0] = interaction.get('time_taken', 0)
             attempts[0, i, 0] = interaction.get('attempts', 1)
         
-        # Predict
-        predictions = self.model.predict(
-            [questions, topics, correctness, time_taken, attempts],
-            verbose=0
+        return [questions, topics, correctness, time_taken, attempts]
+    
+    def _mastery_gradients(self):
+        """
+        Compiled gradient of one skill's final mastery w.r.t. the RNN input
+        
+        Runs the layers after the input concatenation (RNN stack and output)
+        on a batch of already embedded sequences, so all interpolation steps
+        of integrated gradients share one forward/backward pass.
+        """
+        if self._ig_gradients is None:
+            if not isinstance(self.model, tf.keras.Model):
+                raise ValueError("Integrated gradients need a Keras DKT model")
+            rnn_layers = [layer for layer in self.model.layers
+                          if isinstance(layer, tf.keras.layers.RNN)]
+            output_layer = self.model.get_layer('mastery_output')
+            
+            @tf.function(reduce_retracing=True)
+            def gradients(combined, mask, skill):
+                with tf.GradientTape() as tape:
+                    tape.watch(combined)
+                    hidden = combined
+                    for layer in rnn_layers:
+                        hidden = layer(hidden, mask=mask, training=False)
+                    mastery = output_layer(hidden)[:, -1, skill]
+                return mastery, tape.gradient(mastery, combined)
+            
+            self._ig_gradients = gradients
+        return self._ig_gradients
+    
+    def integrated_gradients(self, student_history: List[Dict], skill: int,
+                             steps: int = IG_STEPS) -> Dict:
+        """
+        Attribute a skill's current mastery to the interactions of the history
+        
+        Integrated gradients in the model's input space (question and topic
+        embeddings concatenated with correctness, time and attempts), from a
+        baseline where every interaction is all zeros to the actual history.
+        
+        Args:
+            student_history: Past interactions, oldest first
+            skill: Knowledge-vector index of the explained mastery
+            steps: Interpolation steps, evaluated as one batch (1..MAX_IG_STEPS)
+        
+        Returns:
+            Dictionary with per-interaction attributions (and per component),
+            the mastery, the baseline mastery and the completeness error
+        """
+        if self.model is None:
+            raise ValueError("Model not loaded. Call load_model() first.")
+        if not 1 <= steps <= MAX_IG_STEPS:
+            raise ValueError(f"steps must be between 1 and {MAX_IG_STEPS}")
+        if not student_history:
+            raise ValueError("Integrated gradients need a non-empty history")
+        
+        questions, topics, correctness, time_taken, attempts = self.encode_history(student_history)
+        question_layer = self.model.get_layer('question_embedding')
+        topic_layer = self.model.get_layer('topic_embedding')
+        embedding_dim = question_layer.output_dim
+        
+        # Same mask the Concatenate layer derives from the embeddings
+        mask = np.ones(questions.shape, dtype=bool)
+        for layer, ids in ((question_layer, questions), (topic_layer, topics)):
+            if getattr(layer, 'mask_zero', False):
+                mask &= ids != 0
+        
+        combined = np.concatenate([
+            np.asarray(question_layer(questions)),
+            np.asarray(topic_layer(topics)),
+            correctness, time_taken, attempts
+        ], axis=-1)[0]
+        
+        alphas = np.linspace(0.0, 1.0, steps + 1, dtype=np.float32)
+        path = alphas[:, None, None] * combined[None]
+        mastery, gradients = self._mastery_gradients()(
+            tf.constant(path), tf.constant(np.repeat(mask, steps + 1, axis=0)),
+            tf.constant(skill, dtype=tf.int32)
         )
+        mastery, gradients = mastery.numpy(), gradients.numpy()
         
-        # Return last timestep (current knowledge state)
-        return predictions[0, -1, :]
+        # Trapezoid rule over the path, times the input difference
+        average_gradients = ((gradients[:-1] + gradients[1:]) / 2).mean(axis=0)
+        contributions = combined * average_gradients
+        bounds = np.cumsum([0, embedding_dim, embedding_dim, 1, 1, 1])
+        components = np.stack([contributions[:, bounds[i]:bounds[i + 1]].sum(axis=1)
+                               for i in range(len(INTERACTION_COMPONENTS))], axis=1)
+        attributions = components.sum(axis=1)
+        
+        return {
+            'skill': skill,
+            'mastery': float(mastery[-1]),
+            'baseline_mastery': float(mastery[0]),
+            'attributions': attributions,
+            'components': components,
+            'component_names': INTERACTION_COMPONENTS,
+            'convergence_delta': float(attributions.sum() - (mastery[-1] - mastery[0])),
+            'steps': steps
+        }
     
     def recommend_next_action(self, knowledge_vector: np.ndarray, 
                              unattempted_questions: List[Dict]) -> Dict:
@@ -371,6 +485,7 @@ class DKTModel:
     
     def load_model(self, load_path: str):
         """Load model and metadata with version compatibility handling"""
+        self._ig_gradients = None
         # Try loading .keras format first, then fallback to .h5, then SavedModel
         model_file = None
         savedmodel_dir = None
@@ -675,7 +790,95 @@ def explain_recommendation():
         predicted_success_rate = data.get('predicted_success_rate', 0.5)
         
         explanation = xai_service.explain_recommendation(
-            student, question, knowledge_vector, predicted_success_rate
+            student, question, knowledge_vector, predicted_success_rate,
+            method=data.get('method')
+        )
+        
+        return jsonify({
+            'success': True,
+            **explanation
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/explain_recommendations', methods=['POST'])
+def explain_recommendations():
+    """API endpoint for XAI explanations of several candidate questions at once"""
+    try:
+        from xai_service import xai_service
+        
+        data = request.json
+        student = data.get('student', {})
+        questions = data.get('questions', [])
+        knowledge_vector = np.array(data.get('knowledge_vector', []))
+        top_k = data.get('top_k', 10)
+        
+        explanations = xai_service.explain_recommendations(
+            student, questions, knowledge_vector, top_k=top_k,
+            method=data.get('method')
+        )
+        
+        return jsonify({
+            'success': True,
+            'explanations': explanations
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/explain_counterfactual', methods=['POST'])
+def explain_counterfactual():
+    """API endpoint for the minimal changes that would change a recommendation"""
+    try:
+        from xai_service import xai_service
+        
+        data = request.json
+        explanation = xai_service.explain_counterfactual(
+            data.get('student', {}),
+            data.get('question', {}),
+            np.array(data.get('knowledge_vector', [])),
+            data.get('predicted_success_rate')
+        )
+        
+        return jsonify({
+            'success': True,
+            **explanation
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/explanation_cache', methods=['GET'])
+def explanation_cache():
+    """Hit metrics of the XAI explanation cache"""
+    from xai_service import xai_service
+    
+    if xai_service.cache is None:
+        return jsonify({'success': True, 'enabled': False})
+    return jsonify({'success': True, 'enabled': True, **xai_service.cache.stats()})
+
+@app.route('/explain_mastery', methods=['POST'])
+def explain_mastery():
+    """API endpoint for integrated-gradients attribution of a topic's mastery"""
+    global dkt_model
+    
+    if dkt_model is None:
+        return jsonify({'error': 'Model not loaded'}), 500
+    
+    try:
+        from xai_service import xai_service
+        
+        data = request.json
+        student_history = data.get('student_history', [])
+        try:
+            topic_id = int(data.get('topic_id'))
+            # Each step adds a full sequence to the gradient batch
+            steps = min(max(int(data.get('steps', IG_STEPS)), 1), MAX_IG_STEPS)
+        except (TypeError, ValueError, OverflowError):
+            return jsonify({'error': "'topic_id' and 'steps' must be integers"}), 400
+        
+        explanation = xai_service.explain_mastery(
+            dkt_model, student_history, topic_id,
+            topic_name=data.get('topic_name'),
+            steps=steps
         )
         
         return jsonify({
@@ -688,9 +891,12 @@ def explain_recommendation():
 @app.route('/health', methods=['GET'])
 def health():
     """Health check"""
+    from xai_service import backend_status
+    
     return jsonify({
         'status': 'OK',
-        'model_loaded': dkt_model is not None
+        'model_loaded': dkt_model is not None,
+        'xai_backends': backend_status()
     })
 
 @app.route('/diagnose', methods=['GET'])
@@ -781,6 +987,14 @@ if __name__ == '__main__':
         print("   You can load it manually via POST /load_model")
         print("   Service will still start but predictions will fail until model is loaded.")
     
+    # Import SHAP/LIME in the background so an explicit 'shap'/'lime' request
+    # does not wait for the import (requests without a method always use the
+    # simplified path). With debug=True this block also runs in the reloader
+    # parent, which serves no requests; only the serving child warms up.
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        import xai_service
+        xai_service.warmup()
+    
     print("\n" + "="*50)
     print("[*] Starting DKT Service on port 5002")
     print("="*50 + "\n")
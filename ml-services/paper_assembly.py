@@ -0,0 +1,297 @@
+"""
+Blueprint-Constrained Model Paper Assembly
+Greedy selection plus tabu-search repair over classes of interchangeable questions
+"""
+
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from question_store import QuestionStore, DIFFICULTY_LEVELS
+
+# Accepted blueprint fields and their types
+BLUEPRINT_FIELDS = {
+    'totalQuestions': int,
+    'totalMarks': (int, float),
+    'topicQuotas': dict,            # topic -> number of questions
+    'unitMarks': dict,              # syllabusUnit -> marks
+    'difficultyDistribution': dict,  # difficulty -> share of the questions
+    'excludeQuestionIds': list      # e.g. the student's recently seen questions
+}
+
+# Blueprint of a model paper request without one: 25 questions, 30/50/20 difficulty mix
+DEFAULT_BLUEPRINT = {
+    'totalQuestions': 25,
+    'difficultyDistribution': {'easy': 0.3, 'medium': 0.5, 'hard': 0.2}
+}
+
+# Weight of one unit of deviation (one question, or one mark) per constraint
+BLUEPRINT_WEIGHTS = {
+    'totalMarks': 1.0,
+    'topicQuotas': 1.0,
+    'unitMarks': 1.0,
+    'difficultyDistribution': 1.0
+}
+
+# Repair phase: tabu search iterations, and how long a moved class stays tabu
+MAX_REPAIR_ITERATIONS = 200
+TABU_TENURE = 7
+
+# A constraint is satisfied within this distance of its target (shares give fractional targets)
+SATISFIED_TOLERANCE = 0.5
+
+
+def parse_blueprint(data: Optional[Dict]) -> Dict:
+    """
+    Validate a blueprint (DEFAULT_BLUEPRINT if none is given)
+
+    A given blueprint constrains only its own fields, plus the default
+    number of questions unless it sets totalQuestions or topicQuotas. A
+    blueprint that only excludes questions keeps the default constraints.
+
+    Raises:
+        ValueError: On unknown fields, values of the wrong type (including
+            non-string excluded ids) or negative or non-finite targets
+    """
+    data = data or {}
+    unknown = set(data) - set(BLUEPRINT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown blueprint fields: {', '.join(sorted(unknown))}")
+
+    constrained = set(data) - {'excludeQuestionIds'}
+    blueprint = {'totalQuestions': DEFAULT_BLUEPRINT['totalQuestions']} if constrained \
+        else dict(DEFAULT_BLUEPRINT)
+    for name, value in data.items():
+        expected = BLUEPRINT_FIELDS[name]
+        if not isinstance(value, expected) or isinstance(value, bool):
+            raise ValueError(f"Blueprint field '{name}' has the wrong type")
+        blueprint[name] = value
+
+    for name in ('totalQuestions', 'totalMarks'):
+        if name in data and not (math.isfinite(data[name]) and data[name] >= 0):
+            raise ValueError(f"Blueprint field '{name}' must be a non-negative number")
+    if not all(isinstance(i, str) for i in blueprint.get('excludeQuestionIds', [])):
+        raise ValueError("Blueprint field 'excludeQuestionIds' must list questionId strings")
+
+    for name in ('topicQuotas', 'unitMarks', 'difficultyDistribution'):
+        for key, target in blueprint.get(name, {}).items():
+            if not isinstance(target, (int, float)) or isinstance(target, bool) or \
+                    not (math.isfinite(target) and target >= 0):
+                raise ValueError(f"Blueprint target '{name}.{key}' must be a non-negative number")
+    unknown = set(blueprint.get('difficultyDistribution', {})) - set(DIFFICULTY_LEVELS)
+    if unknown:
+        raise ValueError(f"Unknown difficulty levels: {', '.join(sorted(unknown))}")
+
+    # Without an explicit size, topic quotas fix the number of questions
+    if 'totalQuestions' not in data and 'topicQuotas' in data:
+        blueprint['totalQuestions'] = int(sum(data['topicQuotas'].values()))
+    return blueprint
+
+
+def constraint_matrix(store: QuestionStore, blueprint: Dict,
+                      num_questions: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List]:
+    """
+    Contribution of one question of every key group to every constraint
+
+    Returns:
+        (groups x constraints contributions, targets, weights, constraint labels).
+        Labels are (blueprint field, name); topics and units missing from
+        a quota get a shared 'other' column with target 0.
+    """
+    topic_codes, unit_codes, difficulty_codes, marks = store.key_codes.T.astype(float)
+    columns, targets, labels = [], [], []
+
+    def add(field, name, contribution, target):
+        columns.append(contribution)
+        targets.append(float(target))
+        labels.append((field, name))
+
+    if 'totalMarks' in blueprint:
+        add('totalMarks', None, marks, blueprint['totalMarks'])
+
+    for field, vocabulary, codes, per_question in (
+            ('topicQuotas', store.topics, topic_codes, np.ones_like(marks)),
+            ('unitMarks', store.units, unit_codes, marks)):
+        quotas = blueprint.get(field)
+        if quotas is None:
+            continue
+        listed = np.zeros(len(marks), dtype=bool)
+        for name, target in quotas.items():
+            match = codes == vocabulary.index(name) if name in vocabulary \
+                else np.zeros(len(marks), dtype=bool)
+            listed |= match
+            add(field, name, per_question * match, target)
+        add(field, None, per_question * ~listed, 0)
+
+    shares = blueprint.get('difficultyDistribution')
+    if shares:
+        total_share = sum(shares.values()) or 1.0
+        for code, level in enumerate(DIFFICULTY_LEVELS):
+            add('difficultyDistribution', level, (difficulty_codes == code).astype(float),
+                shares.get(level, 0) / total_share * num_questions)
+
+    weights = np.array([BLUEPRINT_WEIGHTS[field] for field, _ in labels])
+    contributions = np.stack(columns, axis=1) if columns else np.zeros((len(marks), 0))
+    return contributions, np.array(targets), weights, labels
+
+
+def swap_deltas(contributions: np.ndarray, nonzero: np.ndarray, values: np.ndarray,
+                weights: np.ndarray, residual: np.ndarray, counts: np.ndarray,
+                capacity: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Deviation change of every swap of one question of a taken class for one of another class
+
+    Each class touches only a few constraints (its topic, unit, difficulty
+    and marks), so additions are scored on those columns alone.
+
+    Returns:
+        (taken classes, taken x classes deviation changes; inf where not allowed)
+    """
+    taken = np.flatnonzero(counts)
+    removed = residual - contributions[taken]
+    delta = (np.abs(removed) - np.abs(residual)) @ weights
+    touched = removed[:, nonzero]
+    added = np.abs(touched + values)
+    added -= np.abs(touched)
+    delta = delta[:, None] + np.einsum('tkn,kn->tk', added, weights[nonzero])
+    delta[:, counts >= capacity] = np.inf
+    delta[np.arange(len(taken)), taken] = np.inf
+    return taken, delta
+
+
+def solve_class_counts(contributions: np.ndarray, targets: np.ndarray, weights: np.ndarray,
+                       capacity: np.ndarray, num_questions: int,
+                       rng: np.random.Generator) -> Tuple[np.ndarray, int]:
+    """
+    Questions to take from every class of interchangeable questions
+
+    Greedy: add, one question at a time, the class that most reduces the
+    weighted deviation sum(w * |achieved - target|). Repair: tabu search
+    over swaps (one question of one class for one of another). The best
+    allowed swap is made even when it does not improve, so the search can
+    cross plateaus such as moving a mark between two units; recently moved
+    classes are tabu unless the swap beats the best paper found. The search
+    stops at a perfect paper or after MAX_REPAIR_ITERATIONS. Ties are broken
+    at random, so equal blueprints give different papers.
+
+    Returns:
+        (questions per class of the best paper found, repair iterations)
+    """
+    width = max(1, int((contributions != 0).sum(axis=1).max(initial=0)))
+    nonzero = np.argsort(contributions == 0, axis=1, kind='stable')[:, :width]
+    values = np.take_along_axis(contributions, nonzero, axis=1)
+
+    counts = np.zeros(len(capacity), dtype=np.int64)
+    residual = -targets
+    for _ in range(min(num_questions, int(capacity.sum()))):
+        touched = residual[nonzero]
+        delta = ((np.abs(touched + values) - np.abs(touched)) * weights[nonzero]).sum(-1)
+        delta[counts >= capacity] = np.inf
+        chosen = int(np.argmin(delta + rng.random(len(delta)) * 1e-6))
+        counts[chosen] += 1
+        residual = residual + contributions[chosen]
+
+    current = np.abs(residual) @ weights
+    best, best_counts = current, counts.copy()
+    tabu_until = np.zeros(len(capacity), dtype=np.int64)
+    iteration = 0
+    while iteration < MAX_REPAIR_ITERATIONS and best > 1e-9 and counts.sum() > 0:
+        taken, delta = swap_deltas(contributions, nonzero, values, weights, residual,
+                                   counts, capacity)
+        tabu = tabu_until > iteration
+        delta[(tabu[taken][:, None] | tabu[None, :]) & (current + delta >= best - 1e-9)] = np.inf
+        delta += rng.random(delta.shape) * 1e-6
+        i, j = np.unravel_index(np.argmin(delta), delta.shape)
+        if not np.isfinite(delta[i, j]):
+            break
+        counts[taken[i]] -= 1
+        counts[j] += 1
+        residual = residual - contributions[taken[i]] + contributions[j]
+        current = np.abs(residual) @ weights
+        tabu_until[[taken[i], j]] = iteration + TABU_TENURE
+        iteration += 1
+        if current < best - 1e-9:
+            best, best_counts = current, counts.copy()
+    return best_counts, iteration
+
+
+def satisfaction_report(labels: List, targets: np.ndarray, achieved: np.ndarray) -> Dict:
+    """Target and achieved value of every blueprint constraint"""
+    report = {}
+    for (field, name), target, value in zip(labels, targets, achieved):
+        entry = {'target': float(target), 'achieved': float(value),
+                 'satisfied': bool(abs(value - target) <= SATISFIED_TOLERANCE)}
+        if name is None and field != 'totalMarks':
+            name = 'other'
+        if name is None:
+            report[field] = entry
+        else:
+            report.setdefault(field, {})[name] = entry
+    return report
+
+
+def assemble_paper(store: QuestionStore, blueprint: Dict,
+                   rng: np.random.Generator) -> Tuple[np.ndarray, Dict]:
+    """
+    Assemble a model paper satisfying a blueprint as closely as possible
+
+    Questions sharing a (topic, syllabusUnit, difficulty, marks) key are
+    interchangeable for every constraint, and so are key groups with equal
+    contributions to the blueprint's constraints. The solver works on these
+    classes (at most a few hundred, whatever the bank size); the rows are
+    then sampled uniformly within each class.
+
+    Args:
+        store: Question bank
+        blueprint: Validated blueprint (parse_blueprint)
+        rng: Random generator for class tie-breaking and row sampling
+
+    Returns:
+        (rows in bank order, satisfaction report). Excluded ids are ignored,
+        with a report warning, when the bank has no questionIds.
+    """
+    started = time.perf_counter()
+    warnings = []
+    if blueprint.get('excludeQuestionIds') and not store.rows_by_id:
+        warnings.append("The question bank has no questionIds, so excludeQuestionIds "
+                        "was ignored")
+    excluded = store.rows_for_ids(blueprint.get('excludeQuestionIds', []))
+    capacity = np.bincount(store.group_codes, minlength=len(store.key_codes)) - \
+        np.bincount(store.group_codes[excluded], minlength=len(store.key_codes))
+    num_questions = min(int(blueprint['totalQuestions']), int(capacity.sum()))
+    excluded_mask = np.zeros(len(store), dtype=bool)
+    excluded_mask[excluded] = True
+
+    contributions, targets, weights, labels = constraint_matrix(store, blueprint, num_questions)
+    classes, class_of_group = np.unique(contributions, axis=0, return_inverse=True)
+    class_of_group = class_of_group.ravel()
+    class_capacity = np.bincount(class_of_group, weights=capacity,
+                                 minlength=len(classes)).astype(np.int64)
+    counts, iterations = solve_class_counts(classes, targets, weights, class_capacity,
+                                            num_questions, rng)
+
+    rows = []
+    for chosen in np.flatnonzero(counts):
+        available = np.concatenate([store.group_rows[group]
+                                    for group in np.flatnonzero(class_of_group == chosen)])
+        available = available[~excluded_mask[available]]
+        rows.append(rng.choice(available, size=counts[chosen], replace=False))
+    rows = np.sort(np.concatenate(rows)) if rows else np.empty(0, dtype=np.int64)
+
+    achieved = counts @ classes
+    report = {
+        'satisfied': bool(np.all(np.abs(achieved - targets) <= SATISFIED_TOLERANCE)
+                          and len(rows) == blueprint['totalQuestions']),
+        'deviation': round(float(np.abs(achieved - targets) @ weights), 6),
+        'totalQuestions': {'target': blueprint['totalQuestions'], 'achieved': len(rows),
+                           'satisfied': len(rows) == blueprint['totalQuestions']},
+        **satisfaction_report(labels, targets, achieved),
+        'excludedQuestions': len(excluded),
+        'availableQuestions': int(capacity.sum()),
+        'repairIterations': iterations,
+        'latencyMs': (time.perf_counter() - started) * 1000,
+        'warnings': warnings
+    }
+    return rows, report
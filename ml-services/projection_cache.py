@@ -0,0 +1,206 @@
+"""
+Content-Addressed Result Cache for the Adaptive Learning Projection
+Reuses the report and charts of a projection already run with the same inputs
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import inspect
+import threading
+from typing import Dict, List, Optional
+
+from simulation_projection import AdaptiveLearningSimulation, DEFAULT_ENGAGEMENT_PROBS
+
+# Artifacts produced by one projection run
+PROJECTION_ARTIFACTS = [
+    'simulation_report.json',
+    'learning_curves.png',
+    'kpi_comparison.png',
+    'improvement_metrics.png',
+    'projection_summary.md'
+]
+
+# Source files whose contents determine the projection output
+CODE_FILES = [
+    'simulation_projection.py',
+    'simulation_stream.py',
+    'syllabus_graph.py',
+    'visualize_projection.py'
+]
+
+DEFAULT_CACHE_DIR = 'projection_cache'
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+
+def hash_path(path: str) -> str:
+    """SHA-256 of a file, or of every file under a directory (SavedModel bundles)"""
+    digest = hashlib.sha256()
+    if os.path.isdir(path):
+        files = sorted(os.path.join(root, name)
+                       for root, _, names in os.walk(path) for name in names)
+    else:
+        files = [path]
+    for file_path in files:
+        digest.update(os.path.relpath(file_path, path).encode())
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def resolve_parameters(**parameters) -> Dict:
+    """Simulation parameters with every default filled in, as the simulation sees them"""
+    signature = inspect.signature(AdaptiveLearningSimulation.__init__)
+    resolved = {name: param.default for name, param in signature.parameters.items()
+                if name not in ('self', 'dkt_model')}
+    resolved.update(parameters)
+    resolved['engagement_probs'] = {**DEFAULT_ENGAGEMENT_PROBS,
+                                    **(resolved['engagement_probs'] or {})}
+    return resolved
+
+
+class ProjectionCache:
+    """
+    On-disk cache of projection artifacts keyed by a hash of the inputs
+
+    The key covers the resolved simulation parameters (seed included), the
+    DKT model bundle contents, the syllabus graph and the simulation source code. Entries are
+    evicted least recently used first once the cache exceeds max_bytes.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir: Directory holding one subdirectory per cached run
+            max_bytes: Size bound of the cache
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self._model_hashes = {}
+        self._syllabus_hashes = {}
+        self._code_version = None
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def model_hash(self, model_path: str) -> str:
+        """Hash of the model bundle, recomputed only when the file changes"""
+        if model_path is None or not os.path.exists(model_path):
+            return 'no-model'
+        stat = os.stat(model_path)
+        signature = (model_path, stat.st_mtime_ns, stat.st_size)
+        if signature not in self._model_hashes:
+            self._model_hashes[signature] = hash_path(model_path)
+        return self._model_hashes[signature]
+
+    def syllabus_hash(self, syllabus_path: str) -> str:
+        """Hash of the syllabus graph, recomputed only when the file changes"""
+        stat = os.stat(syllabus_path)
+        signature = (syllabus_path, stat.st_mtime_ns, stat.st_size)
+        if signature not in self._syllabus_hashes:
+            self._syllabus_hashes[signature] = hash_path(syllabus_path)
+        return self._syllabus_hashes[signature]
+
+    def code_version(self) -> str:
+        """Hash of the simulation and reporting source code"""
+        if self._code_version is None:
+            digest = hashlib.sha256()
+            source_dir = os.path.dirname(os.path.abspath(__file__))
+            for name in CODE_FILES:
+                digest.update(hash_path(os.path.join(source_dir, name)).encode())
+            self._code_version = digest.hexdigest()
+        return self._code_version
+
+    def key(self, **parameters) -> str:
+        """Cache key of a projection run with these AdaptiveLearningSimulation arguments"""
+        resolved = resolve_parameters(**parameters)
+        model_path = resolved.pop('model_path')
+        syllabus_path = resolved.pop('syllabus_path')
+        payload = {
+            'parameters': resolved,
+            'model': self.model_hash(model_path),
+            'syllabus': self.syllabus_hash(syllabus_path),
+            'code': self.code_version()
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key: str) -> Optional[str]:
+        """Directory of a cached entry (marked as recently used), or None on a miss"""
+        path = self.entry_dir(key)
+        with self.lock:
+            if not os.path.isdir(path):
+                return None
+            os.utime(path)
+        return path
+
+    def load_report(self, key: str) -> Optional[Dict]:
+        """Cached report of an entry, or None on a miss"""
+        path = self.get(key)
+        if path is None:
+            return None
+        with open(os.path.join(path, 'simulation_report.json')) as f:
+            return json.load(f)
+
+    def restore(self, key: str, output_dir: str = '.') -> Optional[Dict]:
+        """
+        Copy a cached entry's artifacts into output_dir
+
+        The copy holds the lock, so eviction cannot delete the entry halfway;
+        the report is then read from the copy in output_dir.
+
+        Returns:
+            The cached report, or None on a miss
+        """
+        path = self.entry_dir(key)
+        with self.lock:
+            if not os.path.isdir(path):
+                return None
+            os.utime(path)
+            try:
+                for name in os.listdir(path):
+                    shutil.copy2(os.path.join(path, name), os.path.join(output_dir, name))
+            except FileNotFoundError:
+                # Evicted by another process sharing the cache directory
+                return None
+        with open(os.path.join(output_dir, 'simulation_report.json')) as f:
+            return json.load(f)
+
+    def put(self, key: str, artifact_paths: List[str]):
+        """Store a run's artifacts under its key, then evict down to max_bytes"""
+        path = self.entry_dir(key)
+        temp_path = f'{path}.tmp-{os.getpid()}-{threading.get_ident()}'
+        os.makedirs(temp_path, exist_ok=True)
+        for artifact_path in artifact_paths:
+            if os.path.exists(artifact_path):
+                shutil.copy2(artifact_path, os.path.join(temp_path, os.path.basename(artifact_path)))
+
+        with self.lock:
+            if os.path.isdir(path):
+                shutil.rmtree(temp_path)
+            else:
+                os.replace(temp_path, path)
+            self.evict()
+
+    def entry_size(self, path: str) -> int:
+        return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if os.path.isdir(path) and '.tmp-' not in name:
+                entries.append((os.path.getmtime(path), self.entry_size(path), path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            print(f"✓ Evicted cached projection {os.path.basename(path)}")
@@ -0,0 +1,91 @@
+"""
+Per-Run Output Directories for the Adaptive Learning Projection
+Every projection writes into its own run directory and is recorded in an index
+"""
+
+import os
+import re
+import json
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+DEFAULT_RUNS_DIR = 'projection_runs'
+
+# Index of completed runs: one JSON record per line, appended atomically
+INDEX_FILE = 'index.jsonl'
+
+RUN_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+def new_run_id() -> str:
+    """Sortable, collision-free run id"""
+    return f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+
+class RunStore:
+    """
+    Projection run directories under runs_dir plus an index of completed runs
+
+    Concurrent projections (threads or processes) never share output files.
+    """
+
+    def __init__(self, runs_dir: str = DEFAULT_RUNS_DIR):
+        self.runs_dir = runs_dir
+        self.index_path = os.path.join(runs_dir, INDEX_FILE)
+        os.makedirs(runs_dir, exist_ok=True)
+
+    def run_dir(self, run_id: str) -> str:
+        """
+        Directory of a run
+
+        Raises:
+            ValueError: If run_id is not a valid run id
+        """
+        if not RUN_ID_PATTERN.match(run_id):
+            raise ValueError(f"Invalid run id '{run_id}'")
+        return os.path.join(self.runs_dir, run_id)
+
+    def create_run(self, run_id: Optional[str] = None) -> str:
+        """
+        Create the directory of a new run
+
+        Returns:
+            The run id
+        """
+        run_id = run_id or new_run_id()
+        os.makedirs(self.run_dir(run_id), exist_ok=True)
+        return run_id
+
+    def complete_run(self, run_id: str, parameters: Dict, cached: bool = False) -> Dict:
+        """Record a completed run in the index"""
+        record = {
+            'run_id': run_id,
+            'run_dir': self.run_dir(run_id),
+            'parameters': parameters,
+            'cached': cached,
+            'completed_at': datetime.now().isoformat()
+        }
+        # A single O_APPEND write of one line does not interleave with other writers
+        line = (json.dumps(record, default=str) + '\n').encode('utf-8')
+        fd = os.open(self.index_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+        return record
+
+    def list_runs(self) -> List[Dict]:
+        """Completed runs, oldest first"""
+        if not os.path.exists(self.index_path):
+            return []
+        with open(self.index_path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def latest_run(self) -> Optional[Dict]:
+        runs = self.list_runs()
+        return runs[-1] if runs else None
+
+    def artifact_path(self, run_id: str, name: str) -> str:
+        """Path of one artifact of a run"""
+        return os.path.join(self.run_dir(run_id), os.path.basename(name))
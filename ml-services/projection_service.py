@@ -0,0 +1,387 @@
+"""
+Projection Service - Long-lived API for the Adaptive Learning Projection
+Keeps the DKT model and simulation engine warm and runs projection jobs on a worker pool
+"""
+
+import os
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import matplotlib
+matplotlib.use('Agg')  # Charts are rendered off-screen from worker threads
+
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
+from flask_cors import CORS
+
+from simulation_projection import AdaptiveLearningSimulation
+from visualize_projection import ProjectionVisualizer
+from projection_cache import ProjectionCache, PROJECTION_ARTIFACTS
+from projection_runs import RunStore, new_run_id
+
+# Accepted job parameters and their types (AdaptiveLearningSimulation arguments)
+PROJECTION_PARAMETERS = {
+    'num_students': int,
+    'num_sessions': int,
+    'target_topic': str,
+    'target_mastery': float,
+    'seed': int,
+    'paired': bool,
+    'retire_at_mastery': bool,
+    'engagement_probs': dict,
+    'chunk_size': int,
+    'questions_per_difficulty': int
+}
+
+# Parameters that must be at least 1 (counts and sizes)
+POSITIVE_PARAMETERS = ('num_students', 'num_sessions', 'chunk_size', 'questions_per_difficulty')
+
+# Finished jobs kept for status and result queries
+MAX_JOB_HISTORY = 100
+
+# Seconds an idle event stream waits before sending a keep-alive comment
+EVENT_KEEPALIVE = 15.0
+
+
+def parse_parameters(data: Dict) -> Dict:
+    """
+    Validate projection job parameters
+
+    Raises:
+        ValueError: On unknown parameters, values of the wrong type, counts
+            below 1 or a target_mastery outside (0, 1]
+    """
+    unknown = set(data) - set(PROJECTION_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+
+    parameters = {}
+    for name, value in data.items():
+        expected = PROJECTION_PARAMETERS[name]
+        if expected is float and isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        if not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+            raise ValueError(f"'{name}' must be of type {expected.__name__}")
+        if name in POSITIVE_PARAMETERS and value < 1:
+            raise ValueError(f"'{name}' must be at least 1")
+        if name == 'target_mastery' and not 0 < value <= 1:
+            raise ValueError("'target_mastery' must be in (0, 1]")
+        parameters[name] = value
+    return parameters
+
+
+class ProjectionJob:
+    """One projection request: status, progress events and the resulting report"""
+
+    def __init__(self, parameters: Dict):
+        # The job id doubles as the id of the job's run directory
+        self.job_id = new_run_id()
+        self.parameters = parameters
+        self.status = 'queued'
+        self.progress = 0.0
+        self.cache_key = None
+        self.cached = False
+        self.report = None
+        self.error = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at = None
+        self.finished_at = None
+        self.events = []
+        self.condition = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('completed', 'failed')
+
+    @property
+    def closed(self) -> bool:
+        """Whether the final event has been recorded"""
+        return bool(self.events) and self.events[-1]['event'] in ('completed', 'failed')
+
+    def add_event(self, event_type: str, **fields):
+        """Record a progress event and wake up event stream readers"""
+        with self.condition:
+            self.events.append({
+                'event': event_type,
+                'job_id': self.job_id,
+                'status': self.status,
+                'progress': self.progress,
+                'timestamp': datetime.now().isoformat(),
+                **fields
+            })
+            self.condition.notify_all()
+
+    def wait_for_events(self, start: int, timeout: float) -> List[Dict]:
+        """Events from index `start` on, waiting up to `timeout` seconds for new ones"""
+        with self.condition:
+            if len(self.events) <= start and not self.closed:
+                self.condition.wait(timeout)
+            return self.events[start:]
+
+    def to_dict(self) -> Dict:
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'progress': self.progress,
+            'parameters': self.parameters,
+            'cached': self.cached,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+
+class ProjectionJobManager:
+    """
+    Runs projection jobs on a thread pool sharing one warm DKT model
+
+    The model is loaded once at startup instead of once per projection.
+    The simulation is CPU-bound Python, so jobs on the thread pool share
+    the GIL: the pool queues jobs and overlaps their I/O and reporting, not
+    their simulation. simulation_workers > 1 runs each job's student chunks
+    on a process pool instead (run_simulation num_workers).
+    """
+
+    def __init__(self, model_path: str = 'dkt_trained_model.keras', max_workers: int = 2,
+                 runs: Optional[RunStore] = None,
+                 cache: Optional[ProjectionCache] = None,
+                 simulation_workers: int = 1):
+        """
+        Args:
+            model_path: Path to trained DKT model
+            max_workers: Projection jobs run concurrently
+            runs: Run directories and index; every job writes into its own run directory
+            cache: Result cache; jobs with cached inputs complete without simulating
+            simulation_workers: Worker processes per job (1 simulates in the job's thread)
+        """
+        self.model_path = model_path
+        self.runs = runs or RunStore()
+        self.cache = cache
+        self.dkt_model = AdaptiveLearningSimulation(
+            model_path=model_path, num_students=0, num_sessions=0
+        ).dkt_model
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix='projection')
+        self.max_workers = max_workers
+        self.simulation_workers = simulation_workers
+        self.jobs = OrderedDict()
+        self.jobs_lock = threading.Lock()
+        # pyplot keeps global figure state, so charts are rendered one job at a time
+        self.chart_lock = threading.Lock()
+
+    def submit(self, parameters: Dict) -> ProjectionJob:
+        """Queue a projection job"""
+        job = ProjectionJob(parameters)
+        with self.jobs_lock:
+            self.jobs[job.job_id] = job
+            self.prune_jobs()
+
+        if self.cache is not None:
+            job.cache_key = self.cache.key(model_path=self.model_path, **parameters)
+            run_dir = self.runs.run_dir(self.runs.create_run(job.job_id))
+            job.report = self.cache.restore(job.cache_key, run_dir)
+            if job.report is not None:
+                job.cached = True
+                job.progress = 1.0
+                job.status = 'completed'
+                job.started_at = job.finished_at = datetime.now().isoformat()
+                self.runs.complete_run(job.job_id, parameters, cached=True)
+                job.add_event('completed', error=None)
+                return job
+
+        job.add_event('queued')
+        self.executor.submit(self.run_job, job)
+        return job
+
+    def prune_jobs(self):
+        """Drop the oldest finished jobs beyond MAX_JOB_HISTORY"""
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - MAX_JOB_HISTORY)]:
+            del self.jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[ProjectionJob]:
+        with self.jobs_lock:
+            return self.jobs.get(job_id)
+
+    def list_jobs(self) -> List[Dict]:
+        with self.jobs_lock:
+            return [job.to_dict() for job in self.jobs.values()]
+
+    def run_job(self, job: ProjectionJob):
+        """Simulate, write the report and render the charts of one job"""
+        job.status = 'running'
+        job.started_at = datetime.now().isoformat()
+        job.add_event('started')
+
+        def on_progress(students_done: int, num_students: int):
+            job.progress = students_done / num_students
+            job.add_event('progress', students_done=students_done, num_students=num_students)
+
+        try:
+            simulation = AdaptiveLearningSimulation(model_path=self.model_path,
+                                                    dkt_model=self.dkt_model,
+                                                    **job.parameters)
+            simulation.run_simulation(num_workers=self.simulation_workers,
+                                      progress_callback=on_progress)
+
+            job.add_event('reporting')
+            self.runs.create_run(job.job_id)
+            report_path = self.runs.artifact_path(job.job_id, 'simulation_report.json')
+            job.report = simulation.generate_report(report_path)
+            with self.chart_lock:
+                ProjectionVisualizer(report_path).generate_all_visualizations()
+            if self.cache is not None:
+                self.cache.put(job.cache_key, [self.runs.artifact_path(job.job_id, name)
+                                               for name in PROJECTION_ARTIFACTS])
+            self.runs.complete_run(job.job_id, job.parameters)
+
+            job.progress = 1.0
+            job.status = 'completed'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = datetime.now().isoformat()
+            job.add_event(job.status, error=job.error)
+
+
+# Flask API for Node.js integration
+app = Flask(__name__)
+CORS(app)
+
+# Global job manager, created at startup
+manager = None
+
+
+@app.route('/projections', methods=['POST'])
+def submit_projection():
+    """Queue a projection job"""
+    try:
+        parameters = parse_parameters(request.json or {})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    job = manager.submit(parameters)
+    return jsonify({
+        'success': True,
+        'job_id': job.job_id,
+        'status': job.status,
+        'status_url': f'/projections/{job.job_id}',
+        'events_url': f'/projections/{job.job_id}/events'
+    }), 202
+
+
+@app.route('/projections', methods=['GET'])
+def list_projections():
+    """List queued, running and recently finished jobs"""
+    return jsonify({'success': True, 'jobs': manager.list_jobs()})
+
+
+@app.route('/projections/<job_id>', methods=['GET'])
+def projection_status(job_id):
+    """Job status and progress"""
+    job = manager.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, **job.to_dict()})
+
+
+@app.route('/projections/<job_id>/result', methods=['GET'])
+def projection_result(job_id):
+    """Report of a completed job"""
+    job = manager.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    if job.status == 'failed':
+        return jsonify({'success': False, 'status': job.status, 'error': job.error}), 500
+    if job.status != 'completed':
+        return jsonify({'success': False, 'status': job.status,
+                        'error': 'Job has not completed'}), 409
+    return jsonify({'success': True, 'status': job.status, 'run_id': job.job_id,
+                    'run_dir': manager.runs.run_dir(job.job_id), 'report': job.report})
+
+
+@app.route('/projections/<job_id>/artifacts/<name>', methods=['GET'])
+def projection_artifact(job_id, name):
+    """Chart or summary file of a completed run"""
+    if name not in PROJECTION_ARTIFACTS:
+        return jsonify({'success': False, 'error': 'Invalid artifact'}), 403
+    try:
+        path = manager.runs.artifact_path(job_id, name)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if not os.path.exists(path):
+        return jsonify({'success': False, 'error': 'Artifact not found'}), 404
+    return send_file(os.path.abspath(path))
+
+
+@app.route('/runs', methods=['GET'])
+def list_runs():
+    """Index of completed runs"""
+    return jsonify({'success': True, 'runs': manager.runs.list_runs()})
+
+
+@app.route('/projections/<job_id>/events', methods=['GET'])
+def projection_events(job_id):
+    """Server-sent event stream of a job's progress, ending when the job finishes"""
+    job = manager.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+
+    def stream():
+        sent = 0
+        while True:
+            events = job.wait_for_events(sent, EVENT_KEEPALIVE)
+            if not events:
+                yield ': keep-alive\n\n'
+                continue
+            for event in events:
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+            sent += len(events)
+            if events[-1]['event'] in ('completed', 'failed'):
+                break
+
+    return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
+
+@app.route('/health', methods=['GET'])
+def health():
+    """Health check"""
+    jobs = manager.list_jobs()
+    return jsonify({
+        'status': 'OK',
+        'model_loaded': manager.dkt_model is not None,
+        'workers': manager.max_workers,
+        'running_jobs': sum(job['status'] == 'running' for job in jobs),
+        'queued_jobs': sum(job['status'] == 'queued' for job in jobs)
+    })
+
+
+if __name__ == '__main__':
+    port = int(os.environ.get('PROJECTION_SERVICE_PORT', 5003))
+    max_workers = int(os.environ.get('PROJECTION_WORKERS', 2))
+    simulation_workers = int(os.environ.get('PROJECTION_SIMULATION_WORKERS', 1))
+    # Local API without authentication: listen on loopback unless told otherwise
+    host = os.environ.get('PROJECTION_SERVICE_HOST', '127.0.0.1')
+    manager = ProjectionJobManager(
+        model_path=os.environ.get('DKT_MODEL_PATH', 'dkt_trained_model.keras'),
+        max_workers=max_workers,
+        simulation_workers=simulation_workers,
+        runs=RunStore(os.environ.get('PROJECTION_RUNS_DIR', 'projection_runs')),
+        cache=ProjectionCache(
+            os.environ.get('PROJECTION_CACHE_DIR', 'projection_cache'),
+            max_bytes=int(os.environ.get('PROJECTION_CACHE_MAX_MB', 500)) * 1024 * 1024
+        )
+    )
+
+    print("\n" + "="*50)
+    print(f"[*] Starting Projection Service on {host}:{port} ({max_workers} workers, "
+          f"{simulation_workers} simulation processes per job)")
+    print("="*50 + "\n")
+
+    app.run(host=host, port=port, threaded=True)
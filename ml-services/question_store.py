@@ -0,0 +1,237 @@
+"""
+Question Store for Quiz and Model Paper Generation
+Immutable question bank in columnar arrays, indexed by topic, unit, difficulty and marks
+"""
+
+import os
+import json
+from types import MappingProxyType
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Question bank shipped next to this module (a JSON array of Question documents)
+DEFAULT_QUESTION_BANK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                          'question_bank.json')
+
+DIFFICULTY_LEVELS = ['easy', 'medium', 'hard']
+
+# Question schema defaults (server/models/Question.js)
+DEFAULT_DIFFICULTY = 'medium'
+DEFAULT_MARKS = 1
+DEFAULT_IRT_PARAMETERS = {'discrimination': 1.0, 'difficulty': 0.0, 'guessing': 0.25}
+
+# Defaults for questions without calibrated irtParameters: the IRT difficulty
+# follows the difficulty level, and guessing is the chance of a random option
+DIFFICULTY_IRT_DEFAULTS = {'easy': -1.0, 'medium': 0.0, 'hard': 1.0}
+
+# Fields copied into generated quizzes; database-only fields (_id, createdAt) are dropped
+QUESTION_FIELDS = ['questionId', 'question', 'options', 'correctAnswer', 'explanation',
+                   'topic', 'topicId', 'grade', 'difficulty', 'marks', 'syllabusUnit']
+
+# Loaded stores, keyed by path (shared by every request of a process)
+_loaded_stores = {}
+
+# Result of a query for values absent from the bank (shared, read-only)
+NO_ROWS = np.empty(0, dtype=np.int64)
+NO_ROWS.setflags(write=False)
+
+
+def read_questions(path: str) -> List[Dict]:
+    """
+    Question documents of a bank file
+
+    Accepts a JSON array (mongoexport --jsonArray) or one document per
+    line (plain mongoexport output, .jsonl/.ndjson).
+    """
+    with open(path, encoding='utf-8') as f:
+        if path.endswith(('.jsonl', '.ndjson')):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
+
+
+def _is_known(value, values: set) -> bool:
+    """Whether a query value occurs in the bank (unhashable values never do)"""
+    try:
+        return value in values
+    except TypeError:
+        return False
+
+
+def _freeze(value):
+    """Immutable copy of a JSON value (lists become tuples, objects read-only mappings)"""
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    return value
+
+
+def _thaw(value):
+    """Mutable copy of a frozen JSON value"""
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    if isinstance(value, MappingProxyType):
+        return {k: _thaw(v) for k, v in value.items()}
+    return value
+
+
+class QuestionStore:
+    """
+    Read-only question bank
+
+    Every question is a row of the column arrays:
+      - index columns: topic, syllabus unit and difficulty codes, marks
+      - IRT columns: discrimination, difficulty, guessing
+      - the question document itself, frozen
+    An index maps each (topic, syllabusUnit, difficulty, marks) key to its
+    rows; group_codes gives the key (row of key_codes) of every question.
+    Queries return row arrays; materialize builds new question dicts for
+    every request, so concurrent requests never share or mutate them.
+    """
+
+    def __init__(self, questions: List[Dict]):
+        """
+        Args:
+            questions: Question documents (server/models/Question.js fields)
+        """
+        self.topics, self.topic_codes = self._encode([q.get('topic') for q in questions])
+        self.units, self.unit_codes = self._encode([q.get('syllabusUnit') for q in questions])
+
+        difficulties = [q.get('difficulty', DEFAULT_DIFFICULTY) for q in questions]
+        unknown = set(difficulties) - set(DIFFICULTY_LEVELS)
+        if unknown:
+            raise ValueError(f"Unknown difficulty levels: {', '.join(sorted(map(str, unknown)))}")
+        self.difficulty_codes = np.array([DIFFICULTY_LEVELS.index(d) for d in difficulties],
+                                         dtype=np.int64)
+        self.marks = np.array([q.get('marks', DEFAULT_MARKS) for q in questions], dtype=np.int64)
+
+        irt = [{**self._default_irt_parameters(q, d), **(q.get('irtParameters') or {})}
+               for q, d in zip(questions, difficulties)]
+        self.discrimination = np.array([p['discrimination'] for p in irt], dtype=float)
+        self.irt_difficulty = np.array([p['difficulty'] for p in irt], dtype=float)
+        self.guessing = np.array([p['guessing'] for p in irt], dtype=float)
+
+        self.documents = tuple(
+            tuple((field, _freeze(q[field])) for field in QUESTION_FIELDS if field in q)
+            for q in questions
+        )
+
+        # (topic, syllabusUnit, difficulty, marks) -> rows, in bank order
+        codes = np.stack([self.topic_codes, self.unit_codes, self.difficulty_codes, self.marks],
+                         axis=1) if questions else np.empty((0, 4), dtype=np.int64)
+        self.key_codes, inverse = np.unique(codes, axis=0, return_inverse=True)
+        self.group_codes = inverse.ravel()
+        order = np.argsort(self.group_codes, kind='stable')
+        bounds = np.searchsorted(self.group_codes[order], np.arange(len(self.key_codes) + 1))
+        self.group_rows = [order[bounds[k]:bounds[k + 1]] for k in range(len(self.key_codes))]
+        for rows in self.group_rows:
+            rows.setflags(write=False)
+        self.index = {
+            (self.topics[t], self.units[u], DIFFICULTY_LEVELS[d], int(m)): rows
+            for (t, u, d, m), rows in zip(self.key_codes, self.group_rows)
+        }
+        self.rows_by_id = {q['questionId']: row for row, q in enumerate(questions)
+                           if 'questionId' in q}
+        for column in (self.topic_codes, self.unit_codes, self.difficulty_codes, self.marks,
+                       self.discrimination, self.irt_difficulty, self.guessing, self.key_codes,
+                       self.group_codes):
+            column.setflags(write=False)
+        self._vocabularies = [self.topics, self.units, DIFFICULTY_LEVELS, None]
+        self._known_values = [set(self.topics), set(self.units), set(DIFFICULTY_LEVELS),
+                              {int(m) for m in np.unique(self.marks)}]
+        self._queries = {}
+
+    @staticmethod
+    def _default_irt_parameters(question: Dict, difficulty: str) -> Dict:
+        """IRT parameters of a question without calibrated ones"""
+        options = question.get('options') or []
+        return {
+            **DEFAULT_IRT_PARAMETERS,
+            'difficulty': DIFFICULTY_IRT_DEFAULTS[difficulty],
+            'guessing': 1.0 / len(options) if options else DEFAULT_IRT_PARAMETERS['guessing']
+        }
+
+    @staticmethod
+    def _encode(values: List) -> Tuple[List, np.ndarray]:
+        """Distinct values in first-seen order and the code of every value"""
+        vocabulary = list(dict.fromkeys(values))
+        codes = {value: i for i, value in enumerate(vocabulary)}
+        return vocabulary, np.array([codes[v] for v in values], dtype=np.int64)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_QUESTION_BANK_PATH) -> 'QuestionStore':
+        """Load a question bank file (cached per path)"""
+        if path not in _loaded_stores:
+            _loaded_stores[path] = cls(read_questions(path))
+        return _loaded_stores[path]
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def select(self, topic: Optional[str] = None, syllabus_unit: Optional[str] = None,
+               difficulty: Optional[str] = None, marks: Optional[int] = None) -> np.ndarray:
+        """
+        Rows matching every given field, in bank order (read-only array)
+
+        Matches the index keys (one vectorized comparison over the key
+        codes), never the questions themselves. Results are memoized; the
+        store never changes. Values absent from the bank match nothing and
+        are not memoized, so the memo is bounded by the bank's own values.
+        """
+        wanted = (topic, syllabus_unit, difficulty, marks)
+        if not all(value is None or _is_known(value, values)
+                   for value, values in zip(wanted, self._known_values)):
+            return NO_ROWS
+        rows = self._queries.get(wanted)
+        if rows is not None:
+            return rows
+
+        match = np.ones(len(self.key_codes), dtype=bool)
+        for column, (value, vocabulary) in enumerate(zip(wanted, self._vocabularies)):
+            if value is None:
+                continue
+            if vocabulary is not None:
+                value = vocabulary.index(value)
+            match &= self.key_codes[:, column] == value
+
+        groups = [self.group_rows[k] for k in np.flatnonzero(match)]
+        rows = np.sort(np.concatenate(groups)) if groups else np.empty(0, dtype=np.int64)
+        rows.setflags(write=False)
+        self._queries[wanted] = rows
+        return rows
+
+    def rows_for_ids(self, question_ids: Sequence[str]) -> np.ndarray:
+        """Rows of the given questionIds (ids not in the bank are skipped)"""
+        rows = [self.rows_by_id[i] for i in question_ids if i in self.rows_by_id]
+        return np.unique(np.array(rows, dtype=np.int64))
+
+    def sample(self, rows: np.ndarray, count: int,
+               rng: np.random.Generator) -> np.ndarray:
+        """Up to `count` distinct rows drawn without replacement"""
+        return rng.choice(rows, size=min(count, len(rows)), replace=False)
+
+    def irt_parameters(self, row: int) -> Dict:
+        return {
+            'discrimination': float(self.discrimination[row]),
+            'difficulty': float(self.irt_difficulty[row]),
+            'guessing': float(self.guessing[row])
+        }
+
+    def materialize(self, rows: Sequence[int], id_prefix: str = 'q_',
+                    explanation_prefix: str = 'Explanation for question',
+                    start: int = 1) -> List[Dict]:
+        """
+        New question dicts for the given rows
+
+        Questions without a questionId or explanation get positional ones
+        (f'{id_prefix}{n}', f'{explanation_prefix} {n}'), numbered from `start`.
+        """
+        questions = []
+        for i, row in enumerate(rows, start - 1):
+            question = {field: _thaw(value) for field, value in self.documents[row]}
+            question.setdefault('questionId', f'{id_prefix}{i + 1}')
+            question['irtParameters'] = self.irt_parameters(row)
+            question.setdefault('explanation', f'{explanation_prefix} {i + 1}')
+            questions.append(question)
+        return questions
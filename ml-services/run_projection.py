@@ -4,11 +4,58 @@ Main script to run the complete Adaptive Learning Projection System
 
 import os
 import sys
+import argparse
 from simulation_projection import AdaptiveLearningSimulation
+from simulation_stream import SimulationSink
+from simulation_checkpoint import DEFAULT_CHECKPOINT_INTERVAL
+from projection_cache import ProjectionCache, PROJECTION_ARTIFACTS, DEFAULT_CACHE_DIR
+from projection_runs import RunStore, DEFAULT_RUNS_DIR
 from visualize_projection import ProjectionVisualizer
 
+def print_generated_files(run_id: str, run_dir: str):
+    """List the files a projection produces"""
+    print("\n" + "="*70)
+    print("PROJECTION COMPLETE!")
+    print("="*70)
+    print(f"\nRun: {run_id}")
+    print(f"Generated files in {run_dir}:")
+    for name in PROJECTION_ARTIFACTS:
+        print(f"  - {name}")
+    print("\n" + "="*70 + "\n")
+
 def main():
     """Run complete projection system"""
+    parser = argparse.ArgumentParser(description='Adaptive Learning Projection')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes for the simulation (results do not depend on it)')
+    parser.add_argument('--paired', action='store_true',
+                        help='Common random numbers: same students and draws for every strategy')
+    parser.add_argument('--retire-at-mastery', action='store_true',
+                        help='Stop simulating students once they reach the target mastery')
+    parser.add_argument('--stream', metavar='PATH',
+                        help='Stream output to a line-delimited JSON file (.gz to compress)')
+    parser.add_argument('--detail', choices=SimulationSink.DETAIL_LEVELS, default='sessions',
+                        help='Detail level of the streamed output')
+    parser.add_argument('--checkpoint', metavar='PATH',
+                        help='Periodically save the simulation state to this file')
+    parser.add_argument('--checkpoint-interval', type=float, default=DEFAULT_CHECKPOINT_INTERVAL,
+                        help='Minimum seconds between checkpoints')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue from the --checkpoint file if it exists')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always rerun instead of reusing a cached projection')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help='Directory of cached projection results')
+    parser.add_argument('--runs-dir', default=DEFAULT_RUNS_DIR,
+                        help='Directory holding one output directory per run')
+    parser.add_argument('--run-id',
+                        help='Id of this run (default: timestamp plus random suffix)')
+    parser.add_argument('--headless', action='store_true',
+                        help='Skip the DKT model and TensorFlow (knowledge-based recommendations)')
+    args = parser.parse_args()
+    if args.resume and not args.checkpoint:
+        parser.error('--resume requires --checkpoint')
+    
     print("\n" + "="*70)
     print("ADAPTIVE LEARNING OUTCOME PROJECTION SYSTEM")
     print("="*70)
@@ -20,27 +67,57 @@ def main():
     print("\n" + "="*70 + "\n")
     
     # Check if model exists
-    model_path = 'dkt_trained_model.keras'
-    if not os.path.exists(model_path):
+    model_path = None if args.headless else 'dkt_trained_model.keras'
+    if model_path is not None and not os.path.exists(model_path):
         print(f"⚠ Warning: Model file '{model_path}' not found.")
         print("   Simulation will use fallback knowledge-based recommendations.")
         print("   For best results, ensure the trained model is available.\n")
     
+    parameters = {
+        'model_path': model_path,
+        'target_topic': 'G11_16',
+        'target_mastery': 0.85,
+        'num_students': 100,
+        'num_sessions': 50,
+        'paired': args.paired,
+        'retire_at_mastery': args.retire_at_mastery
+    }
+    
+    # Every run writes into its own directory, so concurrent runs never clash
+    runs = RunStore(args.runs_dir)
+    run_id = runs.create_run(args.run_id)
+    run_dir = runs.run_dir(run_id)
+    report_path = runs.artifact_path(run_id, 'simulation_report.json')
+    
+    # Identical inputs (parameters, seed, model, code) reuse the cached results;
+    # streamed output is not cached
+    cache = None if args.no_cache or args.stream else ProjectionCache(args.cache_dir)
+    if cache is not None:
+        cache_key = cache.key(**parameters)
+        if cache.restore(cache_key, run_dir) is not None:
+            print(f"✓ Cache hit ({cache_key[:12]}): restored report and visualizations")
+            runs.complete_run(run_id, parameters, cached=True)
+            print_generated_files(run_id, run_dir)
+            return
+    
     # Initialize and run simulation
     print("Starting simulation...\n")
-    simulation = AdaptiveLearningSimulation(
-        model_path=model_path,
-        target_topic='G11_16',
-        target_mastery=0.85,
-        num_students=100,
-        num_sessions=50
-    )
+    simulation = AdaptiveLearningSimulation(**parameters)
     
     # Run simulation
-    simulation.run_simulation()
+    run_options = {
+        'num_workers': args.workers,
+        'checkpoint_path': args.checkpoint,
+        'checkpoint_interval': args.checkpoint_interval,
+        'resume': args.resume
+    }
+    if args.stream:
+        with SimulationSink(args.stream, detail=args.detail, resume=args.resume) as sink:
+            simulation.run_simulation(sink=sink, **run_options)
+    else:
+        simulation.run_simulation(**run_options)
     
     # Generate report
-    report_path = 'simulation_report.json'
     simulation.generate_report(report_path)
     
     # Generate visualizations
@@ -51,16 +128,11 @@ def main():
     visualizer = ProjectionVisualizer(report_path)
     visualizer.generate_all_visualizations()
     
-    print("\n" + "="*70)
-    print("PROJECTION COMPLETE!")
-    print("="*70)
-    print("\nGenerated files:")
-    print(f"  - {report_path}")
-    print("  - learning_curves.png")
-    print("  - kpi_comparison.png")
-    print("  - improvement_metrics.png")
-    print("  - projection_summary.md")
-    print("\n" + "="*70 + "\n")
+    if cache is not None:
+        cache.put(cache_key, [runs.artifact_path(run_id, name) for name in PROJECTION_ARTIFACTS])
+    
+    runs.complete_run(run_id, parameters)
+    print_generated_files(run_id, run_dir)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,77 @@
+"""
+Checkpoint and Resume for the Adaptive Learning Projection
+Periodically saves the running state so an interrupted run can continue
+"""
+
+import os
+import pickle
+import time
+from typing import Dict, Optional
+
+CHECKPOINT_VERSION = 2
+
+# Seconds between checkpoints
+DEFAULT_CHECKPOINT_INTERVAL = 60.0
+
+
+class SimulationCheckpoint:
+    """
+    Atomic pickle checkpoint of a running simulation
+
+    A checkpoint holds the simulation parameters, the index of the next chunk
+    task, the cohort accumulators, pending paired outcomes, the number of
+    records already written to the sink and - in serial runs - the state of
+    the chunk in progress (its students with their RNG streams, the chunk
+    accumulator, its session-results block and the next session index).
+    """
+
+    def __init__(self, path: str, interval: float = DEFAULT_CHECKPOINT_INTERVAL):
+        """
+        Args:
+            path: Checkpoint file
+            interval: Minimum seconds between checkpoints (0 = at every chunk and session)
+        """
+        self.path = path
+        self.interval = interval
+        self.last_saved = time.monotonic()
+
+    def due(self) -> bool:
+        """Whether the checkpoint interval has elapsed"""
+        return time.monotonic() - self.last_saved >= self.interval
+
+    def save(self, state: Dict):
+        """Write the state to a temporary file and atomically replace the checkpoint"""
+        temp_path = f'{self.path}.tmp-{os.getpid()}'
+        with open(temp_path, 'wb') as f:
+            pickle.dump({'version': CHECKPOINT_VERSION, **state}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self.last_saved = time.monotonic()
+
+    def load(self, parameters: Dict) -> Optional[Dict]:
+        """
+        Load the checkpoint if it exists and was written for the same parameters
+
+        Returns:
+            Saved state, or None to start from scratch
+        """
+        if not os.path.exists(self.path):
+            return None
+
+        with open(self.path, 'rb') as f:
+            state = pickle.load(f)
+
+        if state.get('version') != CHECKPOINT_VERSION:
+            print(f"⚠ Ignoring checkpoint {self.path}: unsupported version")
+            return None
+        if state['parameters'] != parameters:
+            print(f"⚠ Ignoring checkpoint {self.path}: written for different parameters")
+            return None
+        return state
+
+    def remove(self):
+        """Delete the checkpoint once the run has completed"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
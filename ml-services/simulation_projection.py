@@ -1,22 +1,70 @@
 """
 Adaptive Learning Outcome Projection System
 Compares DKT Adaptive Learning vs Baseline Static Learning
+
+Headless: plotting libraries are only imported by visualize_projection, and
+TensorFlow only once a DKT model is actually loaded.
 """
 
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+import sys
 import numpy as np
-import pandas as pd
 import json
 import os
-from typing import List, Dict, Tuple, Optional
+from collections import deque
+from typing import List, Dict, Tuple, Optional, Callable
 from datetime import datetime
-import matplotlib.pyplot as plt
-import seaborn as sns
-from dkt_model import DKTModel
-import tensorflow as tf
+from simulation_stream import (SimulationSink, CohortAccumulator, PairedAccumulator,
+                               SESSION_METRICS, OUTCOME_METRICS, QUESTIONS_PER_SESSION)
+from simulation_checkpoint import SimulationCheckpoint, DEFAULT_CHECKPOINT_INTERVAL
+from syllabus_graph import SyllabusGraph, DEFAULT_SYLLABUS_PATH
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
 # Set random seed for reproducibility
-np.random.seed(42)
-tf.random.set_seed(42)
+DEFAULT_SEED = 42
+
+# Simulated cohorts: group name -> (recommendation strategy, with XAI explanations)
+STRATEGY_GROUPS = {
+    'baseline': ('baseline', False),
+    'dkt': ('dkt', False),
+    'dkt_xai': ('dkt', True)
+}
+
+# Probability that a student follows the recommended question, per cohort
+DEFAULT_ENGAGEMENT_PROBS = {
+    'baseline': 0.80,  # 80% follow baseline
+    'dkt': 0.85,       # 85% follow without XAI
+    'dkt_xai': 0.95    # 95% follow recommendation with XAI
+}
+
+# Mastery added to each prerequisite of a topic answered correctly
+PREREQUISITE_GAIN = 0.01
+
+# Students simulated and accumulated together; results depend on it (through
+# floating-point summation order) but never on the worker count
+DEFAULT_CHUNK_SIZE = 25
+
+# Interactions fed to the DKT model (only these are kept per student)
+DKT_HISTORY_WINDOW = 20
+
+# Seconds spent importing this module and its dependencies
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None where unsupported)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
 
 class AdaptiveLearningSimulation:
     """
@@ -25,39 +73,64 @@ class AdaptiveLearningSimulation:
     
     def __init__(self, model_path: str = 'dkt_trained_model.keras', 
                  target_topic: str = 'G11_16', target_mastery: float = 0.85,
-                 num_students: int = 100, num_sessions: int = 50):
+                 num_students: int = 100, num_sessions: int = 50,
+                 seed: int = DEFAULT_SEED,
+                 engagement_probs: Optional[Dict[str, float]] = None,
+                 paired: bool = False,
+                 retire_at_mastery: bool = False,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 syllabus_path: str = DEFAULT_SYLLABUS_PATH,
+                 questions_per_difficulty: int = 10,
+                 dkt_model=None):
         """
         Initialize simulation
         
         Args:
-            model_path: Path to trained DKT model
+            model_path: Path to trained DKT model (None = headless, knowledge-based
+                recommendations without TensorFlow)
             target_topic: Topic ID to focus on (e.g., 'G11_16' for Geometric Progressions)
             target_mastery: Target mastery level (0.85 = 85%)
             num_students: Number of synthetic students
             num_sessions: Number of learning sessions to simulate
+            seed: Master seed; every student draws from its own stream derived from it
+            engagement_probs: Per-cohort probability of following a recommendation
+                (overrides DEFAULT_ENGAGEMENT_PROBS)
+            paired: Common random numbers - every cohort gets the same students and
+                the same per-answer uniform draws, and paired KPI deltas are reported
+            retire_at_mastery: Stop simulating students once they reach target_mastery;
+                the run ends early when every student has retired
+            chunk_size: Students held in memory at a time per cohort
+            syllabus_path: JSON array of SyllabusTopic documents with prerequisites
+            questions_per_difficulty: Synthetic questions per difficulty level per
+                topic (sets the question bank size)
+            dkt_model: Already loaded DKT model to reuse instead of loading model_path
         """
+        init_started = time.perf_counter()
         self.model_path = model_path
         self.target_topic = target_topic
         self.target_mastery = target_mastery
         self.num_students = num_students
         self.num_sessions = num_sessions
-        
-        # Topic mapping (G11_16 = Geometric Progressions)
-        self.topic_mapping = {
-            'G11_16': {
-                'id': 16,  # Assuming topic_id 16 for G11_16
-                'name': 'Geometric Progressions',
-                'prerequisites': ['G10_03', 'G10_11', 'G10_14'],  # Fractions, LCM, Linear Equations
-                'prerequisite_ids': [3, 11, 14]
-            }
-        }
+        self.seed = seed
+        self.engagement_probs = {**DEFAULT_ENGAGEMENT_PROBS, **(engagement_probs or {})}
+        self.paired = paired
+        self.retire_at_mastery = retire_at_mastery
+        self.chunk_size = chunk_size
+        self.syllabus_path = syllabus_path
+        self.questions_per_difficulty = questions_per_difficulty
+        
+        # Syllabus prerequisite graph; any topic in it can be the target
+        self.syllabus = SyllabusGraph.load(syllabus_path)
+        self.topic_mapping = {target_topic: self.syllabus.topic_info(target_topic)}
         
         # Initialize DKT model
-        self.dkt_model = None
-        self.load_dkt_model()
+        self.dkt_model = dkt_model
+        if self.dkt_model is None:
+            self.load_dkt_model()
         
         # Question bank (synthetic)
         self.question_bank = self.generate_question_bank()
+        self.build_question_index()
         
         # Results storage
         self.results = {
@@ -65,12 +138,51 @@ class AdaptiveLearningSimulation:
             'dkt': [],
             'dkt_xai': []  # DKT with XAI explanations
         }
+        
+        self.startup = {
+            'import_seconds': IMPORT_SECONDS,
+            'init_seconds': time.perf_counter() - init_started,
+            'tensorflow_loaded': 'tensorflow' in sys.modules,
+            'peak_rss_mb': peak_rss_mb()
+        }
+    
+    def get_parameters(self) -> Dict:
+        """Constructor arguments needed to rebuild this simulation (e.g. in a worker process)"""
+        return {
+            'model_path': self.model_path,
+            'target_topic': self.target_topic,
+            'target_mastery': self.target_mastery,
+            'num_students': self.num_students,
+            'num_sessions': self.num_sessions,
+            'seed': self.seed,
+            'engagement_probs': dict(self.engagement_probs),
+            'paired': self.paired,
+            'retire_at_mastery': self.retire_at_mastery,
+            'chunk_size': self.chunk_size,
+            'syllabus_path': self.syllabus_path,
+            'questions_per_difficulty': self.questions_per_difficulty
+        }
+    
+    def startup_summary(self) -> str:
+        """Import and initialization time, TensorFlow use and peak RSS"""
+        rss = self.startup['peak_rss_mb']
+        return (f"import {self.startup['import_seconds']:.2f}s, "
+                f"init {self.startup['init_seconds']:.2f}s, "
+                f"TensorFlow {'loaded' if self.startup['tensorflow_loaded'] else 'not loaded'}, "
+                f"peak RSS {f'{rss:.0f} MB' if rss is not None else 'n/a'}")
     
     def load_dkt_model(self):
-        """Load the trained DKT model"""
+        """Load the trained DKT model (the only place TensorFlow is imported)"""
+        if self.model_path is None:
+            self.dkt_model = None
+            return
         try:
             # Try to load as Keras model (.keras format)
             if os.path.exists(self.model_path):
+                os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+                import tensorflow as tf
+                tf.random.set_seed(self.seed)
+                
                 # Load the .keras model file
                 # Note: .keras files can be loaded directly
                 self.dkt_model = tf.keras.models.load_model(self.model_path, compile=False)
@@ -105,7 +217,7 @@ class AdaptiveLearningSimulation:
         for topic_id in all_topics:
             # Generate questions of varying difficulty
             for difficulty_level in ['easy', 'medium', 'hard']:
-                for i in range(10):  # 10 questions per difficulty per topic
+                for i in range(self.questions_per_difficulty):
                     difficulty_value = {'easy': 0.3, 'medium': 1.0, 'hard': 2.0}[difficulty_level]
                     
                     questions.append({
@@ -120,18 +232,42 @@ class AdaptiveLearningSimulation:
         
         return questions
     
-    def generate_synthetic_student(self, student_id: int) -> Dict:
+    def student_streams(self, group: str, student_id: int) -> Dict[str, np.random.Generator]:
+        """
+        Independent random streams for one student of one cohort
+        
+        Streams are keyed by (group, student_id) under the master seed, so a
+        student's trajectory does not depend on how students are ordered or
+        sharded across workers. In paired mode the key drops the group, so every
+        cohort sees the same students and the same engagement and answer draws.
+        
+        Returns:
+            'rng' (student profile and random picks), 'engagement_rng' (one draw
+            per recommendation) and 'answer_rng' (one draw per answer)
+        """
+        if self.paired:
+            spawn_key = (student_id,)
+        else:
+            spawn_key = (list(STRATEGY_GROUPS).index(group), student_id)
+        seed_seq = np.random.SeedSequence(self.seed, spawn_key=spawn_key)
+        rng, engagement_rng, answer_rng = [np.random.default_rng(s) for s in seed_seq.spawn(3)]
+        return {'rng': rng, 'engagement_rng': engagement_rng, 'answer_rng': answer_rng}
+    
+    def generate_synthetic_student(self, student_id: int, group: str = 'baseline') -> Dict:
         """
         Generate a synthetic student with initial state
         
         Initial Mastery: ~21% (Competency Level 2.1) in G11_16
         Overall Ability: 50 ± 5
         """
-        overall_ability = np.random.normal(50, 5)
+        streams = self.student_streams(group, student_id)
+        rng = streams['rng']
+        
+        overall_ability = rng.normal(50, 5)
         overall_ability = np.clip(overall_ability, 20, 80)
         
         # Initial mastery for target topic: ~21% (2.1/10)
-        target_mastery_initial = np.random.normal(0.21, 0.05)
+        target_mastery_initial = rng.normal(0.21, 0.05)
         target_mastery_initial = np.clip(target_mastery_initial, 0.10, 0.35)
         
         # Prerequisite masteries (correlated with target)
@@ -139,12 +275,12 @@ class AdaptiveLearningSimulation:
         topic_info = self.topic_mapping[self.target_topic]
         for prereq_id in topic_info['prerequisite_ids']:
             # Prerequisites slightly higher than target (but still low)
-            prereq_mastery = target_mastery_initial + np.random.uniform(0.05, 0.15)
+            prereq_mastery = target_mastery_initial + rng.uniform(0.05, 0.15)
             prereq_mastery = np.clip(prereq_mastery, 0.15, 0.50)
             prereq_masteries[prereq_id] = prereq_mastery
         
         # Knowledge state vector (100 skills)
-        knowledge_vector = np.random.uniform(0.15, 0.45, 100)
+        knowledge_vector = rng.uniform(0.15, 0.45, 100)
         
         # Set specific masteries
         knowledge_vector[topic_info['id']] = target_mastery_initial
@@ -152,14 +288,24 @@ class AdaptiveLearningSimulation:
             if prereq_id < len(knowledge_vector):
                 knowledge_vector[prereq_id] = mastery
         
+        anxiety_level = rng.uniform(0.2, 0.6)  # Math anxiety (0-1)
+        
         return {
             'student_id': student_id,
             'overall_ability': overall_ability,
             'initial_mastery': target_mastery_initial,
             'knowledge_vector': knowledge_vector,
-            'history': [],
-            'anxiety_level': np.random.uniform(0.2, 0.6),  # Math anxiety (0-1)
-            'time_efficiency': np.random.uniform(0.7, 1.3)  # Time multiplier
+            'history': deque(maxlen=DKT_HISTORY_WINDOW),
+            'num_attempts': 0,
+            'num_failures': 0,
+            'anxiety_level': anxiety_level,
+            'initial_anxiety': anxiety_level,
+            'time_efficiency': rng.uniform(0.7, 1.3),  # Time multiplier
+            'recommendations_followed': 0,
+            'attempted': np.zeros(len(self.question_bank), dtype=bool),
+            'sessions_completed': 0,
+            'mastery_session': None,  # First session ending at or above target mastery
+            **streams
         }
     
     def simulate_answer(self, student: Dict, question: Dict) -> Tuple[bool, float]:
@@ -190,7 +336,7 @@ class AdaptiveLearningSimulation:
         success_prob = np.clip(success_prob, 0.05, 0.95)
         
         # Determine if correct
-        is_correct = np.random.random() < success_prob
+        is_correct = student['answer_rng'].random() < success_prob
         
         # Time taken (seconds)
         base_time = 30 + difficulty * 20  # Base time increases with difficulty
@@ -231,49 +377,73 @@ class AdaptiveLearningSimulation:
         # Update knowledge vector
         student['knowledge_vector'][topic_id] = mastery
         
-        # Prerequisite learning: if target topic improves, prerequisites also improve slightly
-        topic_info = self.topic_mapping[self.target_topic]
-        if topic_id == topic_info['id'] and is_correct:
-            for prereq_id in topic_info['prerequisite_ids']:
-                if prereq_id < len(student['knowledge_vector']):
-                    # Small improvement in prerequisites
-                    student['knowledge_vector'][prereq_id] = min(
-                        1.0,
-                        student['knowledge_vector'][prereq_id] + 0.01
-                    )
+        # Prerequisite learning: a topic answered correctly also improves its
+        # prerequisites slightly, along the syllabus graph
+        if is_correct:
+            self.syllabus.propagate(student['knowledge_vector'], topic_id, PREREQUISITE_GAIN)
+    
+    def build_question_index(self):
+        """
+        Columnar view of the question bank for vectorized recommendation
+        
+        Question ids are positions in the bank, so a per-student boolean
+        'attempted' mask replaces scans over attempted-id sets.
+        """
+        self.question_topics = np.array([q['topic_id'] for q in self.question_bank], dtype=np.int64)
+        self.question_difficulties = np.array([q['difficulty'] for q in self.question_bank], dtype=float)
+        self.question_is_target = np.array([q['target_topic'] for q in self.question_bank], dtype=bool)
+        
+        # Easiest first; stable so equal difficulties keep bank order
+        self.difficulty_order = np.argsort(self.question_difficulties, kind='stable')
+    
+    def predicted_success(self, knowledge_vector: np.ndarray) -> np.ndarray:
+        """Predicted success rate of every question in the bank"""
+        in_range = self.question_topics < len(knowledge_vector)
+        mastery = np.full(len(self.question_bank), 0.3)
+        mastery[in_range] = knowledge_vector[self.question_topics[in_range]]
+        
+        predicted = mastery * (1 - self.question_difficulties / 3.0)
+        return np.clip(predicted, 0.1, 0.9)
     
-    def baseline_recommendation(self, student: Dict, attempted_question_ids: set) -> Optional[Dict]:
+    def best_unattempted(self, scores: np.ndarray, attempted: np.ndarray) -> Dict:
+        """Highest-scoring unattempted question (first one on ties)"""
+        # Prefer the target topic
+        scores = np.where(self.question_is_target, scores * 1.2, scores)
+        scores[attempted] = -np.inf
+        return self.question_bank[int(np.argmax(scores))]
+    
+    def baseline_recommendation(self, student: Dict, attempted: np.ndarray) -> Optional[Dict]:
         """
         Baseline strategy: Recommend easiest unattempted question
         (Static, non-adaptive)
-        """
-        unattempted = [q for q in self.question_bank 
-                      if q['question_id'] not in attempted_question_ids]
         
-        if not unattempted:
+        Args:
+            attempted: Boolean mask over the question bank
+        """
+        remaining = ~attempted[self.difficulty_order]
+        if not remaining.any():
             return None
         
-        # Sort by difficulty (easiest first)
-        unattempted.sort(key=lambda x: x['difficulty'])
-        return unattempted[0]
+        # First unset bit in difficulty order
+        return self.question_bank[int(self.difficulty_order[np.argmax(remaining)])]
     
-    def dkt_recommendation(self, student: Dict, attempted_question_ids: set) -> Optional[Dict]:
+    def dkt_recommendation(self, student: Dict, attempted: np.ndarray) -> Optional[Dict]:
         """
         DKT strategy: Use model to recommend optimal question
-        """
-        unattempted = [q for q in self.question_bank 
-                      if q['question_id'] not in attempted_question_ids]
         
-        if not unattempted:
+        Args:
+            attempted: Boolean mask over the question bank
+        """
+        if attempted.all():
             return None
         
         if self.dkt_model is None:
             # Fallback: Use knowledge-based recommendation
-            return self.knowledge_based_recommendation(student, unattempted)
+            return self.knowledge_based_recommendation(student, attempted)
         
         # Prepare student history for DKT model
         student_history = []
-        for interaction in student['history'][-20:]:  # Last 20 interactions
+        for interaction in student['history']:  # Last 20 interactions
             student_history.append({
                 'question_id': interaction['question_id'],
                 'topic_id': interaction['topic_id'],
@@ -285,92 +455,52 @@ class AdaptiveLearningSimulation:
         # Predict knowledge state
         try:
             # Use DKT model to predict knowledge state
-            knowledge_vector = self.predict_knowledge_state_dkt(student_history)
+            knowledge_vector = self.predict_knowledge_state_dkt(student_history, student['rng'])
             
             # Find optimal question based on predicted learning reward
-            best_question = None
-            best_reward = -1
+            predicted_success = self.predicted_success(knowledge_vector)
             
-            for question in unattempted:
-                topic_id = question['topic_id']
-                difficulty = question['difficulty']
-                
-                # Get predicted mastery for this topic
-                if topic_id < len(knowledge_vector):
-                    predicted_mastery = knowledge_vector[topic_id]
-                else:
-                    predicted_mastery = 0.3
-                
-                # Calculate predicted success rate
-                predicted_success = predicted_mastery * (1 - difficulty / 3.0)
-                predicted_success = np.clip(predicted_success, 0.1, 0.9)
-                
-                # Learning reward: balance between challenge and success
-                # Optimal zone: 60-80% success rate
-                if 0.6 <= predicted_success <= 0.8:
-                    reward = predicted_success * 2.0  # High reward in optimal zone
-                elif predicted_success < 0.6:
-                    reward = predicted_success * 0.5  # Low reward if too hard
-                else:
-                    reward = (1 - predicted_success) * 0.5  # Low reward if too easy
-                
-                # Bonus for target topic
-                if question['target_topic']:
-                    reward *= 1.2
-                
-                if reward > best_reward:
-                    best_reward = reward
-                    best_question = question
+            # Learning reward: balance between challenge and success
+            # Optimal zone: 60-80% success rate
+            reward = np.where(
+                (predicted_success >= 0.6) & (predicted_success <= 0.8),
+                predicted_success * 2.0,            # High reward in optimal zone
+                np.where(predicted_success < 0.6,
+                         predicted_success * 0.5,   # Low reward if too hard
+                         (1 - predicted_success) * 0.5)  # Low reward if too easy
+            )
             
-            return best_question if best_question else unattempted[0]
+            return self.best_unattempted(reward, attempted)
             
         except Exception as e:
             print(f"Error in DKT recommendation: {e}")
-            return self.knowledge_based_recommendation(student, unattempted)
+            return self.knowledge_based_recommendation(student, attempted)
     
-    def knowledge_based_recommendation(self, student: Dict, unattempted: List[Dict]) -> Dict:
+    def knowledge_based_recommendation(self, student: Dict, attempted: np.ndarray) -> Dict:
         """Fallback recommendation based on knowledge state"""
-        best_question = None
-        best_score = -1
+        predicted_success = self.predicted_success(student['knowledge_vector'])
         
-        for question in unattempted:
-            topic_id = question['topic_id']
-            difficulty = question['difficulty']
-            
-            if topic_id < len(student['knowledge_vector']):
-                mastery = student['knowledge_vector'][topic_id]
-            else:
-                mastery = 0.3
-            
-            # Score: prefer questions in optimal learning zone
-            predicted_success = mastery * (1 - difficulty / 3.0)
-            predicted_success = np.clip(predicted_success, 0.1, 0.9)
-            
-            if 0.6 <= predicted_success <= 0.8:
-                score = predicted_success * 2.0
-            else:
-                score = predicted_success
-            
-            if question['target_topic']:
-                score *= 1.2
-            
-            if score > best_score:
-                best_score = score
-                best_question = question
+        # Score: prefer questions in optimal learning zone
+        score = np.where((predicted_success >= 0.6) & (predicted_success <= 0.8),
+                         predicted_success * 2.0, predicted_success)
         
-        return best_question if best_question else unattempted[0]
+        return self.best_unattempted(score, attempted)
     
-    def predict_knowledge_state_dkt(self, student_history: List[Dict]) -> np.ndarray:
+    def predict_knowledge_state_dkt(self, student_history: List[Dict],
+                                    rng: Optional[np.random.Generator] = None) -> np.ndarray:
         """Predict knowledge state using DKT model"""
+        if rng is None:
+            rng = np.random.default_rng(self.seed)
+        
         if not student_history or self.dkt_model is None:
             # Return default knowledge vector
-            return np.random.uniform(0.2, 0.4, 100)
+            return rng.uniform(0.2, 0.4, 100)
         
         try:
             # Prepare input sequence
             max_length = len(student_history)
             if max_length == 0:
-                return np.random.uniform(0.2, 0.4, 100)
+                return rng.uniform(0.2, 0.4, 100)
             
             # Ensure minimum length for model
             if max_length < 1:
@@ -421,7 +551,7 @@ class AdaptiveLearningSimulation:
                 knowledge_state = predictions[0, :]
             else:
                 # Unexpected shape, return default
-                return np.random.uniform(0.2, 0.4, 100)
+                return rng.uniform(0.2, 0.4, 100)
             
             # Ensure correct size (100 skills)
             if len(knowledge_state) < 100:
@@ -437,10 +567,11 @@ class AdaptiveLearningSimulation:
             
         except Exception as e:
             # Silent fallback - model may have different structure
-            return np.random.uniform(0.2, 0.4, 100)
+            return rng.uniform(0.2, 0.4, 100)
     
     def simulate_session(self, student: Dict, strategy: str, 
-                        with_xai: bool = False) -> Dict:
+                        with_xai: bool = False,
+                        out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Simulate one learning session
         
@@ -448,30 +579,27 @@ class AdaptiveLearningSimulation:
             student: Student dictionary
             strategy: 'baseline' or 'dkt'
             with_xai: Whether to provide XAI explanations (affects engagement)
+            out: Row to write the session metrics into (a slice of a preallocated block)
         
         Returns:
-            Session metrics
+            Session metrics in SESSION_METRICS order
         """
-        attempted_question_ids = {h['question_id'] for h in student['history']}
-        questions_per_session = 5  # 5 questions per session
+        attempted = student['attempted']
         
-        session_results = {
-            'questions_attempted': 0,
-            'questions_correct': 0,
-            'total_time': 0,
-            'recommendations_followed': 0,
-            'failure_rate': 0,
-            'anxiety_change': 0
-        }
+        questions_attempted = 0
+        questions_correct = 0
+        total_time = 0.0
+        recommendations_followed = 0
+        failures = 0
         
         initial_anxiety = student['anxiety_level']
         
-        for _ in range(questions_per_session):
+        for _ in range(QUESTIONS_PER_SESSION):
             # Get recommendation
             if strategy == 'baseline':
-                recommended = self.baseline_recommendation(student, attempted_question_ids)
+                recommended = self.baseline_recommendation(student, attempted)
             else:  # dkt
-                recommended = self.dkt_recommendation(student, attempted_question_ids)
+                recommended = self.dkt_recommendation(student, attempted)
             
             if recommended is None:
                 break
@@ -479,22 +607,22 @@ class AdaptiveLearningSimulation:
             # XAI effect: Higher engagement if explanation provided
             if with_xai and strategy == 'dkt':
                 # XAI increases trust and engagement
-                engagement_prob = 0.95  # 95% follow recommendation with XAI
+                engagement_prob = self.engagement_probs['dkt_xai']
             elif strategy == 'dkt':
-                engagement_prob = 0.85  # 85% follow without XAI
+                engagement_prob = self.engagement_probs['dkt']
             else:
-                engagement_prob = 0.80  # 80% follow baseline
+                engagement_prob = self.engagement_probs['baseline']
             
             # Student may skip recommendation (engagement)
-            if np.random.random() < engagement_prob:
+            if student['engagement_rng'].random() < engagement_prob:
                 question = recommended
-                session_results['recommendations_followed'] += 1
+                recommendations_followed += 1
+                student['recommendations_followed'] += 1
             else:
                 # Pick random unattempted question
-                unattempted = [q for q in self.question_bank 
-                             if q['question_id'] not in attempted_question_ids]
-                if unattempted:
-                    question = np.random.choice(unattempted)
+                unattempted = np.flatnonzero(~attempted)
+                if len(unattempted):
+                    question = self.question_bank[int(unattempted[student['rng'].integers(len(unattempted))])]
                 else:
                     break
             
@@ -511,34 +639,194 @@ class AdaptiveLearningSimulation:
                 'is_correct': is_correct,
                 'time_taken': time_taken,
                 'attempts': 1,
-                'session': len(student['history']) // questions_per_session
+                'session': student['sessions_completed']
             }
             student['history'].append(interaction)
-            attempted_question_ids.add(question['question_id'])
+            if 'interaction_log' in student:
+                student['interaction_log'].append(interaction)
+            attempted[question['question_id']] = True
             
             # Update metrics
-            session_results['questions_attempted'] += 1
+            questions_attempted += 1
+            student['num_attempts'] += 1
             if is_correct:
-                session_results['questions_correct'] += 1
+                questions_correct += 1
             else:
-                session_results['failure_rate'] += 1
-            session_results['total_time'] += time_taken
+                failures += 1
+                student['num_failures'] += 1
+            total_time += time_taken
         
         # Calculate failure rate
-        if session_results['questions_attempted'] > 0:
-            session_results['failure_rate'] /= session_results['questions_attempted']
+        failure_rate = failures / questions_attempted if questions_attempted > 0 else 0.0
         
         # Anxiety change: Lower failure rate = lower anxiety
-        anxiety_reduction = (1 - session_results['failure_rate']) * 0.05
+        anxiety_reduction = (1 - failure_rate) * 0.05
         if with_xai:
             anxiety_reduction *= 1.2  # XAI provides more reassurance
         student['anxiety_level'] = max(0.1, initial_anxiety - anxiety_reduction)
-        session_results['anxiety_change'] = initial_anxiety - student['anxiety_level']
         
-        return session_results
+        if out is None:
+            out = np.empty(len(SESSION_METRICS))
+        # Same order as SESSION_METRICS
+        out[:] = (questions_attempted, questions_correct, total_time,
+                  recommendations_followed, failure_rate,
+                  initial_anxiety - student['anxiety_level'])
+        return out
+    
+    def generate_cohort(self, group: str, student_ids) -> List[Dict]:
+        """Generate the synthetic students of one cohort"""
+        return [self.generate_synthetic_student(i, group) for i in student_ids]
     
-    def run_simulation(self):
-        """Run full simulation for all students and strategies"""
+    def is_active(self, student: Dict) -> bool:
+        """Whether a student still takes sessions"""
+        return not (self.retire_at_mastery and student['mastery_session'] is not None)
+    
+    def simulate_cohort_session(self, students: List[Dict], group: str,
+                                session_values: np.ndarray) -> np.ndarray:
+        """
+        Simulate one session for every active student in a cohort
+        
+        Records the session in which each student first reaches target mastery.
+        
+        Args:
+            session_values: Preallocated (students, SESSION_METRICS) block that
+                receives each active student's session metrics
+        
+        Returns:
+            Boolean mask of the students that took the session
+        """
+        strategy, with_xai = STRATEGY_GROUPS[group]
+        topic_id = self.topic_mapping[self.target_topic]['id']
+        
+        active = np.zeros(len(students), dtype=bool)
+        for i, student in enumerate(students):
+            if not self.is_active(student):
+                continue
+            self.simulate_session(student, strategy, with_xai=with_xai, out=session_values[i])
+            active[i] = True
+            
+            student['sessions_completed'] += 1
+            if (student['mastery_session'] is None and
+                    student['knowledge_vector'][topic_id] >= self.target_mastery):
+                student['mastery_session'] = student['sessions_completed']
+        
+        return active
+    
+    def drain_interactions(self, students: List[Dict]) -> List[Dict]:
+        """Collect and clear the interactions logged since the last call"""
+        interactions = []
+        for student in students:
+            for interaction in student['interaction_log']:
+                interactions.append({'student_id': student['student_id'], **interaction,
+                                     'is_correct': bool(interaction['is_correct'])})
+            student['interaction_log'].clear()
+        return interactions
+    
+    def chunk_ranges(self) -> List[Tuple[int, int]]:
+        """Contiguous student ranges that are simulated and accumulated together"""
+        return [(start, min(start + self.chunk_size, self.num_students))
+                for start in range(0, self.num_students, self.chunk_size)]
+    
+    def simulate_chunk(self, group: str, start: int, stop: int,
+                       sink: Optional[SimulationSink] = None,
+                       record_interactions: bool = False,
+                       state: Optional[Dict] = None,
+                       on_session: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        Simulate students [start, stop) of one cohort through every session
+        
+        Only this chunk's students are held in memory. Their session results
+        are written into a preallocated (sessions, students, SESSION_METRICS)
+        block, folded into a CohortAccumulator in one reduction, and the
+        students are dropped.
+        
+        Args:
+            sink: Stream interactions straight to this sink (serial runs)
+            record_interactions: Return the interactions instead (worker processes)
+            state: Chunk state from a checkpoint to continue from
+            on_session: Called with the chunk state after every session (checkpointing)
+        
+        Returns:
+            Chunk summary: group, start, stop, accumulator, per-student outcomes
+            and any returned interactions
+        """
+        log_interactions = record_interactions or (sink is not None and sink.records_interactions)
+        if state is None:
+            students = self.generate_cohort(group, range(start, stop))
+            if log_interactions:
+                for student in students:
+                    student['interaction_log'] = []
+            state = {
+                'students': students,
+                'accumulator': CohortAccumulator(self.num_sessions),
+                'session_values': np.zeros((self.num_sessions, len(students), len(SESSION_METRICS))),
+                'active': np.zeros((self.num_sessions, len(students)), dtype=bool),
+                'interactions': [],
+                'session': 0
+            }
+        students = state['students']
+        accumulator = state['accumulator']
+        interactions = state['interactions']
+        session_values = state['session_values']
+        
+        for session in range(state['session'], self.num_sessions):
+            if not any(self.is_active(s) for s in students):
+                break
+            state['active'][session] = self.simulate_cohort_session(students, group,
+                                                                    session_values[session])
+            
+            if log_interactions:
+                session_interactions = self.drain_interactions(students)
+                if sink is not None:
+                    sink.write_interactions(group, session_interactions)
+                else:
+                    interactions.extend(session_interactions)
+            
+            state['session'] = session + 1
+            if on_session is not None:
+                on_session(state)
+        
+        accumulator.add_sessions(session_values, state['active'])
+        outcomes = self.student_outcomes(students)
+        accumulator.add_students(
+            outcomes,
+            np.array([s['initial_mastery'] for s in students]),
+            np.array([s['mastery_session'] or 0 for s in students], dtype=np.int64)
+        )
+        
+        return {
+            'group': group,
+            'start': start,
+            'stop': stop,
+            'accumulator': accumulator,
+            'outcomes': outcomes,
+            'interactions': interactions
+        }
+    
+    def run_simulation(self, num_workers: int = 1, sink: Optional[SimulationSink] = None,
+                       checkpoint_path: Optional[str] = None,
+                       checkpoint_interval: float = DEFAULT_CHECKPOINT_INTERVAL,
+                       resume: bool = False,
+                       progress_callback: Optional[Callable[[int, int], None]] = None):
+        """
+        Run full simulation for all students and strategies
+        
+        Students are simulated chunk by chunk and folded into running
+        accumulators, so memory does not grow with num_students.
+        
+        Args:
+            num_workers: Number of worker processes; results are identical
+                for any worker count
+            sink: Optional SimulationSink receiving interactions, session
+                aggregates and KPIs as they become available
+            checkpoint_path: Periodically save the run state here; it is
+                removed once the run completes
+            checkpoint_interval: Minimum seconds between checkpoints
+            resume: Continue from checkpoint_path if it exists; the output is
+                identical to an uninterrupted run
+            progress_callback: Called with (students_done, num_students) after
+                every chunk of students has run under all strategies
+        """
         print(f"\n{'='*60}")
         print("ADAPTIVE LEARNING OUTCOME PROJECTION")
         print(f"{'='*60}")
@@ -546,145 +834,194 @@ class AdaptiveLearningSimulation:
         print(f"Sessions: {self.num_sessions}")
         print(f"Target Topic: {self.target_topic} ({self.topic_mapping[self.target_topic]['name']})")
         print(f"Target Mastery: {self.target_mastery * 100}%")
+        print(f"Startup: {self.startup_summary()}")
         print(f"{'='*60}\n")
         
-        # Generate students
-        students_baseline = [self.generate_synthetic_student(i) for i in range(self.num_students)]
-        students_dkt = [self.generate_synthetic_student(i) for i in range(self.num_students)]
-        students_dkt_xai = [self.generate_synthetic_student(i) for i in range(self.num_students)]
+        tasks = [(group, start, stop) for start, stop in self.chunk_ranges()
+                 for group in STRATEGY_GROUPS]
+        run_state = {
+            'parameters': self.get_parameters(),
+            'next_task': 0,
+            'accumulators': {group: CohortAccumulator(self.num_sessions) for group in STRATEGY_GROUPS},
+            'paired': PairedAccumulator() if self.paired else None,
+            'chunk_outcomes': {},
+            'chunk_state': None,
+            'sink_records': 0
+        }
         
-        # Run simulations
-        for session in range(self.num_sessions):
-            if (session + 1) % 10 == 0:
-                print(f"Progress: Session {session + 1}/{self.num_sessions}")
-            
-            # Baseline group
-            baseline_session_results = []
-            for student in students_baseline:
-                result = self.simulate_session(student, 'baseline', with_xai=False)
-                baseline_session_results.append(result)
-            
-            # DKT group
-            dkt_session_results = []
-            for student in students_dkt:
-                result = self.simulate_session(student, 'dkt', with_xai=False)
-                dkt_session_results.append(result)
+        checkpoint = SimulationCheckpoint(checkpoint_path, checkpoint_interval) if checkpoint_path else None
+        if checkpoint is not None and resume:
+            saved_state = checkpoint.load(run_state['parameters'])
+            if saved_state is not None:
+                run_state.update(saved_state)
+                print(f"✓ Resumed from checkpoint {checkpoint_path} "
+                      f"(chunk {run_state['next_task'] + 1}/{len(tasks)})")
+        if sink is not None and resume:
+            sink.truncate(run_state['sink_records'])
+        
+        def save_checkpoint(chunk_state: Optional[Dict] = None):
+            if checkpoint is None or not checkpoint.due():
+                return
+            if sink is not None:
+                sink.flush()
+                run_state['sink_records'] = sink.records_written
+            run_state['chunk_state'] = chunk_state
+            checkpoint.save(run_state)
+        
+        accumulators = run_state['accumulators']
+        paired = run_state['paired']
+        remaining_tasks = tasks[run_state['next_task']:]
+        
+        if num_workers > 1:
+            from parallel_projection import run_parallel_chunks
+            record_interactions = sink is not None and sink.records_interactions
+            if run_state['chunk_state'] is not None and remaining_tasks:
+                # A serial checkpoint taken inside a chunk: finish that chunk here,
+                # from its saved state, so its streamed records are not written twice
+                def resumed_chunks(resumed_chunk=run_state['chunk_state']):
+                    yield self.simulate_chunk(*remaining_tasks[0], sink=sink,
+                                              state=resumed_chunk, on_session=save_checkpoint)
+                    yield from run_parallel_chunks(self, remaining_tasks[1:], num_workers,
+                                                   record_interactions)
+                chunks = resumed_chunks()
+            else:
+                chunks = run_parallel_chunks(self, remaining_tasks, num_workers, record_interactions)
+        else:
+            # Only serial runs checkpoint inside a chunk, after every session
+            resumed_chunk = run_state['chunk_state']
+            chunks = (self.simulate_chunk(*task, sink=sink,
+                                          state=resumed_chunk if i == 0 else None,
+                                          on_session=save_checkpoint)
+                      for i, task in enumerate(remaining_tasks))
+        
+        # Merge chunks in task order so sums do not depend on the worker count
+        chunk_outcomes = run_state['chunk_outcomes']
+        for chunk in chunks:
+            group = chunk['group']
+            accumulators[group].merge(chunk['accumulator'])
+            if sink is not None and chunk['interactions']:
+                sink.write_interactions(group, chunk['interactions'])
             
-            # DKT + XAI group
-            dkt_xai_session_results = []
-            for student in students_dkt_xai:
-                result = self.simulate_session(student, 'dkt', with_xai=True)
-                dkt_xai_session_results.append(result)
+            chunk_outcomes[group] = chunk['outcomes']
+            if len(chunk_outcomes) == len(STRATEGY_GROUPS):
+                if paired is not None:
+                    paired.add_students(chunk_outcomes)
+                chunk_outcomes.clear()
+                print(f"Progress: Students {chunk['stop']}/{self.num_students}")
+                if progress_callback is not None:
+                    progress_callback(chunk['stop'], self.num_students)
             
-            # Calculate session averages
-            self.results['baseline'].append(self.aggregate_session_results(baseline_session_results))
-            self.results['dkt'].append(self.aggregate_session_results(dkt_session_results))
-            self.results['dkt_xai'].append(self.aggregate_session_results(dkt_xai_session_results))
+            run_state['next_task'] += 1
+            save_checkpoint()
+        
+        sessions_run = max(acc.sessions_run() for acc in accumulators.values())
+        if sessions_run < self.num_sessions and self.retire_at_mastery:
+            print(f"All students reached target mastery after {sessions_run} sessions")
+        self.results = {group: acc.session_aggregates(sessions_run)
+                        for group, acc in accumulators.items()}
         
         # Calculate final KPIs
-        self.calculate_kpis(students_baseline, students_dkt, students_dkt_xai)
+        self.calculate_kpis(accumulators)
+        if paired is not None:
+            self.calculate_paired_deltas(paired, accumulators)
+        
+        if sink is not None:
+            sink.write_sessions(self.results)
+            sink.write('kpis', kpis=self.kpis, time_to_mastery=self.time_to_mastery,
+                       outcome_distributions=self.outcome_distributions)
+        
+        if checkpoint is not None:
+            checkpoint.remove()
         
         print("\n✓ Simulation completed!")
     
-    def aggregate_session_results(self, session_results: List[Dict]) -> Dict:
-        """Aggregate results across students for one session"""
-        return {
-            'avg_questions_attempted': np.mean([r['questions_attempted'] for r in session_results]),
-            'avg_questions_correct': np.mean([r['questions_correct'] for r in session_results]),
-            'avg_total_time': np.mean([r['total_time'] for r in session_results]),
-            'avg_recommendations_followed': np.mean([r['recommendations_followed'] for r in session_results]),
-            'avg_failure_rate': np.mean([r['failure_rate'] for r in session_results]),
-            'avg_anxiety_change': np.mean([r['anxiety_change'] for r in session_results])
-        }
-    
-    def calculate_kpis(self, students_baseline: List[Dict], 
-                       students_dkt: List[Dict], 
-                       students_dkt_xai: List[Dict]):
-        """Calculate Key Performance Indicators"""
-        topic_id = self.topic_mapping[self.target_topic]['id']
+    def calculate_kpis(self, accumulators: Dict[str, CohortAccumulator]):
+        """
+        Calculate Key Performance Indicators from the cohort accumulators
         
-        # Extract final masteries
-        baseline_masteries = [s['knowledge_vector'][topic_id] for s in students_baseline 
-                             if topic_id < len(s['knowledge_vector'])]
-        dkt_masteries = [s['knowledge_vector'][topic_id] for s in students_dkt 
-                        if topic_id < len(s['knowledge_vector'])]
-        dkt_xai_masteries = [s['knowledge_vector'][topic_id] for s in students_dkt_xai 
-                            if topic_id < len(s['knowledge_vector'])]
+        Every KPI is a vectorized reduction over (cohort, session, metric)
+        arrays stacked from the accumulators, so the cost does not depend on
+        the number of students.
+        """
+        groups = list(STRATEGY_GROUPS)
+        num_students = np.array([accumulators[g].num_students for g in groups], dtype=float)
+        final_mastery_sums = np.array([accumulators[g].final_mastery_sum for g in groups])
+        total_attempts = np.array([accumulators[g].total_attempts for g in groups], dtype=float)
+        final_mastery = final_mastery_sums / num_students
         
         # Initial mastery (same for all)
-        initial_mastery = np.mean([s['initial_mastery'] for s in students_baseline])
+        baseline = accumulators['baseline']
+        initial_mastery = baseline.initial_mastery_sum / baseline.num_students
         
         # KPI 1: Learning Efficacy (Average Learning Gain)
-        def learning_gain(final_mastery, initial_mastery):
-            if initial_mastery >= 1.0:
-                return 0.0
-            return (final_mastery - initial_mastery) / (1 - initial_mastery)
-        
-        baseline_gain = np.mean([learning_gain(m, initial_mastery) for m in baseline_masteries])
-        dkt_gain = np.mean([learning_gain(m, initial_mastery) for m in dkt_masteries])
-        dkt_xai_gain = np.mean([learning_gain(m, initial_mastery) for m in dkt_xai_masteries])
+        # Mean of (final - initial) / (1 - initial) over students, which is linear in final
+        if initial_mastery >= 1.0:
+            learning_gain = np.zeros(len(groups))
+        else:
+            learning_gain = (final_mastery - initial_mastery) / (1 - initial_mastery)
         
         # KPI 2: Efficiency (Attempts per Mastery Point)
-        total_attempts_baseline = sum(len(s['history']) for s in students_baseline)
-        total_attempts_dkt = sum(len(s['history']) for s in students_dkt)
-        total_attempts_dkt_xai = sum(len(s['history']) for s in students_dkt_xai)
+        mastery_gain = final_mastery - initial_mastery
+        with np.errstate(divide='ignore', invalid='ignore'):
+            efficiency = np.where(mastery_gain > 0,
+                                  total_attempts / (mastery_gain * self.num_students), np.inf)
+        
+        # Session KPIs only count sessions that still had active students
+        means = np.stack([accumulators[g].session_means() for g in groups])
+        active = np.stack([accumulators[g].session_counts for g in groups]) > 0
+        num_active = np.maximum(active.sum(axis=1), 1)
         
-        mastery_gain_baseline = np.mean(baseline_masteries) - initial_mastery
-        mastery_gain_dkt = np.mean(dkt_masteries) - initial_mastery
-        mastery_gain_dkt_xai = np.mean(dkt_xai_masteries) - initial_mastery
+        def session_mean(values: np.ndarray) -> np.ndarray:
+            return np.where(active, values, 0.0).sum(axis=1) / num_active
         
-        efficiency_baseline = total_attempts_baseline / (mastery_gain_baseline * self.num_students) if mastery_gain_baseline > 0 else float('inf')
-        efficiency_dkt = total_attempts_dkt / (mastery_gain_dkt * self.num_students) if mastery_gain_dkt > 0 else float('inf')
-        efficiency_dkt_xai = total_attempts_dkt_xai / (mastery_gain_dkt_xai * self.num_students) if mastery_gain_dkt_xai > 0 else float('inf')
+        metric = {m: means[:, :, i] for i, m in enumerate(SESSION_METRICS)}
         
         # KPI 3: Failure Rate
-        baseline_failure = np.mean([r['avg_failure_rate'] for r in self.results['baseline']])
-        dkt_failure = np.mean([r['avg_failure_rate'] for r in self.results['dkt']])
-        dkt_xai_failure = np.mean([r['avg_failure_rate'] for r in self.results['dkt_xai']])
+        failure_rate = session_mean(metric['failure_rate'])
         
         # KPI 4: Engagement Rate (XAI specific)
-        baseline_engagement = np.mean([r['avg_recommendations_followed'] / max(r['avg_questions_attempted'], 1) 
-                                      for r in self.results['baseline']])
-        dkt_engagement = np.mean([r['avg_recommendations_followed'] / max(r['avg_questions_attempted'], 1) 
-                                 for r in self.results['dkt']])
-        dkt_xai_engagement = np.mean([r['avg_recommendations_followed'] / max(r['avg_questions_attempted'], 1) 
-                                      for r in self.results['dkt_xai']])
+        engagement_rate = session_mean(metric['recommendations_followed'] /
+                                       np.maximum(metric['questions_attempted'], 1))
+        
+        # KPI 5: Anxiety Reduction
+        anxiety_reduction = session_mean(metric['anxiety_change'])
+        
+        def by_group(values: np.ndarray) -> Dict[str, float]:
+            return {g: float(v) for g, v in zip(groups, values)}
         
         # Store KPIs
         self.kpis = {
             'initial_mastery': initial_mastery,
-            'final_mastery': {
-                'baseline': np.mean(baseline_masteries),
-                'dkt': np.mean(dkt_masteries),
-                'dkt_xai': np.mean(dkt_xai_masteries)
-            },
-            'learning_gain': {
-                'baseline': baseline_gain,
-                'dkt': dkt_gain,
-                'dkt_xai': dkt_xai_gain
-            },
-            'efficiency': {
-                'baseline': efficiency_baseline,
-                'dkt': efficiency_dkt,
-                'dkt_xai': efficiency_dkt_xai
-            },
-            'failure_rate': {
-                'baseline': baseline_failure,
-                'dkt': dkt_failure,
-                'dkt_xai': dkt_xai_failure
-            },
-            'engagement_rate': {
-                'baseline': baseline_engagement,
-                'dkt': dkt_engagement,
-                'dkt_xai': dkt_xai_engagement
-            },
-            'anxiety_reduction': {
-                'baseline': np.mean([r['avg_anxiety_change'] for r in self.results['baseline']]),
-                'dkt': np.mean([r['avg_anxiety_change'] for r in self.results['dkt']]),
-                'dkt_xai': np.mean([r['avg_anxiety_change'] for r in self.results['dkt_xai']])
-            }
+            'final_mastery': by_group(final_mastery),
+            'learning_gain': by_group(learning_gain),
+            'efficiency': by_group(efficiency),
+            'failure_rate': by_group(failure_rate),
+            'engagement_rate': by_group(engagement_rate),
+            'anxiety_reduction': by_group(anxiety_reduction)
         }
         
+        # Per-student outcome distributions (mean, std, percentiles)
+        gain_scale = 1 / (1 - initial_mastery) if initial_mastery < 1.0 else 0.0
+        self.outcome_distributions = {}
+        for group in groups:
+            distributions = accumulators[group].outcome_distributions()
+            distributions['learning_gain'] = {
+                stat: (value - initial_mastery) * gain_scale if stat != 'std' else value * gain_scale
+                for stat, value in distributions['final_mastery'].items()
+            }
+            self.outcome_distributions[group] = distributions
+        
+        baseline_gain, dkt_gain, dkt_xai_gain = (self.kpis['learning_gain'][g] for g in groups)
+        efficiency_baseline, efficiency_dkt, efficiency_dkt_xai = (self.kpis['efficiency'][g] for g in groups)
+        baseline_failure, dkt_failure, dkt_xai_failure = (self.kpis['failure_rate'][g] for g in groups)
+        baseline_engagement, dkt_engagement, dkt_xai_engagement = (self.kpis['engagement_rate'][g] for g in groups)
+        
+        # KPI 6: Time to target mastery
+        self.time_to_mastery = {group: self.time_to_mastery_distribution(acc.mastery_histogram)
+                                for group, acc in accumulators.items()}
+        self.kpis['mastery_rate'] = {group: dist['mastered_fraction']
+                                     for group, dist in self.time_to_mastery.items()}
+        
         # Print results
         print(f"\n{'='*60}")
         print("KEY PERFORMANCE INDICATORS (KPIs)")
@@ -718,8 +1055,119 @@ class AdaptiveLearningSimulation:
         print(f"   DKT:          {self.kpis['anxiety_reduction']['dkt']*100:.2f}%")
         print(f"   DKT + XAI:    {self.kpis['anxiety_reduction']['dkt_xai']*100:.2f}%")
         
+        print(f"\n6. TIME TO TARGET MASTERY ({self.target_mastery*100:.0f}%)")
+        for label, group in [('Baseline:', 'baseline'), ('DKT:', 'dkt'), ('DKT + XAI:', 'dkt_xai')]:
+            dist = self.time_to_mastery[group]
+            median = f"median {dist['median']:.0f} sessions" if dist['mastered'] else "not reached"
+            print(f"   {label:13s} {dist['mastered_fraction']*100:.1f}% reached, {median}")
+        
         print(f"\n{'='*60}\n")
     
+    def time_to_mastery_distribution(self, histogram: np.ndarray) -> Dict:
+        """
+        Distribution of sessions needed to reach target mastery
+        
+        Args:
+            histogram: Student counts by mastery session (index 0 = never reached)
+        
+        Students who never reach it are right-censored: they count towards
+        the denominator of mastered_fraction but not the session statistics.
+        Percentiles match np.percentile over the expanded session list.
+        """
+        counts = np.asarray(histogram[1:], dtype=np.int64)
+        mastered = int(counts.sum())
+        total = mastered + int(histogram[0])
+        distribution = {
+            'mastered': mastered,
+            'censored': int(histogram[0]),
+            'mastered_fraction': mastered / total if total else 0.0,
+            'histogram': counts.tolist()
+        }
+        if mastered:
+            session_values = np.arange(1, len(counts) + 1)
+            cumulative = np.cumsum(counts)
+            
+            # Linear interpolation between order statistics, as np.percentile does
+            ranks = np.array([10, 25, 50, 75, 90]) / 100 * (mastered - 1)
+            lower = session_values[np.searchsorted(cumulative, np.floor(ranks), side='right')]
+            upper = session_values[np.searchsorted(cumulative, np.ceil(ranks), side='right')]
+            p10, p25, p50, p75, p90 = lower + (upper - lower) * (ranks - np.floor(ranks))
+            
+            distribution.update({
+                'mean': float(np.dot(session_values, counts) / mastered),
+                'median': float(p50),
+                'percentiles': {'p10': float(p10), 'p25': float(p25), 'p75': float(p75),
+                                'p90': float(p90)}
+            })
+        return distribution
+    
+    def student_outcomes(self, students: List[Dict]) -> Dict[str, np.ndarray]:
+        """Per-student outcome values (OUTCOME_METRICS), in student order"""
+        topic_id = self.topic_mapping[self.target_topic]['id']
+        
+        final_mastery = np.array([s['knowledge_vector'][topic_id] for s in students])
+        attempts = np.array([s['num_attempts'] for s in students], dtype=float)
+        failures = np.array([s['num_failures'] for s in students], dtype=float)
+        followed = np.array([s['recommendations_followed'] for s in students], dtype=float)
+        anxiety_change = np.array([s['initial_anxiety'] - s['anxiety_level'] for s in students])
+        
+        return {
+            'final_mastery': final_mastery,
+            'failure_rate': failures / np.maximum(attempts, 1),
+            'engagement_rate': followed / np.maximum(attempts, 1),
+            'anxiety_reduction': anxiety_change,
+            'attempts': attempts
+        }
+    
+    def calculate_paired_deltas(self, paired: PairedAccumulator,
+                                accumulators: Dict[str, CohortAccumulator],
+                                z: float = 1.96) -> Dict:
+        """
+        Paired KPI differences between cohorts (common random numbers)
+        
+        Every cohort holds the same students, so per-student differences cancel
+        population noise. The unpaired standard error of the same difference is
+        reported alongside to show the variance reduction.
+        """
+        initial_mastery = self.kpis['initial_mastery']
+        # Learning gain is final mastery rescaled by the shared initial mastery
+        gain_scale = 1 / (1 - initial_mastery) if initial_mastery < 1.0 else 0.0
+        final_index = OUTCOME_METRICS.index('final_mastery')
+        
+        self.paired_deltas = {}
+        for (treatment, control), moments in paired.deltas.items():
+            n = moments.count
+            variance = moments.variance()
+            unpaired_variance = (accumulators[treatment].outcomes.variance() +
+                                 accumulators[control].outcomes.variance())
+            
+            metrics = [(m, i, 1.0) for i, m in enumerate(OUTCOME_METRICS)]
+            metrics.insert(1, ('learning_gain', final_index, gain_scale))
+            
+            deltas = {}
+            for metric, i, scale in metrics:
+                mean_delta = float(moments.mean[i] * scale)
+                paired_se = float(np.sqrt(variance[i] / n) * scale) if n else 0.0
+                deltas[metric] = {
+                    'mean_delta': mean_delta,
+                    'variance': float(variance[i] * scale ** 2),
+                    'std_error': paired_se,
+                    'ci_low': mean_delta - z * paired_se,
+                    'ci_high': mean_delta + z * paired_se,
+                    'unpaired_std_error': float(np.sqrt(unpaired_variance[i] / n) * scale) if n else 0.0
+                }
+            self.paired_deltas[f'{treatment}_vs_{control}'] = deltas
+        
+        print("PAIRED COMPARISON (common random numbers)")
+        for name, deltas in self.paired_deltas.items():
+            gain = deltas['learning_gain']
+            print(f"   {name:22s} learning gain delta: {gain['mean_delta']:+.4f} "
+                  f"[{gain['ci_low']:+.4f}, {gain['ci_high']:+.4f}] "
+                  f"(SE {gain['std_error']:.4f} vs unpaired {gain['unpaired_std_error']:.4f})")
+        print(f"\n{'='*60}\n")
+        
+        return self.paired_deltas
+    
     def generate_report(self, output_path: str = 'simulation_report.json'):
         """Generate comprehensive report"""
         report = {
@@ -728,7 +1176,10 @@ class AdaptiveLearningSimulation:
                 'num_sessions': self.num_sessions,
                 'target_topic': self.target_topic,
                 'target_mastery': self.target_mastery,
-                'initial_mastery': self.kpis['initial_mastery']
+                'initial_mastery': self.kpis['initial_mastery'],
+                'seed': self.seed,
+                'paired': self.paired,
+                'retire_at_mastery': self.retire_at_mastery
             },
             'kpis': self.kpis,
             'session_by_session': {
@@ -744,6 +1195,10 @@ class AdaptiveLearningSimulation:
             },
             'timestamp': datetime.now().isoformat()
         }
+        report['time_to_mastery'] = self.time_to_mastery
+        report['outcome_distributions'] = self.outcome_distributions
+        if self.paired:
+            report['paired_comparison'] = self.paired_deltas
         
         with open(output_path, 'w') as f:
             json.dump(report, f, indent=2)
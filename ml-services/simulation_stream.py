@@ -0,0 +1,332 @@
+"""
+Streaming Output and Running Accumulators for the Adaptive Learning Projection
+Keeps memory flat in the number of simulated students
+"""
+
+import gzip
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Per-student session metrics produced by simulate_session
+SESSION_METRICS = [
+    'questions_attempted',
+    'questions_correct',
+    'total_time',
+    'recommendations_followed',
+    'failure_rate',
+    'anxiety_change'
+]
+
+# Per-student outcomes used for paired comparisons
+OUTCOME_METRICS = [
+    'final_mastery',
+    'failure_rate',
+    'engagement_rate',
+    'anxiety_reduction',
+    'attempts'
+]
+
+# Questions a student attempts per session (at most)
+QUESTIONS_PER_SESSION = 5
+
+# Bins of the mergeable per-student outcome histograms; percentiles are
+# exact to within one bin width (1/1000 of the outcome range)
+DISTRIBUTION_BINS = 1000
+
+# Percentiles reported for every outcome distribution
+DISTRIBUTION_PERCENTILES = [10, 25, 50, 75, 90]
+
+
+def outcome_ranges(num_sessions: int) -> np.ndarray:
+    """(low, high) of every OUTCOME_METRICS value, shape (metrics, 2)"""
+    ranges = {metric: (0.0, 1.0) for metric in OUTCOME_METRICS}
+    ranges['attempts'] = (0.0, float(max(1, num_sessions * QUESTIONS_PER_SESSION)))
+    return np.array([ranges[m] for m in OUTCOME_METRICS])
+
+
+def histogram_percentiles(histograms: np.ndarray, ranges: np.ndarray,
+                          percentiles: List[float] = DISTRIBUTION_PERCENTILES) -> np.ndarray:
+    """
+    Percentiles of binned values, interpolated linearly within bins
+
+    Args:
+        histograms: Counts, shape (metrics, bins)
+        ranges: (low, high) per metric, shape (metrics, 2)
+        percentiles: Percentiles in [0, 100]
+
+    Returns:
+        Shape (metrics, len(percentiles)); NaN for empty histograms
+    """
+    num_bins = histograms.shape[1]
+    cumulative = np.cumsum(histograms, axis=1)
+    totals = cumulative[:, -1:]
+    ranks = totals * (np.asarray(percentiles, dtype=float) / 100)
+    
+    # Bin holding each rank: number of bins whose cumulative count lies below it
+    bins = np.minimum((cumulative[:, :, None] < ranks[:, None, :]).sum(axis=1), num_bins - 1)
+    counts = np.take_along_axis(histograms, bins, axis=1)
+    before = np.take_along_axis(cumulative, bins, axis=1) - counts
+    fraction = np.clip((ranks - before) / np.maximum(counts, 1), 0.0, 1.0)
+    
+    low, high = ranges[:, :1], ranges[:, 1:]
+    values = low + (bins + fraction) * (high - low) / num_bins
+    return np.where(totals > 0, values, np.nan)
+
+
+class SimulationSink:
+    """
+    Line-delimited JSON sink for simulation output
+
+    Detail levels:
+        'kpis'         - final KPIs only
+        'sessions'     - plus per-session aggregates of every cohort
+        'interactions' - plus every simulated interaction
+    A path ending in '.gz' is gzip-compressed. With resume=True an existing
+    file is kept until run_simulation(resume=True) truncates it to the
+    records covered by the checkpoint.
+    """
+
+    DETAIL_LEVELS = ('kpis', 'sessions', 'interactions')
+
+    def __init__(self, path: str, detail: str = 'sessions', resume: bool = False):
+        if detail not in self.DETAIL_LEVELS:
+            raise ValueError(f"detail must be one of {self.DETAIL_LEVELS}, got '{detail}'")
+        self.path = path
+        self.detail = detail
+        self.records_written = 0
+        self.file = None if resume and os.path.exists(path) else self.open(path, 'w')
+
+    def open(self, path: str, mode: str):
+        if self.path.endswith('.gz'):
+            return gzip.open(path, mode + 't', encoding='utf-8')
+        return open(path, mode, encoding='utf-8')
+
+    def truncate(self, num_records: int):
+        """
+        Keep only the first num_records records (resuming from a checkpoint)
+
+        Records written after the checkpoint by the interrupted run are
+        dropped, so the resumed output matches an uninterrupted run.
+        """
+        if self.file is not None:
+            self.file.close()
+        if not os.path.exists(self.path):
+            self.file = self.open(self.path, 'w')
+            return
+        partial_path = f'{self.path}.partial'
+        os.replace(self.path, partial_path)
+
+        self.file = self.open(self.path, 'w')
+        with self.open(partial_path, 'r') as partial:
+            for _ in range(num_records):
+                self.file.write(partial.readline())
+        os.remove(partial_path)
+        self.records_written = num_records
+
+    def flush(self):
+        """Flush written records to disk (before a checkpoint refers to them)"""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    @property
+    def records_interactions(self) -> bool:
+        return self.detail == 'interactions'
+
+    @property
+    def records_sessions(self) -> bool:
+        return self.detail in ('sessions', 'interactions')
+
+    def write(self, record_type: str, **fields):
+        """Write one record as a JSON line"""
+        self.file.write(json.dumps({'type': record_type, **fields}, default=float) + '\n')
+        self.records_written += 1
+
+    def write_interactions(self, group: str, interactions: List[Dict]):
+        if self.records_interactions:
+            for interaction in interactions:
+                self.write('interaction', group=group, **interaction)
+
+    def write_sessions(self, results: Dict[str, List[Dict]]):
+        if self.records_sessions:
+            for group, sessions in results.items():
+                for session, aggregate in enumerate(sessions):
+                    self.write('session', group=group, session=session + 1, **aggregate)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RunningMoments:
+    """
+    Count, mean and sum of squared deviations of one or more metrics,
+    mergeable across chunks (Chan et al. parallel update)
+    """
+
+    def __init__(self, size: int = 1):
+        self.count = 0
+        self.mean = np.zeros(size)
+        self.m2 = np.zeros(size)
+
+    def update(self, values: np.ndarray):
+        """Add a batch of observations, shape (n, size)"""
+        values = np.asarray(values, dtype=float).reshape(len(values), -1)
+        n = len(values)
+        if n == 0:
+            return
+        batch_mean = values.mean(axis=0)
+        batch_m2 = ((values - batch_mean) ** 2).sum(axis=0)
+        self.merge_moments(n, batch_mean, batch_m2)
+
+    def merge_moments(self, n: int, mean: np.ndarray, m2: np.ndarray):
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean = self.mean + delta * n / total
+        self.m2 = self.m2 + m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+    def variance(self) -> np.ndarray:
+        """Sample variance (ddof=1)"""
+        if self.count < 2:
+            return np.zeros_like(self.mean)
+        return self.m2 / (self.count - 1)
+
+
+class CohortAccumulator:
+    """
+    Running totals for one cohort: per-session sums over active students,
+    student totals, outcome histograms and the time-to-mastery histogram
+    """
+
+    def __init__(self, num_sessions: int):
+        self.num_sessions = num_sessions
+        self.session_sums = np.zeros((num_sessions, len(SESSION_METRICS)))
+        self.session_sq_sums = np.zeros((num_sessions, len(SESSION_METRICS)))
+        self.session_counts = np.zeros(num_sessions, dtype=np.int64)
+        self.num_students = 0
+        self.initial_mastery_sum = 0.0
+        self.final_mastery_sum = 0.0
+        self.total_attempts = 0
+        self.mastery_histogram = np.zeros(num_sessions + 1, dtype=np.int64)
+        self.outcomes = RunningMoments(len(OUTCOME_METRICS))
+        self.outcome_ranges = outcome_ranges(num_sessions)
+        self.outcome_histograms = np.zeros((len(OUTCOME_METRICS), DISTRIBUTION_BINS), dtype=np.int64)
+
+    def add_sessions(self, session_values: np.ndarray, active: np.ndarray):
+        """
+        Add a chunk's session results in one reduction
+
+        Args:
+            session_values: SESSION_METRICS per session and student,
+                shape (sessions, students, metrics)
+            active: Whether each student took each session, shape (sessions, students)
+        """
+        values = np.where(active[:, :, None], session_values, 0.0)
+        self.session_sums += values.sum(axis=1)
+        self.session_sq_sums += (values ** 2).sum(axis=1)
+        self.session_counts += active.sum(axis=1)
+
+    def add_students(self, outcomes: Dict[str, np.ndarray], initial_mastery: np.ndarray,
+                     mastery_sessions: np.ndarray):
+        """
+        Add finished students
+
+        Args:
+            outcomes: Per-student OUTCOME_METRICS arrays
+            initial_mastery: Per-student initial target mastery
+            mastery_sessions: Session each student reached target mastery (0 = never)
+        """
+        self.num_students += len(initial_mastery)
+        self.initial_mastery_sum += float(np.sum(initial_mastery))
+        self.final_mastery_sum += float(np.sum(outcomes['final_mastery']))
+        self.total_attempts += int(np.sum(outcomes['attempts']))
+        self.mastery_histogram += np.bincount(mastery_sessions, minlength=self.num_sessions + 1)
+        values = np.column_stack([outcomes[m] for m in OUTCOME_METRICS])
+        self.outcomes.update(values)
+        
+        # One bincount over (metric, bin) pairs fills every outcome histogram
+        low, high = self.outcome_ranges[:, 0], self.outcome_ranges[:, 1]
+        bins = np.clip(((values - low) / (high - low) * DISTRIBUTION_BINS).astype(np.int64),
+                       0, DISTRIBUTION_BINS - 1)
+        bins += np.arange(len(OUTCOME_METRICS)) * DISTRIBUTION_BINS
+        self.outcome_histograms += np.bincount(
+            bins.ravel(), minlength=self.outcome_histograms.size
+        ).reshape(self.outcome_histograms.shape)
+
+    def merge(self, other: 'CohortAccumulator'):
+        """Fold another chunk's accumulator into this one"""
+        self.session_sums += other.session_sums
+        self.session_sq_sums += other.session_sq_sums
+        self.session_counts += other.session_counts
+        self.num_students += other.num_students
+        self.initial_mastery_sum += other.initial_mastery_sum
+        self.final_mastery_sum += other.final_mastery_sum
+        self.total_attempts += other.total_attempts
+        self.mastery_histogram += other.mastery_histogram
+        self.outcome_histograms += other.outcome_histograms
+        if other.outcomes.count:
+            self.outcomes.merge_moments(other.outcomes.count, other.outcomes.mean, other.outcomes.m2)
+
+    def sessions_run(self) -> int:
+        """Number of leading sessions that had any active student"""
+        active = np.flatnonzero(self.session_counts)
+        return int(active[-1]) + 1 if len(active) else 0
+
+    def session_means(self) -> np.ndarray:
+        """Per-session averages over active students, shape (sessions, metrics)"""
+        counts = self.session_counts[:, None]
+        return np.where(counts > 0, self.session_sums / np.maximum(counts, 1), 0.0)
+
+    def session_stds(self) -> np.ndarray:
+        """Per-session population standard deviations over active students"""
+        counts = np.maximum(self.session_counts[:, None], 1)
+        variance = self.session_sq_sums / counts - (self.session_sums / counts) ** 2
+        return np.sqrt(np.maximum(variance, 0.0))
+
+    def session_aggregates(self, num_sessions: Optional[int] = None) -> List[Dict]:
+        """Per-session averages and standard deviations over active students"""
+        num_sessions = self.num_sessions if num_sessions is None else num_sessions
+        means = self.session_means()[:num_sessions].tolist()
+        stds = self.session_stds()[:num_sessions].tolist()
+        counts = self.session_counts[:num_sessions].tolist()
+        return [{**{f'avg_{m}': v for m, v in zip(SESSION_METRICS, mean)},
+                 **{f'std_{m}': v for m, v in zip(SESSION_METRICS, std)},
+                 'active_students': count}
+                for mean, std, count in zip(means, stds, counts)]
+
+    def outcome_distributions(self) -> Dict[str, Dict]:
+        """Mean, standard deviation and percentiles of every per-student outcome"""
+        percentiles = histogram_percentiles(self.outcome_histograms, self.outcome_ranges)
+        stds = np.sqrt(self.outcomes.variance())
+        return {
+            metric: {
+                'mean': float(self.outcomes.mean[i]),
+                'std': float(stds[i]),
+                **{f'p{p}': float(v) for p, v in zip(DISTRIBUTION_PERCENTILES, percentiles[i])}
+            }
+            for i, metric in enumerate(OUTCOME_METRICS)
+        }
+
+
+class PairedAccumulator:
+    """Running moments of per-student outcome differences between cohorts"""
+
+    COMPARISONS = [('dkt', 'baseline'), ('dkt_xai', 'baseline'), ('dkt_xai', 'dkt')]
+
+    def __init__(self):
+        self.deltas = {pair: RunningMoments(len(OUTCOME_METRICS)) for pair in self.COMPARISONS}
+
+    def add_students(self, outcomes: Dict[str, Dict[str, np.ndarray]]):
+        """Add the same students' outcomes under every cohort"""
+        for treatment, control in self.COMPARISONS:
+            diff = np.column_stack([outcomes[treatment][m] - outcomes[control][m]
+                                    for m in OUTCOME_METRICS])
+            self.deltas[(treatment, control)].update(diff)
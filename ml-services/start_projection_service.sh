@@ -0,0 +1,28 @@
+#!/bin/bash
+
+echo "========================================"
+echo "Starting Projection Service (Port 5003)"
+echo "========================================"
+echo ""
+
+# Get the directory where this script is located
+cd "$(dirname "$0")"
+
+# Check if Python is available
+if ! command -v python3 &> /dev/null && ! command -v python &> /dev/null; then
+    echo "ERROR: Python is not installed or not in PATH"
+    echo "Please install Python 3.8+ and try again"
+    exit 1
+fi
+
+# Use python3 if available, otherwise python
+PYTHON_CMD=$(command -v python3 || command -v python)
+
+echo "Starting Flask service..."
+echo "Service will be available at: http://localhost:5003"
+echo "Projection jobs run on ${PROJECTION_WORKERS:-2} workers (set PROJECTION_WORKERS to change)"
+echo "Each job simulates on ${PROJECTION_SIMULATION_WORKERS:-1} processes (set PROJECTION_SIMULATION_WORKERS to change)"
+echo "Press Ctrl+C to stop the service"
+echo ""
+
+$PYTHON_CMD projection_service.py
@@ -0,0 +1,267 @@
+"""
+Monte-Carlo Replication and Parameter Sweep for the Adaptive Learning Projection
+Runs R seeded replications per parameter cell and reports KPIs with bootstrap CIs
+"""
+
+import io
+import json
+import itertools
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from simulation_projection import AdaptiveLearningSimulation, DEFAULT_SEED
+
+# Loaded DKT models per worker process, keyed by model path
+_worker_models = {}
+
+# Bounded KPIs used by the sequential stopping rule (efficiency can be inf)
+STOPPING_KPIS = ('learning_gain', 'final_mastery', 'failure_rate', 'engagement_rate')
+
+
+def bootstrap_ci(values: np.ndarray, confidence: float = 0.95,
+                 n_bootstrap: int = 2000,
+                 rng: Optional[np.random.Generator] = None) -> Tuple[float, float]:
+    """
+    Percentile bootstrap confidence interval for the mean of `values`
+
+    All resamples are drawn as one (n_bootstrap x n) index matrix.
+    """
+    values = np.asarray(values, dtype=float)
+    if rng is None:
+        rng = np.random.default_rng(DEFAULT_SEED)
+    if len(values) < 2:
+        mean = float(np.mean(values)) if len(values) else float('nan')
+        return mean, mean
+
+    resamples = rng.integers(0, len(values), size=(n_bootstrap, len(values)))
+    means = values[resamples].mean(axis=1)
+    alpha = (1 - confidence) / 2
+    low, high = np.percentile(means, [alpha * 100, (1 - alpha) * 100])
+    return float(low), float(high)
+
+
+def flatten_kpis(kpis: Dict) -> Dict[str, float]:
+    """Flatten {'kpi': {'group': value}} into {'kpi.group': value}"""
+    flat = {}
+    for name, value in kpis.items():
+        if isinstance(value, dict):
+            for group, group_value in value.items():
+                flat[f'{name}.{group}'] = float(group_value)
+        else:
+            flat[name] = float(value)
+    return flat
+
+
+def _run_replication(parameters: Dict) -> Dict[str, float]:
+    """Run one seeded simulation quietly and return its flattened KPIs"""
+    model_path = parameters.get('model_path', 'dkt_trained_model.keras')
+    if model_path not in _worker_models:
+        with contextlib.redirect_stdout(io.StringIO()):
+            _worker_models[model_path] = AdaptiveLearningSimulation(
+                model_path=model_path, num_students=0, num_sessions=0
+            ).dkt_model
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        simulation = AdaptiveLearningSimulation(dkt_model=_worker_models[model_path],
+                                                **parameters)
+        simulation.run_simulation()
+
+    return flatten_kpis(simulation.kpis)
+
+
+class ParameterSweep:
+    """
+    Runs replicated simulations over a grid of parameters
+    """
+
+    def __init__(self, grid: Dict[str, List], replications: int = 10,
+                 base_parameters: Optional[Dict] = None,
+                 seed: int = DEFAULT_SEED, num_workers: int = 1,
+                 confidence: float = 0.95, n_bootstrap: int = 2000,
+                 ci_tolerance: Optional[float] = None,
+                 max_replications: Optional[int] = None,
+                 stopping_kpis: Tuple[str, ...] = STOPPING_KPIS):
+        """
+        Initialize sweep
+
+        Args:
+            grid: Parameter name -> list of values (any AdaptiveLearningSimulation
+                argument, e.g. num_students, num_sessions, target_mastery, engagement_probs)
+            replications: Replications (independent seeds) per grid cell; with
+                ci_tolerance this is the batch size between convergence checks
+            base_parameters: Parameters shared by every cell
+            seed: Master seed for replication seeds and bootstrap resampling
+            num_workers: Worker processes; (cell, replication) runs are distributed across them
+            confidence: Confidence level of the bootstrap intervals
+            n_bootstrap: Bootstrap resamples per KPI
+            ci_tolerance: Sequential stopping - keep adding replication batches to a cell
+                until every strategy's CI on stopping_kpis is narrower than this
+            max_replications: Upper bound on replications per cell when ci_tolerance is set
+            stopping_kpis: KPIs checked by the stopping rule
+        """
+        self.grid = grid
+        self.replications = replications
+        self.base_parameters = base_parameters or {}
+        self.seed = seed
+        self.num_workers = num_workers
+        self.confidence = confidence
+        self.n_bootstrap = n_bootstrap
+        self.ci_tolerance = ci_tolerance
+        self.max_replications = max_replications or replications * 10
+        self.stopping_kpis = stopping_kpis
+
+        self.cells = self.expand_grid()
+        self.results = []
+
+    def expand_grid(self) -> List[Dict]:
+        """Cartesian product of the grid values"""
+        names = list(self.grid)
+        return [dict(zip(names, values))
+                for values in itertools.product(*(self.grid[name] for name in names))]
+
+    def replication_seed(self, cell_index: int, replication: int) -> int:
+        """Independent simulation seed for one replication of one cell"""
+        seed_seq = np.random.SeedSequence(self.seed, spawn_key=(cell_index, replication))
+        return int(seed_seq.generate_state(1)[0])
+
+    def replication_parameters(self, cell_index: int, replication: int) -> Dict:
+        """Full simulation arguments for one replication"""
+        return {
+            **self.base_parameters,
+            **self.cells[cell_index],
+            'seed': self.replication_seed(cell_index, replication)
+        }
+
+    def run_replications(self, tasks: List[Tuple[int, int]]) -> List[Dict[str, float]]:
+        """Run (cell_index, replication) tasks, in parallel when num_workers > 1"""
+        parameters = [self.replication_parameters(c, r) for c, r in tasks]
+
+        if self.num_workers <= 1:
+            return [_run_replication(p) for p in parameters]
+
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=self.num_workers, mp_context=context) as executor:
+            return list(executor.map(_run_replication, parameters))
+
+    def summarize(self, replications: List[Dict[str, float]], cell_index: int) -> Dict:
+        """KPI mean, standard deviation and bootstrap CI across replications"""
+        rng = np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=(cell_index,)))
+        summary = {}
+        for key in replications[0]:
+            values = np.array([r[key] for r in replications])
+            # Efficiency is inf when a replication has no mastery gain
+            with np.errstate(invalid='ignore'):
+                ci_low, ci_high = bootstrap_ci(values, self.confidence, self.n_bootstrap, rng)
+                entry = {
+                    'mean': float(np.mean(values)),
+                    'std': float(np.std(values, ddof=1)) if len(values) > 1 else 0.0,
+                    'ci_low': ci_low,
+                    'ci_high': ci_high,
+                    'values': values.tolist()
+                }
+            name, _, group = key.partition('.')
+            if group:
+                summary.setdefault(name, {})[group] = entry
+            else:
+                summary[name] = entry
+        return summary
+
+    def is_converged(self, summary: Dict) -> bool:
+        """Whether every strategy's CI on the stopping KPIs is within ci_tolerance"""
+        return all(entry['ci_high'] - entry['ci_low'] <= self.ci_tolerance
+                   for kpi in self.stopping_kpis
+                   for entry in summary[kpi].values())
+
+    def run(self) -> List[Dict]:
+        """
+        Run replications for every cell
+
+        Without ci_tolerance every cell gets exactly `replications` runs. With it,
+        unconverged cells get further batches until they converge or reach
+        max_replications. Replication seeds depend only on (cell, replication),
+        so results do not depend on batching or worker count.
+        """
+        print(f"\nParameter sweep: {len(self.cells)} cells x {self.replications} replications "
+              f"on {self.num_workers} worker(s)")
+
+        cell_kpis = [[] for _ in self.cells]
+        summaries = [None] * len(self.cells)
+        pending = list(range(len(self.cells)))
+        total_runs = 0
+
+        while pending:
+            tasks = []
+            for c in pending:
+                done = len(cell_kpis[c])
+                tasks.extend((c, r) for r in range(done, min(done + self.replications,
+                                                            self.max_replications)))
+            for (c, _), kpis in zip(tasks, self.run_replications(tasks)):
+                cell_kpis[c].append(kpis)
+            total_runs += len(tasks)
+
+            for c in pending:
+                summaries[c] = self.summarize(cell_kpis[c], c)
+
+            if self.ci_tolerance is None:
+                break
+            pending = [c for c in pending
+                       if not self.is_converged(summaries[c])
+                       and len(cell_kpis[c]) < self.max_replications]
+            if pending:
+                print(f"  {len(pending)} cell(s) not converged, adding {self.replications} replications")
+
+        self.results = []
+        for cell_index, cell in enumerate(self.cells):
+            result = {
+                'parameters': cell,
+                'replications': len(cell_kpis[cell_index]),
+                'kpis': summaries[cell_index]
+            }
+            if self.ci_tolerance is not None:
+                result['converged'] = self.is_converged(summaries[cell_index])
+            self.results.append(result)
+
+        print(f"✓ Sweep completed ({total_runs} simulations)")
+        return self.results
+
+    def generate_report(self, output_path: str = 'sweep_report.json') -> Dict:
+        """Save sweep results as JSON"""
+        report = {
+            'grid': self.grid,
+            'base_parameters': self.base_parameters,
+            'replications': self.replications,
+            'confidence': self.confidence,
+            'ci_tolerance': self.ci_tolerance,
+            'seed': self.seed,
+            'cells': self.results,
+            'timestamp': datetime.now().isoformat()
+        }
+
+        with open(output_path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+        print(f"✓ Sweep report saved to {output_path}")
+        return report
+
+
+if __name__ == '__main__':
+    sweep = ParameterSweep(
+        grid={
+            'num_students': [50, 100],
+            'target_mastery': [0.80, 0.85],
+            'engagement_probs': [
+                {'dkt_xai': 0.90},
+                {'dkt_xai': 0.95}
+            ]
+        },
+        replications=10,
+        base_parameters={'num_sessions': 50},
+        num_workers=multiprocessing.cpu_count()
+    )
+    sweep.run()
+    sweep.generate_report('sweep_report.json')
@@ -0,0 +1,164 @@
+"""
+Syllabus Prerequisite Graph for the Adaptive Learning Projection
+Compressed sparse (CSR) prerequisite adjacency over the O/L syllabus topics
+"""
+
+import os
+import json
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# SyllabusTopic documents with prerequisites, shipped next to this module
+DEFAULT_SYLLABUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                     'syllabus_graph.json')
+
+# Length of the DKT knowledge vector
+NUM_SKILLS = 100
+
+# Loaded graphs, keyed by path (shared by every simulation in a process)
+_loaded_graphs = {}
+
+
+def skill_index(topic_id: str) -> int:
+    """
+    Knowledge-vector index of a syllabus topic
+
+    Follows the DKT export convention (numeric suffix of the topic id, so
+    'G11_16' -> 16); topics of both grades with the same number share a skill.
+    """
+    return int(topic_id[4:])
+
+
+class SyllabusGraph:
+    """
+    Prerequisite graph of the syllabus topics
+
+    Stored twice in CSR form (indptr/indices arrays):
+      - topic level: row t lists the prerequisite topics of topic t, in syllabus order
+      - skill level: row s lists the distinct prerequisite skills of skill s,
+        used to propagate learning along the edges of the knowledge vector
+    """
+
+    def __init__(self, topics: List[Dict], num_skills: int = NUM_SKILLS):
+        """
+        Args:
+            topics: SyllabusTopic documents (topicId, topicName, grade, prerequisites)
+            num_skills: Length of the knowledge vector
+        """
+        self.topic_ids = [t['topicId'] for t in topics]
+        self.topic_names = [t['topicName'] for t in topics]
+        self.topic_index = {topic_id: i for i, topic_id in enumerate(self.topic_ids)}
+        self.topic_skills = np.array([skill_index(t) for t in self.topic_ids], dtype=np.int64)
+        self.num_skills = num_skills
+
+        for topic in topics:
+            for prereq in topic.get('prerequisites', []):
+                if prereq not in self.topic_index:
+                    raise ValueError(f"Unknown prerequisite '{prereq}' of topic '{topic['topicId']}'")
+
+        # Topic-level CSR
+        counts = [len(t.get('prerequisites', [])) for t in topics]
+        self.topic_indptr = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self.topic_indices = np.array([self.topic_index[p] for t in topics
+                                       for p in t.get('prerequisites', [])], dtype=np.int64)
+
+        # Skill-level CSR: distinct (skill, prerequisite skill) edges, no self-loops
+        dependent = np.repeat(self.topic_skills, counts)
+        prerequisite = self.topic_skills[self.topic_indices]
+        edges = np.unique(np.stack([dependent, prerequisite], axis=1), axis=0) \
+            if len(dependent) else np.empty((0, 2), dtype=np.int64)
+        edges = edges[edges[:, 0] != edges[:, 1]]
+        self.skill_indptr = np.searchsorted(edges[:, 0], np.arange(num_skills + 1)).astype(np.int64)
+        self.skill_indices = edges[:, 1].copy()
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_SYLLABUS_PATH) -> 'SyllabusGraph':
+        """Load a JSON array of SyllabusTopic documents (cached per path)"""
+        if path not in _loaded_graphs:
+            with open(path, encoding='utf-8') as f:
+                _loaded_graphs[path] = cls(json.load(f))
+        return _loaded_graphs[path]
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.topic_indices)
+
+    def prerequisites(self, topic_id: str) -> List[str]:
+        """Prerequisite topic ids of a topic"""
+        t = self.topic_index[topic_id]
+        return [self.topic_ids[p] for p in self.topic_indices[self.topic_indptr[t]:self.topic_indptr[t + 1]]]
+
+    def topic_info(self, topic_id: str) -> Dict:
+        """Topic name, skill index and prerequisites (ids and skill indices)"""
+        if topic_id not in self.topic_index:
+            raise ValueError(f"Unknown topic '{topic_id}'")
+        prerequisites = self.prerequisites(topic_id)
+        return {
+            'id': skill_index(topic_id),
+            'name': self.topic_names[self.topic_index[topic_id]],
+            'prerequisites': prerequisites,
+            'prerequisite_ids': [skill_index(p) for p in prerequisites]
+        }
+
+    def prerequisite_matrix(self, width: Optional[int] = None) -> np.ndarray:
+        """
+        Prerequisites of every topic as a padded index matrix
+
+        Row t holds the topic indices of topic t's prerequisites in syllabus
+        order, padded with -1.
+
+        Args:
+            width: Columns (default: the largest number of prerequisites);
+                longer prerequisite lists are truncated
+        """
+        counts = np.diff(self.topic_indptr)
+        width = int(counts.max(initial=0)) if width is None else width
+        rows = np.repeat(np.arange(len(self.topic_ids)), counts)
+        cols = np.arange(self.num_edges) - np.repeat(self.topic_indptr[:-1], counts)
+        keep = cols < width
+        matrix = np.full((len(self.topic_ids), width), -1, dtype=np.int64)
+        matrix[rows[keep], cols[keep]] = self.topic_indices[keep]
+        return matrix
+
+    def skill_topics(self) -> np.ndarray:
+        """
+        Representative topic index of every skill (-1 for skills without a topic)
+
+        When topics of both grades share a skill, the later one in syllabus
+        order (grade 11) represents it, e.g. skill 16 -> G11_16.
+        """
+        topics = np.full(self.num_skills, -1, dtype=np.int64)
+        for t, skill in enumerate(self.topic_skills):
+            topics[skill] = t
+        return topics
+
+    def prerequisite_skills(self, skill: int) -> np.ndarray:
+        """Distinct prerequisite skills of a skill (a view into the CSR arrays)"""
+        return self.skill_indices[self.skill_indptr[skill]:self.skill_indptr[skill + 1]]
+
+    def propagate(self, knowledge_vectors: np.ndarray, source_skills: np.ndarray,
+                  gain: float, cap: float = 1.0):
+        """
+        Raise the prerequisites of learned skills in place
+
+        A sparse mat-vec over the skill-level adjacency, for any number of
+        (knowledge vector, learned skill) pairs at once.
+
+        Args:
+            knowledge_vectors: Shape (num_skills,) or (n, num_skills)
+            source_skills: Learned skill per knowledge vector, shape () or (n,)
+            gain: Mastery added to every prerequisite of a learned skill
+            cap: Upper bound of mastery
+        """
+        vectors = knowledge_vectors.reshape(-1, knowledge_vectors.shape[-1])
+        sources = np.atleast_1d(source_skills)
+        starts = self.skill_indptr[sources]
+        lengths = self.skill_indptr[sources + 1] - starts
+        if not lengths.any():
+            return
+
+        rows = np.repeat(np.arange(len(sources)), lengths)
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        cols = self.skill_indices[np.repeat(starts, lengths) + offsets]
+        vectors[rows, cols] = np.minimum(cap, vectors[rows, cols] + gain)
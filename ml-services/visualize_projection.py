@@ -7,7 +7,7 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
 import json
-from typing import Dict, List
+from typing import Dict, List, Optional
 import os
 
 # Set style
@@ -19,8 +19,16 @@ plt.rcParams['font.size'] = 10
 class ProjectionVisualizer:
     """Create visualizations for simulation results"""
     
-    def __init__(self, report_path: str = 'simulation_report.json'):
-        """Load simulation report"""
+    def __init__(self, report_path: str = 'simulation_report.json',
+                 output_dir: Optional[str] = None):
+        """
+        Load simulation report
+        
+        Args:
+            report_path: Simulation report JSON
+            output_dir: Directory for charts and the summary (default: the report's directory)
+        """
+        self.output_dir = output_dir if output_dir is not None else os.path.dirname(report_path)
         if os.path.exists(report_path):
             with open(report_path, 'r') as f:
                 self.report = json.load(f)
@@ -28,8 +36,9 @@ class ProjectionVisualizer:
             self.report = None
             print(f"⚠ Report not found at {report_path}")
     
-    def plot_learning_curves(self, output_path: str = 'learning_curves.png'):
+    def plot_learning_curves(self, output_path: Optional[str] = None):
         """Plot mastery progression over sessions"""
+        output_path = output_path or os.path.join(self.output_dir, 'learning_curves.png')
         if not self.report:
             print("No report data available")
             return
@@ -86,8 +95,9 @@ class ProjectionVisualizer:
         print(f"✓ Saved learning curves to {output_path}")
         plt.close()
     
-    def plot_kpi_comparison(self, output_path: str = 'kpi_comparison.png'):
+    def plot_kpi_comparison(self, output_path: Optional[str] = None):
         """Create bar chart comparing KPIs"""
+        output_path = output_path or os.path.join(self.output_dir, 'kpi_comparison.png')
         if not self.report:
             print("No report data available")
             return
@@ -199,8 +209,9 @@ class ProjectionVisualizer:
         print(f"✓ Saved KPI comparison to {output_path}")
         plt.close()
     
-    def plot_improvement_metrics(self, output_path: str = 'improvement_metrics.png'):
+    def plot_improvement_metrics(self, output_path: Optional[str] = None):
         """Plot improvement percentages"""
+        output_path = output_path or os.path.join(self.output_dir, 'improvement_metrics.png')
         if not self.report:
             print("No report data available")
             return
@@ -247,8 +258,9 @@ class ProjectionVisualizer:
         print(f"✓ Saved improvement metrics to {output_path}")
         plt.close()
     
-    def generate_summary_report(self, output_path: str = 'projection_summary.md'):
+    def generate_summary_report(self, output_path: Optional[str] = None):
         """Generate markdown summary report"""
+        output_path = output_path or os.path.join(self.output_dir, 'projection_summary.md')
         if not self.report:
             print("No report data available")
             return
@@ -3,24 +3,298 @@ Explainable AI (XAI) Service for DKT Recommendations
 Provides SHAP/LIME-based explanations for why questions are recommended
 """
 
+import copy
+import time
+import importlib
+import importlib.util
+import threading
+from collections import OrderedDict
 import numpy as np
 from typing import List, Dict, Optional, Tuple
 import warnings
+
+from syllabus_graph import SyllabusGraph, DEFAULT_SYLLABUS_PATH
 warnings.filterwarnings('ignore')
 
-try:
-    import shap
-    SHAP_AVAILABLE = True
-except ImportError:
-    SHAP_AVAILABLE = False
-    print("⚠ SHAP not available, using simplified XAI")
+# Explanation backends are imported on first use or by warmup(): importing
+# shap and lime takes seconds, which the simplified path must never wait for
+shap = None
+lime_tabular = None
+
+# Backend -> module imported for it
+BACKEND_MODULES = {
+    'shap': 'shap',
+    'lime': 'lime.lime_tabular'
+}
+
+# Whether the backends are installed (checked without importing them)
+SHAP_AVAILABLE = importlib.util.find_spec('shap') is not None
+LIME_AVAILABLE = importlib.util.find_spec('lime') is not None
+
+# Backend -> 'not_loaded', 'loading', 'ready' or 'unavailable'
+_backend_status = {
+    'shap': 'not_loaded' if SHAP_AVAILABLE else 'unavailable',
+    'lime': 'not_loaded' if LIME_AVAILABLE else 'unavailable'
+}
+_backend_loaded = {name: threading.Event() for name in BACKEND_MODULES}
+_backend_lock = threading.Lock()
+
+# Background import of every backend, started by the first warmup() call
+_warmup_thread = None
+for _name, _status in _backend_status.items():
+    if _status == 'unavailable':
+        _backend_loaded[_name].set()
+        print(f"⚠ {_name.upper()} not available, using simplified XAI")
+
+
+def load_backend(name: str) -> bool:
+    """
+    Import an explanation backend once
+    
+    Concurrent callers wait for the thread that is importing it.
+    
+    Returns:
+        Whether the backend is ready
+    """
+    global shap, lime_tabular
+    with _backend_lock:
+        importing = _backend_status[name] == 'not_loaded'
+        if importing:
+            _backend_status[name] = 'loading'
+    if not importing:
+        _backend_loaded[name].wait()
+        return _backend_status[name] == 'ready'
+    
+    try:
+        module = importlib.import_module(BACKEND_MODULES[name])
+        if name == 'shap':
+            shap = module
+        else:
+            lime_tabular = module
+        status = 'ready'
+    except ImportError:
+        status = 'unavailable'
+        print(f"⚠ {name.upper()} not available, using simplified XAI")
+    
+    with _backend_lock:
+        _backend_status[name] = status
+    _backend_loaded[name].set()
+    return status == 'ready'
+
+
+def backend_ready(name: str) -> bool:
+    return _backend_status[name] == 'ready'
+
+
+def backend_status() -> Dict[str, str]:
+    """Load status of every explanation backend"""
+    with _backend_lock:
+        return dict(_backend_status)
+
+
+def warmup() -> threading.Thread:
+    """
+    Import every explanation backend in a background thread
+    
+    The thread is started once; later calls return the same thread.
+    
+    Returns:
+        The daemon thread; it ends once every backend is loaded (or known to
+        be unavailable), including imports started elsewhere
+    """
+    global _warmup_thread
+    with _backend_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(
+                target=lambda: [load_backend(name) for name in BACKEND_MODULES],
+                name='xai-warmup', daemon=True)
+            _warmup_thread.start()
+        return _warmup_thread
+
+# Features of one (student, question) pair, in feature-vector order
+FEATURE_NAMES = [
+    'mastery_target',
+    'mastery_prereq1',
+    'mastery_prereq2',
+    'mastery_prereq3',
+    'difficulty',
+    'time_avg',
+    'error_rate',
+    'anxiety_level',
+    'attempts_avg'
+]
+
+# Student-level features (shared by every candidate question of a student)
+STUDENT_FEATURES = slice(5, 9)
+
+# Recent interactions summarized into the student-level features
+HISTORY_WINDOW = 10
+
+# Mastery assumed for topics outside the knowledge vector
+DEFAULT_MASTERY = 0.3
+
+# Prerequisite slots of the feature vector (mastery_prereq1..3); topics with
+# fewer prerequisites are padded with DEFAULT_MASTERY
+PREREQUISITE_SLOTS = 3
+
+# Version of the success model whose predictions are attributed; explainers
+# and background data are cached per version
+DEFAULT_MODEL_VERSION = 'success-model-v1'
+
+# Plausible (low, high) of every feature, used to draw the background population
+FEATURE_RANGES = np.array([
+    [0.0, 1.0],  # mastery_target
+    [0.0, 1.0],  # mastery_prereq1
+    [0.0, 1.0],  # mastery_prereq2
+    [0.0, 1.0],  # mastery_prereq3
+    [0.0, 3.0],  # difficulty
+    [0.0, 1.0],  # time_avg (x 300s)
+    [0.0, 1.0],  # error_rate
+    [0.0, 1.0],  # anxiety_level
+    [0.2, 1.0]   # attempts_avg (x 5)
+])
+
+# SHAP: background population summarized by k-means, and the per-explanation
+# sample budget (2^9 - 2 = 510 coalitions enumerates all of them exactly)
+SHAP_BACKGROUND_SAMPLES = 1000
+SHAP_BACKGROUND_CLUSTERS = 10
+SHAP_SAMPLE_BUDGET = 512
+
+# LIME: perturbations scored per explanation, and the size of the
+# pre-generated perturbation matrix (upper bound of the budget)
+LIME_SAMPLE_BUDGET = 1000
+LIME_MAX_SAMPLES = 5000
+
+# Attribution methods of calculate_feature_importance
+EXPLANATION_METHODS = ('simplified', 'shap', 'lime')
+
+# Explanation cache: entries kept (LRU), and the grid features and predicted
+# success rates are keyed on (1 percentage point, the precision the
+# explanation text shows)
+EXPLANATION_CACHE_SIZE = 10000
+EXPLANATION_QUANTUM = 0.01
+
+# Pre-rendered explanation text fragments
+EXPLANATION_HEADER = (
+    "🎯 Adaptive Goal: Mastery in {topic_name}\n"
+    "Recommended Action: Focus on this question (Predicted Success: {success:.0f}%)\n"
+    "\n"
+    "✅ Why This Recommendation? (Explainable AI)\n"
+)
+REASON_TEMPLATES = {
+    'low_mastery_target': "• Skill Gap: Your mastery in {topic_name} is {value:.0f}%, indicating a need for focused practice.",
+    'prerequisite_gap': "• Prerequisite Gap: {topic} mastery is only {mastery:.0f}%, which is critical for success.",
+    'difficulty_mismatch': "• Difficulty Level: This question's difficulty ({value:.1f}) may be challenging given your current mastery ({mastery:.0f}%).",
+    'time_anxiety': "• Time/Anxiety Signal: Your average response time ({avg_time:.0f}s) and anxiety level suggest you may benefit from a more structured approach.",
+    'high_error_rate': "• Performance Pattern: Recent error rate is {value:.0f}%, indicating a need for review."
+}
+DEFAULT_REASONS = {
+    'optimal_challenge': "• Optimal Challenge: This question is in your optimal learning zone (60-80% success rate), maximizing learning efficiency.",
+    'reinforcement': "• Reinforcement: This question will help solidify your understanding and build confidence.",
+    None: "• Personalized Path: This recommendation is based on your current knowledge state and learning trajectory."
+}
+PATH_FORWARD = {
+    'foundation_review': "📚 The Path Forward:\nWe are prioritizing foundation review to stabilize prerequisite skills before proceeding to more advanced topics. This is an efficient, low-stress path to mastery.",
+    'scaffolded_learning': "📚 The Path Forward:\nThis question provides appropriate scaffolding - challenging enough to promote growth, but achievable with your current skills.",
+    'optimal_challenge': "📚 The Path Forward:\nThis question is perfectly calibrated to your current level, ensuring maximum learning gain with minimal frustration.",
+    None: "📚 The Path Forward:\nThis recommendation aligns with your learning goals and current progress trajectory."
+}
+
+# Recommendation types by predicted success: < 0.4, < 0.6, <= 0.8, above
+RECOMMENDATION_TYPES = ['foundation_review', 'scaffolded_learning',
+                        'optimal_challenge', 'reinforcement']
 
-try:
-    from lime import lime_tabular
-    LIME_AVAILABLE = True
-except ImportError:
-    LIME_AVAILABLE = False
-    print("⚠ LIME not available, using simplified XAI")
+# Counterfactual search: features that may change, their sweep step, and the
+# levels per feature of the joint grid (plus the current value)
+COUNTERFACTUAL_STEPS = {
+    'mastery_target': 0.05,
+    'mastery_prereq1': 0.05,
+    'mastery_prereq2': 0.05,
+    'mastery_prereq3': 0.05,
+    'difficulty': 0.1,
+    'error_rate': 0.05
+}
+COUNTERFACTUAL_JOINT_LEVELS = 5
+
+# Interactions listed in an integrated-gradients explanation
+MASTERY_TOP_INTERACTIONS = 5
+
+
+class ExplanationCache:
+    """
+    LRU cache of explanations keyed by quantized feature vectors
+    
+    Students in similar states share an entry: the key is the explanation
+    method and model version, the question (id, topic id and name), the
+    feature vector and the predicted success rate on the quantization grid,
+    and which side of every rule threshold they fall on (see
+    XAIService.rule_classes). Thread-safe, with hit/miss/eviction counters.
+    """
+    
+    def __init__(self, max_entries: int = EXPLANATION_CACHE_SIZE,
+                 quantum: float = EXPLANATION_QUANTUM):
+        """
+        Args:
+            max_entries: Entries kept; the least recently used is evicted
+            quantum: Grid spacing of features and predicted success rates
+        """
+        self.max_entries = max_entries
+        self.quantum = quantum
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def quantize(self, values) -> np.ndarray:
+        """Values snapped to the quantization grid"""
+        return np.round(np.asarray(values, dtype=float) / self.quantum) * self.quantum
+    
+    def key(self, method: str, model_version: str, question: Dict,
+            features: np.ndarray, predicted_success_rate: float,
+            rule_classes: np.ndarray) -> Tuple:
+        """Cache key (grid indices, so equal grid points give equal keys)"""
+        grid = np.round(np.asarray(features, dtype=float) / self.quantum).astype(np.int64)
+        return (method, model_version, question.get('question_id'), question.get('topic_id'),
+                question.get('topic_name'), grid.tobytes(),
+                int(round(predicted_success_rate / self.quantum)),
+                np.asarray(rule_classes, dtype=np.int64).tobytes())
+    
+    def get(self, key: Tuple) -> Optional[Dict]:
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key: Tuple, value: Dict):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+    
+    def stats(self) -> Dict:
+        """Hit metrics"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'quantum': self.quantum,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
 
 
 class XAIService:
@@ -28,80 +302,378 @@ class XAIService:
     Explainable AI service for DKT recommendations
     """
     
-    def __init__(self):
+    def __init__(self, model_version: str = DEFAULT_MODEL_VERSION,
+                 shap_sample_budget: int = SHAP_SAMPLE_BUDGET,
+                 lime_sample_budget: int = LIME_SAMPLE_BUDGET,
+                 cache_size: int = EXPLANATION_CACHE_SIZE,
+                 cache_quantum: float = EXPLANATION_QUANTUM,
+                 syllabus_path: str = DEFAULT_SYLLABUS_PATH):
+        """
+        Args:
+            model_version: Version of the explained success model
+            shap_sample_budget: Coalitions sampled per SHAP explanation
+            lime_sample_budget: Perturbations scored per LIME explanation
+                (at most LIME_MAX_SAMPLES)
+            cache_size: Explanations cached (0 disables the cache)
+            cache_quantum: Quantization grid of cached explanations
+            syllabus_path: SyllabusTopic documents with prerequisites
+        """
         self.shap_available = SHAP_AVAILABLE
         self.lime_available = LIME_AVAILABLE
+        self.model_version = model_version
+        self.shap_sample_budget = shap_sample_budget
+        self.lime_sample_budget = min(lime_sample_budget, LIME_MAX_SAMPLES)
+        self._backgrounds = {}
+        self._shap_explainers = {}
+        self._lime_explainers = {}
+        self.cache = ExplanationCache(cache_size, cache_quantum) if cache_size else None
+        self.load_prerequisites(syllabus_path)
     
-    def extract_features(self, student: Dict, question: Dict, 
-                        knowledge_vector: np.ndarray) -> np.ndarray:
+    def load_prerequisites(self, syllabus_path: str = DEFAULT_SYLLABUS_PATH):
         """
-        Extract features for XAI analysis
+        Load the skill -> prerequisite mapping into array form
         
-        Returns feature vector:
-        [mastery_target, mastery_prereq1, mastery_prereq2, mastery_prereq3,
-         difficulty, time_avg, error_rate, anxiety_level, attempts_avg]
+        Topic ids of questions are knowledge-vector (skill) indices. Each
+        skill takes the prerequisites of its syllabus topic (the grade 11
+        topic when both grades share the number):
+          - prerequisite_index: (skills, PREREQUISITE_SLOTS) prerequisite
+            skills, padded with -1
+          - prerequisite_names: display names per skill, in the same order
+          - topic_names: display name per skill
         """
-        topic_id = question['topic_id']
-        topic_name = question.get('topic_name', 'Unknown')
+        syllabus = SyllabusGraph.load(syllabus_path)
+        skill_topics = syllabus.skill_topics()
+        has_topic = skill_topics >= 0
+        prerequisites = np.full((syllabus.num_skills, PREREQUISITE_SLOTS), -1, dtype=np.int64)
+        prerequisites[has_topic] = syllabus.prerequisite_matrix(PREREQUISITE_SLOTS)[skill_topics[has_topic]]
         
-        # Get mastery for target topic
-        if topic_id < len(knowledge_vector):
-            mastery_target = knowledge_vector[topic_id]
-        else:
-            mastery_target = 0.3
-        
-        # Get prerequisite masteries
-        prereq_masteries = []
-        if topic_id == 16:  # G11_16 (Geometric Progressions)
-            prereq_ids = [3, 11, 14]  # G10_03, G10_11, G10_14
-            for prereq_id in prereq_ids:
-                if prereq_id < len(knowledge_vector):
-                    prereq_masteries.append(knowledge_vector[prereq_id])
-                else:
-                    prereq_masteries.append(0.3)
-        else:
-            prereq_masteries = [0.3, 0.3, 0.3]
+        padded = prerequisites < 0
+        self.prerequisite_index = np.where(padded, -1, syllabus.topic_skills[prerequisites])
+        self.prerequisite_names = [
+            [f"{syllabus.topic_names[t]} ({syllabus.topic_ids[t]})" for t in row if t >= 0]
+            for row in prerequisites
+        ]
+        self.topic_names = [syllabus.topic_names[t] if t >= 0 else None for t in skill_topics]
+    
+    def syllabus_topic_name(self, topic_id) -> Optional[str]:
+        """Syllabus name of a topic id (None outside the syllabus)"""
+        if isinstance(topic_id, (int, np.integer)) and 0 <= topic_id < len(self.topic_names):
+            return self.topic_names[topic_id]
+        return None
+    
+    def prerequisite_topic_names(self, topic_id: int) -> List[str]:
+        """Display names of a topic's prerequisites (empty outside the syllabus)"""
+        if 0 <= topic_id < len(self.prerequisite_names):
+            return self.prerequisite_names[topic_id]
+        return []
+    
+    def predict_success(self, features: np.ndarray) -> np.ndarray:
+        """
+        Success model over the explanation features, vectorized over rows
+        
+        Mastery of the topic and its prerequisites, discounted by difficulty
+        (as recommend_next_action does), adjusted for recent errors,
+        hesitation, anxiety and retries. This is the function that SHAP and
+        LIME attributions explain.
+        
+        Args:
+            features: Shape (FEATURE_NAMES,) or (n, FEATURE_NAMES)
+        
+        Returns:
+            Predicted success probability per row
+        """
+        f = np.atleast_2d(features)
+        readiness = 0.7 * f[:, 0] + 0.3 * f[:, 1:4].mean(axis=1)
+        success = readiness * (1 - np.abs(f[:, 4]) / 3.0)
+        success *= (1 - 0.2 * (f[:, 6] - 0.5) - 0.1 * (f[:, 5] - 0.1)
+                    - 0.1 * (f[:, 7] - 0.5) - 0.05 * (f[:, 8] - 0.2))
+        return np.clip(success, 0.0, 1.0)
+    
+    def background(self, model_version: Optional[str] = None) -> np.ndarray:
+        """
+        Background population of feature vectors for a model version
+        
+        Drawn once (seeded) from FEATURE_RANGES unless set_background supplied
+        observed feature vectors.
+        """
+        model_version = model_version or self.model_version
+        if model_version not in self._backgrounds:
+            rng = np.random.default_rng(0)
+            low, high = FEATURE_RANGES[:, 0], FEATURE_RANGES[:, 1]
+            self._backgrounds[model_version] = rng.uniform(
+                low, high, size=(SHAP_BACKGROUND_SAMPLES, len(FEATURE_NAMES))
+            )
+        return self._backgrounds[model_version]
+    
+    def set_background(self, features: np.ndarray, model_version: Optional[str] = None):
+        """Use observed feature vectors as the background and drop cached explainers"""
+        model_version = model_version or self.model_version
+        self._backgrounds[model_version] = np.asarray(features, dtype=float)
+        self._shap_explainers.pop(model_version, None)
+        self._lime_explainers.pop(model_version, None)
+        if self.cache is not None:
+            self.cache.clear()
+    
+    def shap_explainer(self, model_version: Optional[str] = None):
+        """KernelExplainer over a k-means summary of the background, built once per version"""
+        load_backend('shap')
+        model_version = model_version or self.model_version
+        if model_version not in self._shap_explainers:
+            background = self.background(model_version)
+            summary = shap.kmeans(background, min(SHAP_BACKGROUND_CLUSTERS, len(background)))
+            self._shap_explainers[model_version] = shap.KernelExplainer(self.predict_success, summary)
+        return self._shap_explainers[model_version]
+    
+    def shap_attributions(self, features: np.ndarray,
+                          nsamples: Optional[int] = None) -> Tuple[np.ndarray, float]:
+        """
+        Shapley values of predict_success for every row of a feature matrix
+        
+        Each row's coalitions are evaluated in one batched model call of
+        nsamples x background-clusters rows.
+        
+        Returns:
+            (attributions of shape (n, FEATURE_NAMES), base value)
+        """
+        explainer = self.shap_explainer()
+        values = explainer.shap_values(np.atleast_2d(features),
+                                       nsamples=nsamples or self.shap_sample_budget,
+                                       silent=True)
+        return np.asarray(values).reshape(-1, len(FEATURE_NAMES)), float(explainer.expected_value)
+    
+    def shap_sections(self, features: np.ndarray) -> List[Dict]:
+        """xai_data['shap'] of every row of a feature matrix"""
+        started = time.perf_counter()
+        features = np.atleast_2d(features)
+        values, base_value = self.shap_attributions(features)
+        success = self.predict_success(features)
+        latency_ms = (time.perf_counter() - started) * 1000
+        
+        sections = []
+        for row_values, row_success in zip(values, success):
+            order = np.argsort(-np.abs(row_values))
+            sections.append({
+                'base_value': base_value,
+                'model_success_rate': float(row_success),
+                'model_version': self.model_version,
+                'values': {FEATURE_NAMES[i]: float(row_values[i]) for i in order},
+                'latency_ms': latency_ms
+            })
+        return sections
+    
+    def lime_explainer(self, model_version: Optional[str] = None):
+        """
+        Tabular explainer and perturbation matrix, built once per version
+        
+        The explainer holds the background feature statistics (mean and
+        scale) and the locality kernel. The perturbations are a fixed matrix
+        of standard-normal offsets, reused by every request; row 0 is the
+        instance itself.
+        
+        Returns:
+            (LimeTabularExplainer, perturbations of shape (LIME_MAX_SAMPLES, FEATURE_NAMES))
+        """
+        load_backend('lime')
+        model_version = model_version or self.model_version
+        if model_version not in self._lime_explainers:
+            explainer = lime_tabular.LimeTabularExplainer(
+                self.background(model_version),
+                mode='regression',
+                feature_names=FEATURE_NAMES,
+                discretize_continuous=False,
+                sample_around_instance=True,
+                random_state=0
+            )
+            perturbations = np.random.default_rng(0).standard_normal(
+                (LIME_MAX_SAMPLES, len(FEATURE_NAMES))
+            )
+            perturbations[0] = 0.0
+            self._lime_explainers[model_version] = (explainer, perturbations)
+        return self._lime_explainers[model_version]
+    
+    def lime_sections(self, features: np.ndarray,
+                      num_samples: Optional[int] = None) -> List[Dict]:
+        """
+        xai_data['lime'] of every row of a feature matrix
+        
+        The perturbations of all rows are scored in one predict_success call;
+        a weighted ridge model is then fitted per row, as
+        LimeTabularExplainer.explain_instance does.
+        
+        Args:
+            num_samples: Perturbations per row (default lime_sample_budget,
+                at most LIME_MAX_SAMPLES)
+        """
+        started = time.perf_counter()
+        explainer, perturbations = self.lime_explainer()
+        num_samples = min(num_samples or self.lime_sample_budget, LIME_MAX_SAMPLES)
+        features = np.atleast_2d(features)
+        offsets = perturbations[:num_samples]
+        mean, scale = explainer.scaler.mean_, explainer.scaler.scale_
+        
+        # (rows, samples, features) around each instance, scored at once
+        samples = features[:, None, :] + offsets[None] * scale
+        scores = self.predict_success(samples.reshape(-1, features.shape[1])) \
+            .reshape(len(features), num_samples)
+        scaled = (samples - mean) / scale
+        # Scaled distance to the instance is the norm of the offset itself
+        distances = np.linalg.norm(offsets, axis=1)
         
-        # Calculate average time and error rate from history
-        history = student.get('history', [])
+        sections = []
+        for i in range(len(features)):
+            intercept, weights, score, local_prediction = explainer.base.explain_instance_with_data(
+                scaled[i], scores[i][:, None], distances, 0, len(FEATURE_NAMES),
+                feature_selection='none'
+            )
+            sections.append({
+                'intercept': float(intercept),
+                'local_prediction': float(np.ravel(local_prediction)[0]),
+                'model_success_rate': float(scores[i, 0]),
+                'score': float(score),
+                'model_version': self.model_version,
+                'weights': {FEATURE_NAMES[f]: float(w) for f, w in weights},
+                'num_samples': num_samples
+            })
+        
+        latency_ms = (time.perf_counter() - started) * 1000
+        for section in sections:
+            section['latency_ms'] = latency_ms
+        return sections
+    
+    def resolve_method(self, method: Optional[str] = None) -> str:
+        """
+        Attribution method to use, falling back to 'simplified' when the
+        requested library is not installed
+        
+        The default is always 'simplified', so a request's explanation never
+        depends on whether a backend has loaded yet. An explicitly requested
+        'shap' or 'lime' is imported on demand.
+        """
+        if method is None:
+            return 'simplified'
+        if method not in EXPLANATION_METHODS:
+            raise ValueError(f"Unknown explanation method '{method}'")
+        if (method == 'shap' and not (self.shap_available and load_backend('shap'))) or \
+                (method == 'lime' and not (self.lime_available and load_backend('lime'))):
+            return 'simplified'
+        return method
+    
+    def attribution_sections(self, features: np.ndarray, method: str) -> List[Optional[Dict]]:
+        """Per-row xai_data section of a resolved method (None for 'simplified')"""
+        if method == 'shap':
+            return self.shap_sections(features)
+        if method == 'lime':
+            return self.lime_sections(features)
+        return [None] * len(np.atleast_2d(features))
+    
+    def student_features(self, student: Dict) -> np.ndarray:
+        """
+        Student-level features, computed once per student
+        
+        Returns:
+            [time_avg, error_rate, anxiety_level, attempts_avg] (normalized)
+        """
+        history = student.get('history', [])[-HISTORY_WINDOW:]
         if history:
-            avg_time = np.mean([h.get('time_taken', 30) for h in history[-10:]])
-            error_rate = 1 - np.mean([1 if h.get('is_correct', False) else 0 
-                                     for h in history[-10:]])
-            avg_attempts = np.mean([h.get('attempts', 1) for h in history[-10:]])
+            # Recent history as one (time, correct, attempts) x interactions array
+            avg_time, accuracy, avg_attempts = np.array(
+                [[h.get('time_taken', 30) for h in history],
+                 [1.0 if h.get('is_correct', False) else 0.0 for h in history],
+                 [h.get('attempts', 1) for h in history]], dtype=float
+            ).mean(axis=1)
+            error_rate = 1 - accuracy
         else:
             avg_time = 30.0
             error_rate = 0.5
             avg_attempts = 1.0
         
-        # Normalize features
-        features = np.array([
-            mastery_target,                    # 0: Target topic mastery
-            prereq_masteries[0],              # 1: Prerequisite 1 mastery
-            prereq_masteries[1],              # 2: Prerequisite 2 mastery
-            prereq_masteries[2],              # 3: Prerequisite 3 mastery
-            question.get('difficulty', 1.0),   # 4: Question difficulty
-            avg_time / 300.0,                 # 5: Normalized average time
+        return np.array([
+            avg_time / 300.0,                  # 5: Normalized average time
             error_rate,                        # 6: Error rate
             student.get('anxiety_level', 0.5), # 7: Anxiety level
             avg_attempts / 5.0                 # 8: Normalized average attempts
         ])
+    
+    def gather_mastery(self, knowledge_vector: np.ndarray, topic_ids: np.ndarray) -> np.ndarray:
+        """Masteries of any array of topic ids (DEFAULT_MASTERY outside the vector)"""
+        knowledge_vector = np.asarray(knowledge_vector, dtype=float)
+        in_range = topic_ids < len(knowledge_vector)
+        mastery = np.full(topic_ids.shape, DEFAULT_MASTERY)
+        mastery[in_range] = knowledge_vector[topic_ids[in_range]]
+        return mastery
+    
+    def prerequisite_masteries(self, knowledge_vector: np.ndarray,
+                               topic_ids: np.ndarray) -> np.ndarray:
+        """
+        Masteries of the prerequisites of each topic, shape (topics, PREREQUISITE_SLOTS)
+        
+        One gather through the padded prerequisite index; padding and topics
+        outside the syllabus get DEFAULT_MASTERY.
+        """
+        in_syllabus = (topic_ids >= 0) & (topic_ids < len(self.prerequisite_index))
+        prerequisites = np.full((len(topic_ids), PREREQUISITE_SLOTS), -1, dtype=np.int64)
+        prerequisites[in_syllabus] = self.prerequisite_index[topic_ids[in_syllabus]]
+        
+        masteries = np.full(prerequisites.shape, DEFAULT_MASTERY)
+        known = prerequisites >= 0
+        masteries[known] = self.gather_mastery(knowledge_vector, prerequisites[known])
+        return masteries
+    
+    def feature_matrix(self, student: Dict, questions: List[Dict],
+                       knowledge_vector: np.ndarray,
+                       student_features: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Features of every candidate question of one student in one pass
         
+        Returns:
+            Shape (questions, FEATURE_NAMES)
+        """
+        if student_features is None:
+            student_features = self.student_features(student)
+        topic_ids = np.array([q['topic_id'] for q in questions], dtype=np.int64)
+        
+        features = np.empty((len(questions), len(FEATURE_NAMES)))
+        features[:, 0] = self.gather_mastery(knowledge_vector, topic_ids)
+        features[:, 1:4] = self.prerequisite_masteries(knowledge_vector, topic_ids)
+        features[:, 4] = [q.get('difficulty', 1.0) for q in questions]
+        features[:, STUDENT_FEATURES] = student_features
         return features
     
+    def extract_features(self, student: Dict, question: Dict, 
+                        knowledge_vector: np.ndarray) -> np.ndarray:
+        """
+        Extract features for XAI analysis
+        
+        Returns feature vector:
+        [mastery_target, mastery_prereq1, mastery_prereq2, mastery_prereq3,
+         difficulty, time_avg, error_rate, anxiety_level, attempts_avg]
+        """
+        return self.feature_matrix(student, [question], knowledge_vector)[0]
+    
     def calculate_feature_importance(self, student: Dict, question: Dict,
                                     knowledge_vector: np.ndarray,
-                                    predicted_success_rate: float) -> Dict:
+                                    predicted_success_rate: float,
+                                    features: Optional[np.ndarray] = None,
+                                    method: Optional[str] = None,
+                                    attribution: Optional[Dict] = None) -> Dict:
         """
         Calculate feature importance for recommendation explanation
         
         Uses simplified SHAP-like approach if SHAP is not available
+        
+        Args:
+            features: Precomputed feature vector (a row of feature_matrix)
+            method: 'shap', 'lime' or 'simplified' (default: see resolve_method)
+            attribution: Precomputed attribution section of these features
         """
-        features = self.extract_features(student, question, knowledge_vector)
+        if features is None:
+            features = self.extract_features(student, question, knowledge_vector)
         
-        if self.shap_available:
-            return self._shap_explanation(student, question, knowledge_vector, 
-                                        predicted_success_rate, features)
+        method = self.resolve_method(method)
+        if method != 'simplified':
+            return self._attributed_explanation(student, question, knowledge_vector, 
+                                                predicted_success_rate, features,
+                                                method, attribution)
         else:
             return self._simplified_explanation(student, question, knowledge_vector,
                                               predicted_success_rate, features)
@@ -128,9 +700,8 @@ class XAIService:
                 'message': f"Your mastery in this topic is low ({mastery_target*100:.0f}%)"
             }
         
-        # 2. Prerequisite mastery importance
-        prereq_names = ['Fractions (G10_03)', 'LCM of Algebraic Expressions (G10_11)', 
-                       'Linear Equations (G10_14)']
+        # 2. Prerequisite mastery importance (padding slots have no name)
+        prereq_names = self.prerequisite_topic_names(topic_id)
         prereq_issues = []
         for i, prereq_name in enumerate(prereq_names):
             prereq_mastery = features[i + 1]
@@ -188,115 +759,172 @@ class XAIService:
     def _determine_recommendation_type(self, predicted_success: float, 
                                       features: np.ndarray) -> str:
         """Determine the type of recommendation"""
-        if predicted_success < 0.4:
-            return 'foundation_review'  # Too hard, need prerequisites
-        elif predicted_success < 0.6:
-            return 'scaffolded_learning'  # Challenging but achievable
-        elif predicted_success <= 0.8:
-            return 'optimal_challenge'  # Perfect learning zone
-        else:
-            return 'reinforcement'  # Easy, for mastery
+        return RECOMMENDATION_TYPES[self.recommendation_type_index(predicted_success)]
+    
+    def recommendation_type_index(self, predicted_success) -> np.ndarray:
+        """
+        Index into RECOMMENDATION_TYPES of any array of predicted success rates
+        
+        foundation_review: too hard, need prerequisites (< 0.4)
+        scaffolded_learning: challenging but achievable (< 0.6)
+        optimal_challenge: perfect learning zone (<= 0.8)
+        reinforcement: easy, for mastery
+        """
+        predicted_success = np.asarray(predicted_success)
+        return ((predicted_success >= 0.4).astype(np.int64) + (predicted_success >= 0.6)
+                + (predicted_success > 0.8))
     
-    def _shap_explanation(self, student: Dict, question: Dict,
-                         knowledge_vector: np.ndarray,
-                         predicted_success_rate: float,
-                         features: np.ndarray) -> Dict:
+    def rule_classes(self, features: np.ndarray, predicted_success) -> np.ndarray:
         """
-        SHAP-based explanation (if available)
+        Side of every threshold of _simplified_explanation, per row
+        
+        Part of the explanation cache key, so inputs on the same grid point
+        but on different sides of a threshold (e.g. a mastery of 0.396 and
+        0.404) never share an explanation.
+        
+        Args:
+            features: Feature vector or candidates x features matrix
+            predicted_success: Predicted success rate(s), one per row
+        
+        Returns:
+            Integer array, one row of classes per feature row
         """
-        # Simplified SHAP implementation
-        # In production, use actual SHAP explainer
-        return self._simplified_explanation(student, question, knowledge_vector,
-                                           predicted_success_rate, features)
+        features = np.atleast_2d(features)
+        mastery_target = features[:, 0]
+        prereqs = features[:, 1:4]
+        return np.column_stack([
+            mastery_target < 0.4,
+            prereqs < 0.4,
+            prereqs < 0.3,
+            features[:, 4] > mastery_target * 2.0,
+            features[:, 5] * 300.0 > 60,
+            features[:, 7] > 0.6,
+            features[:, 6] > 0.6,
+            np.atleast_1d(self.recommendation_type_index(predicted_success))
+        ]).astype(np.int64)
+    
+    def _attributed_explanation(self, student: Dict, question: Dict,
+                                knowledge_vector: np.ndarray,
+                                predicted_success_rate: float,
+                                features: np.ndarray, method: str,
+                                attribution: Optional[Dict] = None) -> Dict:
+        """
+        SHAP- or LIME-based explanation (if available)
+        
+        The rule-based factors are kept for the explanation text; the
+        attributions of the success model are added under xai_data[method],
+        largest first.
+        """
+        if attribution is None:
+            attribution = self.attribution_sections(features, method)[0]
+        
+        result = self._simplified_explanation(student, question, knowledge_vector,
+                                              predicted_success_rate, features)
+        result['method'] = method
+        result[method] = attribution
+        return result
     
     def generate_explanation_text(self, xai_result: Dict, 
                                  question: Dict, student: Dict) -> str:
         """
         Generate human-readable explanation text
         """
-        topic_name = question.get('topic_name', 'this topic')
+        topic_name = question.get('topic_name') or \
+            self.syllabus_topic_name(question.get('topic_id')) or 'this topic'
         predicted_success = xai_result['predicted_success_rate']
         rec_type = xai_result['recommendation_type']
         importance = xai_result['feature_importance']
         
-        explanation_parts = []
-        
-        # Header
-        explanation_parts.append(f"🎯 Adaptive Goal: Mastery in {topic_name}")
-        explanation_parts.append(f"Recommended Action: Focus on this question (Predicted Success: {predicted_success*100:.0f}%)")
-        explanation_parts.append("")
-        explanation_parts.append("✅ Why This Recommendation? (Explainable AI)")
-        explanation_parts.append("")
-        
         # Key reasons
         reasons = []
         
         # Low mastery
         if 'low_mastery_target' in importance:
             info = importance['low_mastery_target']
-            reasons.append(f"• Skill Gap: Your mastery in {topic_name} is {info['value']*100:.0f}%, indicating a need for focused practice.")
+            reasons.append(REASON_TEMPLATES['low_mastery_target'].format(
+                topic_name=topic_name, value=info['value'] * 100))
         
         # Prerequisite gaps
         if 'prerequisite_gaps' in importance:
-            prereq_info = importance['prerequisite_gaps']
-            for issue in prereq_info['issues']:
-                reasons.append(f"• Prerequisite Gap: {issue['topic']} mastery is only {issue['mastery']*100:.0f}%, which is critical for success.")
+            for issue in importance['prerequisite_gaps']['issues']:
+                reasons.append(REASON_TEMPLATES['prerequisite_gap'].format(
+                    topic=issue['topic'], mastery=issue['mastery'] * 100))
         
         # Difficulty mismatch
         if 'difficulty_mismatch' in importance:
             info = importance['difficulty_mismatch']
-            reasons.append(f"• Difficulty Level: This question's difficulty ({info['value']:.1f}) may be challenging given your current mastery ({info['mastery']*100:.0f}%).")
+            reasons.append(REASON_TEMPLATES['difficulty_mismatch'].format(
+                value=info['value'], mastery=info['mastery'] * 100))
         
         # Time/Anxiety
         if 'time_anxiety' in importance:
-            info = importance['time_anxiety']
-            reasons.append(f"• Time/Anxiety Signal: Your average response time ({info['avg_time']:.0f}s) and anxiety level suggest you may benefit from a more structured approach.")
+            reasons.append(REASON_TEMPLATES['time_anxiety'].format(
+                avg_time=importance['time_anxiety']['avg_time']))
         
         # High error rate
         if 'high_error_rate' in importance:
-            info = importance['high_error_rate']
-            reasons.append(f"• Performance Pattern: Recent error rate is {info['value']*100:.0f}%, indicating a need for review.")
+            reasons.append(REASON_TEMPLATES['high_error_rate'].format(
+                value=importance['high_error_rate']['value'] * 100))
         
         # If no specific issues, provide positive explanation
         if not reasons:
-            if rec_type == 'optimal_challenge':
-                reasons.append("• Optimal Challenge: This question is in your optimal learning zone (60-80% success rate), maximizing learning efficiency.")
-            elif rec_type == 'reinforcement':
-                reasons.append("• Reinforcement: This question will help solidify your understanding and build confidence.")
-            else:
-                reasons.append("• Personalized Path: This recommendation is based on your current knowledge state and learning trajectory.")
-        
-        explanation_parts.extend(reasons)
-        explanation_parts.append("")
-        
-        # Path forward
-        if rec_type == 'foundation_review':
-            explanation_parts.append("📚 The Path Forward:")
-            explanation_parts.append("We are prioritizing foundation review to stabilize prerequisite skills before proceeding to more advanced topics. This is an efficient, low-stress path to mastery.")
-        elif rec_type == 'scaffolded_learning':
-            explanation_parts.append("📚 The Path Forward:")
-            explanation_parts.append("This question provides appropriate scaffolding - challenging enough to promote growth, but achievable with your current skills.")
-        elif rec_type == 'optimal_challenge':
-            explanation_parts.append("📚 The Path Forward:")
-            explanation_parts.append("This question is perfectly calibrated to your current level, ensuring maximum learning gain with minimal frustration.")
-        else:
-            explanation_parts.append("📚 The Path Forward:")
-            explanation_parts.append("This recommendation aligns with your learning goals and current progress trajectory.")
+            reasons.append(DEFAULT_REASONS.get(rec_type, DEFAULT_REASONS[None]))
         
-        return "\n".join(explanation_parts)
+        # Header, reasons and path forward
+        header = EXPLANATION_HEADER.format(topic_name=topic_name, success=predicted_success * 100)
+        return (header + "\n" + "\n".join(reasons) + "\n\n"
+                + PATH_FORWARD.get(rec_type, PATH_FORWARD[None]))
     
     def explain_recommendation(self, student: Dict, question: Dict,
                               knowledge_vector: np.ndarray,
-                              predicted_success_rate: float) -> Dict:
+                              predicted_success_rate: float,
+                              features: Optional[np.ndarray] = None,
+                              method: Optional[str] = None,
+                              attribution: Optional[Dict] = None) -> Dict:
         """
         Main method to generate explanation for a recommendation
         
+        Served from the explanation cache when enabled. Explanations are
+        built from the exact inputs and keyed on the cache grid and the
+        threshold classes, so a cached explanation makes the same rule
+        decisions as a fresh one; its figures may differ by under half a
+        grid step. Every call returns its own copy.
+        
+        Args:
+            method: 'shap', 'lime' or 'simplified' (default: see resolve_method)
+            attribution: Precomputed attribution section (bypasses the cache)
+        
         Returns:
             Dictionary with explanation data and text
         """
+        if features is None:
+            features = self.extract_features(student, question, knowledge_vector)
+        method = self.resolve_method(method)
+        if self.cache is None or attribution is not None:
+            return self._build_explanation(student, question, knowledge_vector,
+                                           predicted_success_rate, features, method,
+                                           attribution)
+        
+        key = self.cache.key(method, self.model_version, question, features,
+                             predicted_success_rate,
+                             self.rule_classes(features, predicted_success_rate)[0])
+        explanation = self.cache.get(key)
+        if explanation is None:
+            explanation = self._build_explanation(student, question, knowledge_vector,
+                                                  predicted_success_rate, features, method)
+            self.cache.put(key, explanation)
+        return copy.deepcopy(explanation)
+    
+    def _build_explanation(self, student: Dict, question: Dict,
+                           knowledge_vector: np.ndarray,
+                           predicted_success_rate: float,
+                           features: np.ndarray, method: str,
+                           attribution: Optional[Dict] = None) -> Dict:
+        """Explanation of one recommendation (uncached)"""
         # Calculate feature importance
         xai_result = self.calculate_feature_importance(
-            student, question, knowledge_vector, predicted_success_rate
+            student, question, knowledge_vector, predicted_success_rate, features,
+            method, attribution
         )
         
         # Generate explanation text
@@ -311,6 +939,237 @@ class XAIService:
             'confidence': predicted_success_rate
         }
     
+    def explain_recommendations(self, student: Dict, questions: List[Dict],
+                                knowledge_vector: np.ndarray,
+                                predicted_success_rates: Optional[List[float]] = None,
+                                top_k: Optional[int] = None,
+                                method: Optional[str] = None) -> List[Dict]:
+        """
+        Explanations for several candidate questions of one student in one call
+        
+        Student-level features are computed once and the candidates x features
+        matrix is built in a single vectorized pass. Cached candidates are
+        looked up; attributions are computed in one batch for the rest.
+        
+        Args:
+            questions: Candidate questions, best first (e.g. all_recommendations)
+            predicted_success_rates: Per question; defaults to each question's
+                'predicted_success_rate'
+            top_k: Explain only the first top_k candidates
+            method: 'shap', 'lime' or 'simplified' (default: see
+                resolve_method); attributions of all candidates are computed
+                in one batch
+        
+        Returns:
+            One explanation (as from explain_recommendation) per candidate
+        """
+        questions = questions[:top_k] if top_k else questions
+        if predicted_success_rates is None:
+            predicted_success_rates = [q.get('predicted_success_rate', 0.5) for q in questions]
+        if not questions:
+            return []
+        
+        features = self.feature_matrix(student, questions, knowledge_vector)
+        method = self.resolve_method(method)
+        
+        explanations = [None] * len(questions)
+        if self.cache is not None:
+            classes = self.rule_classes(features, predicted_success_rates)
+            keys = [self.cache.key(method, self.model_version, question, row, rate, row_classes)
+                    for question, row, rate, row_classes
+                    in zip(questions, features, predicted_success_rates, classes)]
+            for i, key in enumerate(keys):
+                explanations[i] = self.cache.get(key)
+        
+        missing = [i for i, explanation in enumerate(explanations) if explanation is None]
+        if missing:
+            attributions = self.attribution_sections(features[missing], method)
+            for i, attribution in zip(missing, attributions):
+                explanations[i] = self._build_explanation(
+                    student, questions[i], knowledge_vector, predicted_success_rates[i],
+                    features[i], method, attribution
+                )
+                if self.cache is not None:
+                    self.cache.put(keys[i], explanations[i])
+        
+        results = []
+        for question, explanation in zip(questions, explanations):
+            explanation = copy.deepcopy(explanation)
+            explanation['question_id'] = question.get('question_id')
+            results.append(explanation)
+        return results
+    
+    def explain_counterfactual(self, student: Dict, question: Dict,
+                               knowledge_vector: np.ndarray,
+                               predicted_success_rate: Optional[float] = None) -> Dict:
+        """
+        Minimal feature changes that would change the recommendation type
+        
+        Evaluates, in one predict_success call, a fine sweep of every
+        changeable feature on its own (masteries of the topic and its
+        prerequisites, difficulty, error rate) and a joint grid of
+        COUNTERFACTUAL_JOINT_LEVELS values per feature. Success rates are
+        anchored on the predicted success rate: a perturbed vector scores
+        predicted_success_rate + predict_success(perturbed) - predict_success(current).
+        
+        Args:
+            predicted_success_rate: The recommender's prediction for the
+                question (default: predict_success of the current features)
+        
+        Returns:
+            Dictionary with the current recommendation type, the smallest
+            flipping change of every single feature, the smallest joint
+            change and explanation text
+        """
+        started = time.perf_counter()
+        features = self.extract_features(student, question, knowledge_vector)
+        model_success = self.predict_success(features)[0]
+        if predicted_success_rate is None:
+            predicted_success_rate = float(model_success)
+        current_type = self.recommendation_type_index(predicted_success_rate)
+        
+        # Changeable features: padding prerequisite slots are left out
+        prereq_names = self.prerequisite_topic_names(question['topic_id'])
+        labels = {'mastery_target': f"{self.syllabus_topic_name(question['topic_id']) or 'topic'} mastery",
+                  'difficulty': 'question difficulty', 'error_rate': 'recent error rate'}
+        for i, name in enumerate(prereq_names):
+            labels[f'mastery_prereq{i + 1}'] = f"{name} mastery"
+        names = [name for name in COUNTERFACTUAL_STEPS if name in labels]
+        columns = np.array([FEATURE_NAMES.index(name) for name in names])
+        low, high = FEATURE_RANGES[columns, 0], FEATURE_RANGES[columns, 1]
+        
+        # Single-feature sweeps: one row per (feature, value)
+        sweeps = [np.round(np.arange(low[j], high[j] + 1e-9, COUNTERFACTUAL_STEPS[name]), 6)
+                  for j, name in enumerate(names)]
+        sweep_rows = np.repeat(features[None], sum(len(v) for v in sweeps), axis=0)
+        sweep_feature = np.repeat(np.arange(len(names)), [len(v) for v in sweeps])
+        sweep_rows[np.arange(len(sweep_rows)), columns[sweep_feature]] = np.concatenate(sweeps)
+        
+        # Joint grid: every combination of the levels of all features
+        levels = [np.union1d(np.linspace(low[j], high[j], COUNTERFACTUAL_JOINT_LEVELS),
+                             [features[c]]) for j, c in enumerate(columns)]
+        joint_rows = np.repeat(features[None], np.prod([len(v) for v in levels]), axis=0)
+        joint_rows[:, columns] = np.stack(np.meshgrid(*levels, indexing='ij'), axis=-1) \
+            .reshape(-1, len(columns))
+        
+        rows = np.concatenate([sweep_rows, joint_rows])
+        success = np.clip(predicted_success_rate + self.predict_success(rows) - model_success, 0.0, 1.0)
+        types = self.recommendation_type_index(success)
+        flipped = types != current_type
+        # Change relative to each feature's range
+        distance = (np.abs(rows[:, columns] - features[columns]) / (high - low)).sum(axis=1)
+        
+        def change(row: int) -> Dict:
+            return {
+                'changes': {name: {'from': float(features[c]), 'to': float(rows[row, c])}
+                            for name, c in zip(names, columns)
+                            if not np.isclose(rows[row, c], features[c])},
+                'recommendation_type': RECOMMENDATION_TYPES[types[row]],
+                'predicted_success_rate': float(success[row]),
+                'distance': float(distance[row])
+            }
+        
+        single_feature = []
+        for j, name in enumerate(names):
+            candidates = np.flatnonzero(flipped[:len(sweep_rows)] & (sweep_feature == j))
+            if len(candidates):
+                single_feature.append(change(candidates[np.argmin(distance[candidates])]))
+        single_feature.sort(key=lambda c: c['distance'])
+        
+        joint = np.flatnonzero(flipped)
+        minimal_change = change(joint[np.argmin(distance[joint])]) if len(joint) else None
+        
+        lines = [f"Current recommendation: {RECOMMENDATION_TYPES[current_type].replace('_', ' ')} "
+                 f"(Predicted Success: {predicted_success_rate*100:.0f}%)"]
+        def display(name: str, value: float) -> str:
+            return f"{value:.1f}" if name == 'difficulty' else f"{value*100:.0f}%"
+        
+        for item in single_feature:
+            (name, values), = item['changes'].items()
+            verb = 'Raise' if values['to'] > values['from'] else 'Lower'
+            lines.append(f"• {verb} {labels[name]} from {display(name, values['from'])} "
+                         f"to {display(name, values['to'])} "
+                         f"→ {item['recommendation_type'].replace('_', ' ')}")
+        if not single_feature:
+            lines.append("• No single change within the searched ranges alters this recommendation.")
+        
+        return {
+            'method': 'counterfactual',
+            'recommendation_type': RECOMMENDATION_TYPES[current_type],
+            'predicted_success_rate': predicted_success_rate,
+            'single_feature': single_feature,
+            'minimal_change': minimal_change,
+            'grid_size': len(rows),
+            'explanation': "\n".join(lines),
+            'latency_ms': (time.perf_counter() - started) * 1000
+        }
+    
+    def explain_mastery(self, dkt_model, student_history: List[Dict], topic_id: int,
+                        topic_name: Optional[str] = None, steps: Optional[int] = None,
+                        top_k: int = MASTERY_TOP_INTERACTIONS) -> Dict:
+        """
+        Explain the DKT model's mastery of a topic by the student's past answers
+        
+        Integrated gradients of the topic's mastery output with respect to the
+        input history (DKTModel.integrated_gradients): each interaction gets
+        the share of the mastery it is responsible for.
+        
+        Args:
+            dkt_model: Loaded DKTModel
+            student_history: Past interactions, oldest first
+            topic_id: Knowledge-vector index of the recommended topic
+            topic_name: Display name of the topic
+            steps: Interpolation steps (default: the model's IG_STEPS)
+            top_k: Most influential interactions named in the text
+        
+        Returns:
+            Dictionary with per-interaction attributions and explanation text
+        """
+        started = time.perf_counter()
+        kwargs = {'steps': steps} if steps else {}
+        result = dkt_model.integrated_gradients(student_history, topic_id, **kwargs)
+        attributions = result['attributions']
+        components = result['components']
+        
+        interactions = []
+        for i, interaction in enumerate(student_history):
+            interactions.append({
+                'index': i,
+                'question_id': interaction.get('question_id'),
+                'topic_id': interaction.get('topic_id'),
+                'is_correct': bool(interaction.get('is_correct', 0)),
+                'attribution': float(attributions[i]),
+                'components': {
+                    name: float(components[i, c])
+                    for c, name in enumerate(result['component_names'])
+                }
+            })
+        top = [int(i) for i in np.argsort(-np.abs(attributions))[:top_k]]
+        
+        topic_name = topic_name or self.syllabus_topic_name(topic_id) or f'topic {topic_id}'
+        lines = [f"🧠 Mastery in {topic_name}: {result['mastery']*100:.0f}% "
+                 f"(starting point {result['baseline_mastery']*100:.0f}%)",
+                 "",
+                 "Past answers that shaped this estimate most:"]
+        for i in top:
+            item = interactions[i]
+            outcome = 'Correct' if item['is_correct'] else 'Incorrect'
+            lines.append(f"• {outcome} answer #{i + 1} (question {item['question_id']}, "
+                         f"topic {item['topic_id']}): {item['attribution']*100:+.1f} points")
+        
+        return {
+            'method': 'integrated_gradients',
+            'topic_id': topic_id,
+            'mastery': result['mastery'],
+            'baseline_mastery': result['baseline_mastery'],
+            'convergence_delta': result['convergence_delta'],
+            'steps': result['steps'],
+            'interactions': interactions,
+            'top_interactions': top,
+            'explanation': "\n".join(lines),
+            'latency_ms': (time.perf_counter() - started) * 1000
+        }
+    
     def _extract_key_factors(self, xai_result: Dict) -> List[str]:
         """Extract key factors for quick summary"""
         factors = []
@@ -29,7 +29,7 @@ const quizSchema = new mongoose.Schema({
   },
   type: {
     type: String,
-    enum: ['adaptive', 'model-paper', 'practice'],
+    enum: ['adaptive', 'model-paper', 'practice', 'cat'],
     default: 'adaptive'
   },
   questions: [questionSchema],
@@ -53,6 +53,13 @@ const quizSchema = new mongoose.Schema({
     enum: ['in-progress', 'completed', 'abandoned'],
     default: 'in-progress'
   },
+  // Computerized adaptive test (type 'cat'): ML service session and ability estimate
+  catSession: {
+    sessionId: String,
+    ability: Number,
+    standardError: Number,
+    finished: Boolean
+  },
   adaptiveParams: {
     initialDifficulty: Number,
     adjustments: [{
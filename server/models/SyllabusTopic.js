@@ -36,6 +36,7 @@ const syllabusTopicSchema = new mongoose.Schema({
     enum: [10, 11]
   },
   subTopics: [subTopicSchema],
+  prerequisites: [String],
   createdAt: {
     type: Date,
     default: Date.now
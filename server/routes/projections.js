@@ -41,12 +41,46 @@ router.post('/run', protect, async (req, res) => {
   }
 });
 
-// @route   GET /api/projections/report
+// @route   GET /api/projections/jobs/:jobId
+// @desc    Get projection job status and progress
+// @access  Private
+router.get('/jobs/:jobId', protect, async (req, res) => {
+  try {
+    const job = await projectionService.getProjectionJob(req.params.jobId);
+    res.json(job);
+  } catch (error) {
+    const status = error.response?.status || 500;
+    res.status(status).json({
+      success: false,
+      message: 'Error fetching projection job',
+      error: error.response?.data?.error || error.message
+    });
+  }
+});
+
+// @route   GET /api/projections/runs
+// @desc    List completed projection runs
+// @access  Private
+router.get('/runs', protect, async (req, res) => {
+  try {
+    const runs = await projectionService.listRuns();
+    res.json({ success: true, runs });
+  } catch (error) {
+    console.error('List projection runs error:', error);
+    res.status(500).json({
+      success: false,
+      message: 'Error listing projection runs',
+      error: error.message
+    });
+  }
+});
+
+// @route   GET /api/projections/report?runId=
 // @desc    Get projection report
 // @access  Private
 router.get('/report', protect, async (req, res) => {
   try {
-    const result = await projectionService.getProjectionReport();
+    const result = await projectionService.getProjectionReport(req.query.runId);
     res.json(result);
   } catch (error) {
     console.error('Get projection report error:', error);
@@ -58,12 +92,12 @@ router.get('/report', protect, async (req, res) => {
   }
 });
 
-// @route   GET /api/projections/visualizations
+// @route   GET /api/projections/visualizations?runId=
 // @desc    Get available visualizations
 // @access  Private
 router.get('/visualizations', protect, async (req, res) => {
   try {
-    const result = await projectionService.getVisualizations();
+    const result = await projectionService.getVisualizations(req.query.runId);
     res.json(result);
   } catch (error) {
     console.error('Get visualizations error:', error);
@@ -75,7 +109,7 @@ router.get('/visualizations', protect, async (req, res) => {
   }
 });
 
-// @route   GET /api/projections/visualization/:filename
+// @route   GET /api/projections/visualization/:filename?runId=
 // @desc    Serve visualization image
 // @access  Private
 router.get('/visualization/:filename', protect, async (req, res) => {
@@ -88,7 +122,12 @@ router.get('/visualization/:filename', protect, async (req, res) => {
       return res.status(403).json({ success: false, message: 'Invalid file' });
     }
 
-    const filePath = path.join(__dirname, '../../ml-services', filename);
+    let filePath;
+    try {
+      filePath = await projectionService.getArtifactPath(filename, req.query.runId);
+    } catch (error) {
+      return res.status(400).json({ success: false, message: error.message });
+    }
     
     try {
       await fs.access(filePath);
@@ -52,7 +52,8 @@ router.get('/generate', protect, async (req, res) => {
         questions: mlResponse.data.questions,
         timeStarted: new Date(),
         status: 'in-progress',
-        adaptiveParams: mlResponse.data.adaptiveParams || {}
+        adaptiveParams: mlResponse.data.adaptiveParams || {},
+        catSession: catSessionFields(mlResponse.data.catSession)
       });
 
       res.json({
@@ -61,7 +62,8 @@ router.get('/generate', protect, async (req, res) => {
           id: quiz._id,
           questions: quiz.questions,
           type: quiz.type,
-          timeLimit: quiz.timeLimit
+          timeLimit: quiz.timeLimit,
+          catSession: quiz.catSession
         }
       });
     } catch (mlError) {
@@ -77,9 +79,11 @@ router.get('/generate', protect, async (req, res) => {
           });
         }
 
+        // The database fallback cannot run an adaptive test, so CAT falls back to a fixed quiz
+        const fallbackType = type === 'cat' ? 'adaptive' : type;
         const quiz = await Quiz.create({
           userId: req.user._id,
-          type,
+          type: fallbackType,
           questions: questions,
           timeStarted: new Date(),
           status: 'in-progress',
@@ -278,13 +282,117 @@ router.post('/submit', protect, async (req, res) => {
   }
 });
 
+// @route   POST /api/quiz/cat/answer
+// @desc    Answer the current question of an adaptive test (CAT) and get the next one;
+//          the finished test is scored through /api/quiz/submit like any quiz
+// @access  Private
+router.post('/cat/answer', protect, async (req, res) => {
+  try {
+    const { quizId, selectedAnswer } = req.body;
+
+    const quiz = await Quiz.findOne({
+      _id: quizId,
+      userId: req.user._id,
+      type: 'cat'
+    });
+
+    if (!quiz || !quiz.catSession || !quiz.catSession.sessionId) {
+      return res.status(404).json({
+        success: false,
+        message: 'Adaptive test not found'
+      });
+    }
+
+    if (quiz.status !== 'in-progress' || quiz.catSession.finished) {
+      return res.status(409).json({
+        success: false,
+        message: 'Adaptive test has already finished'
+      });
+    }
+
+    try {
+      const mlResponse = await axios.post(
+        `${process.env.ML_SERVICE_URL || 'http://localhost:5001'}/cat/answer`,
+        {
+          sessionId: quiz.catSession.sessionId,
+          answer: selectedAnswer
+        }
+      );
+
+      quiz.questions.push(...mlResponse.data.questions);
+      quiz.catSession = catSessionFields(mlResponse.data.catSession);
+      await quiz.save();
+
+      res.json({
+        success: true,
+        correct: mlResponse.data.correct,
+        question: quiz.questions.length > 0 && !quiz.catSession.finished
+          ? quiz.questions[quiz.questions.length - 1]
+          : null,
+        catSession: quiz.catSession
+      });
+    } catch (mlError) {
+      console.error('ML Service Error:', mlError);
+      const status = mlError.response && mlError.response.status === 404 ? 410 : 503;
+      res.status(status).json({
+        success: false,
+        message: status === 410
+          ? 'Adaptive test session has expired'
+          : 'Adaptive test service temporarily unavailable'
+      });
+    }
+  } catch (error) {
+    console.error('CAT answer error:', error);
+    res.status(500).json({
+      success: false,
+      message: 'Error answering adaptive test question'
+    });
+  }
+});
+
+// Quizzes whose questions are left out of a new model paper
+const RECENT_QUIZZES_EXCLUDED = 5;
+
 // @route   GET /api/quiz/model-paper
 // @desc    Generate model paper (full exam simulation)
 // @access  Private
-router.get('/model-paper', protect, async (req, res) => {
+router.get('/model-paper', protect, (req, res) => generateModelPaper(req, res));
+
+// @route   POST /api/quiz/model-paper
+// @desc    Generate model paper to a blueprint (body: { blueprint })
+// @access  Private
+router.post('/model-paper', protect, (req, res) => generateModelPaper(req, res, req.body?.blueprint));
+
+async function generateModelPaper(req, res, requestedBlueprint) {
   try {
+    if (requestedBlueprint !== undefined && (typeof requestedBlueprint !== 'object' ||
+        requestedBlueprint === null || Array.isArray(requestedBlueprint) ||
+        (requestedBlueprint.excludeQuestionIds !== undefined &&
+          !Array.isArray(requestedBlueprint.excludeQuestionIds)))) {
+      return res.status(400).json({
+        success: false,
+        message: 'blueprint must be an object (excludeQuestionIds a list)'
+      });
+    }
+
     const user = await User.findById(req.user._id);
 
+    // Leave out the questions the student has seen recently
+    const recentQuizzes = await Quiz.find({ userId: req.user._id })
+      .sort({ createdAt: -1 })
+      .limit(RECENT_QUIZZES_EXCLUDED)
+      .select('questions.questionId');
+    const recentQuestionIds = recentQuizzes
+      .flatMap(quiz => quiz.questions.map(q => q.questionId))
+      .filter(Boolean);
+    const blueprint = {
+      ...requestedBlueprint,
+      excludeQuestionIds: [...new Set([
+        ...(requestedBlueprint?.excludeQuestionIds || []),
+        ...recentQuestionIds
+      ])]
+    };
+
     // Call ML service for model paper generation
     try {
       const mlResponse = await axios.post(
@@ -294,7 +402,8 @@ router.get('/model-paper', protect, async (req, res) => {
           userPerformance: {
             averageScore: user.performance.averageScore,
             mastery: user.profile.syllabusTopics
-          }
+          },
+          blueprint
         }
       );
 
@@ -313,9 +422,17 @@ router.get('/model-paper', protect, async (req, res) => {
           id: quiz._id,
           questions: quiz.questions,
           timeLimit: quiz.timeLimit
-        }
+        },
+        blueprintReport: mlResponse.data.blueprintReport
       });
     } catch (mlError) {
+      // An invalid blueprint is the caller's error, not an outage
+      if (mlError.response?.status === 400) {
+        return res.status(400).json({
+          success: false,
+          message: mlError.response.data.error
+        });
+      }
       console.error('ML Service Error:', mlError);
       res.status(503).json({
         success: false,
@@ -329,7 +446,7 @@ router.get('/model-paper', protect, async (req, res) => {
       message: 'Error generating model paper'
     });
   }
-});
+}
 
 // @route   GET /api/quiz/history
 // @desc    Get quiz history
@@ -438,6 +555,19 @@ router.get('/:id', protect, async (req, res) => {
   }
 });
 
+// Adaptive test session fields stored on a quiz (undefined for other quiz types)
+function catSessionFields(catSession) {
+  if (!catSession) {
+    return undefined;
+  }
+  return {
+    sessionId: catSession.sessionId,
+    ability: catSession.ability,
+    standardError: catSession.standardError,
+    finished: catSession.finished
+  };
+}
+
 // Helper function to generate quiz from database
 async function generateQuizFromDatabase(topic, difficulty, type) {
   try {
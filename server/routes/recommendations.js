@@ -53,11 +53,26 @@ router.get('/adaptive', protect, async (req, res) => {
         const knowledgeState = await dktService.predictKnowledgeState(history);
         
         if (knowledgeState.success) {
-          const xaiExplanation = await projectionService.getXAIExplanation(
-            recommendation.recommendation,
-            user.toObject(),
-            knowledgeState.knowledge_vector
-          );
+          // Explanations for the top candidates, fetched in one batch request;
+          // the first candidate is the top recommendation
+          let xaiExplanation;
+          if (recommendation.all_recommendations?.length) {
+            const explanations = await projectionService.getXAIExplanations(
+              recommendation.all_recommendations,
+              user.toObject(),
+              knowledgeState.knowledge_vector
+            );
+            explanations.forEach((explanation, i) => {
+              recommendation.all_recommendations[i].xai_explanation = explanation;
+            });
+            xaiExplanation = explanations[0];
+          } else {
+            xaiExplanation = await projectionService.getXAIExplanation(
+              recommendation.recommendation,
+              user.toObject(),
+              knowledgeState.knowledge_vector
+            );
+          }
           
           recommendation.xai_explanation = xaiExplanation;
 
@@ -1,8 +1,12 @@
 const axios = require('axios');
 const { spawn } = require('child_process');
+const crypto = require('crypto');
 const path = require('path');
 const fs = require('fs').promises;
 
+// Run ids are used as directory names under projection_runs
+const RUN_ID_PATTERN = /^[A-Za-z0-9_-]{1,64}$/;
+
 /**
  * Projection Service - Communicates with Python projection system
  */
@@ -10,28 +14,130 @@ class ProjectionService {
   constructor() {
     this.dktServiceURL = process.env.DKT_SERVICE_URL || 'http://localhost:5002';
     this.mlServiceURL = process.env.ML_SERVICE_URL || 'http://localhost:5001';
+    this.projectionServiceURL = process.env.PROJECTION_SERVICE_URL || 'http://localhost:5003';
+    this.pollInterval = parseInt(process.env.PROJECTION_POLL_INTERVAL, 10) || 1000;
+    // Longest wait for a submitted job before it is reported as failed
+    this.jobTimeout = parseInt(process.env.PROJECTION_JOB_TIMEOUT, 10) || 30 * 60 * 1000;
     this.pythonPath = process.env.PYTHON_PATH || 'python';
     this.projectionDir = path.join(__dirname, '../../ml-services');
+    this.runsDir = path.join(this.projectionDir, 'projection_runs');
   }
 
   /**
    * Run projection simulation
+   * Uses the persistent projection service (warm model), falling back to
+   * spawning run_projection.py when the service is not running
    * @param {Object} params - Simulation parameters
    * @returns {Promise<Object>} Simulation results
    */
   async runProjection(params = {}) {
+    let job;
     try {
-      const {
-        numStudents = 100,
-        numSessions = 50,
-        targetTopic = 'G11_16',
-        targetMastery = 0.85
-      } = params;
+      job = await this.submitProjectionJob(params);
+    } catch (error) {
+      // Only a service that never accepted the job is replaced by a local run;
+      // once accepted, falling back would start a duplicate projection
+      if (error.code === 'ECONNREFUSED') {
+        console.warn('[Projection] Projection service unavailable, spawning run_projection.py');
+        return this.spawnProjection(params);
+      }
+      console.error('Projection service error:', error.message);
+      throw error;
+    }
+    return this.waitForProjectionJob(job);
+  }
+
+  /**
+   * Submit a projection job to the projection service
+   * @param {Object} params - Simulation parameters
+   * @returns {Promise<Object>} Queued job status
+   */
+  async submitProjectionJob(params = {}) {
+    const {
+      numStudents = 100,
+      numSessions = 50,
+      targetTopic = 'G11_16',
+      targetMastery = 0.85
+    } = params;
+
+    const response = await axios.post(`${this.projectionServiceURL}/projections`, {
+      num_students: numStudents,
+      num_sessions: numSessions,
+      target_topic: targetTopic,
+      target_mastery: targetMastery
+    });
+    return response.data;
+  }
+
+  /**
+   * Wait for a submitted projection job and fetch its report
+   * The job fails if it is not done within jobTimeout or its status cannot be read
+   * @param {Object} job - Job status returned on submission
+   * @returns {Promise<Object>} Simulation results
+   */
+  async waitForProjectionJob(job) {
+    const { job_id: jobId } = job;
+    const deadline = Date.now() + this.jobTimeout;
+
+    try {
+      while (job.status !== 'completed' && job.status !== 'failed') {
+        if (Date.now() >= deadline) {
+          throw new Error(`no result after ${this.jobTimeout / 1000}s`);
+        }
+        await new Promise((resolve) => setTimeout(resolve, this.pollInterval));
+        job = await this.getProjectionJob(jobId);
+        console.log(`[Projection] Job ${jobId}: ${job.status} (${(job.progress * 100).toFixed(0)}%)`);
+      }
+    } catch (error) {
+      console.error(`[Projection] Job ${jobId} failed:`, error.message);
+      throw new Error(`Projection job ${jobId} failed: ${error.message}`);
+    }
+
+    if (job.status === 'failed') {
+      throw new Error(`Projection failed: ${job.error}`);
+    }
+
+    const result = await axios.get(`${this.projectionServiceURL}/projections/${jobId}/result`);
+    return {
+      success: true,
+      jobId,
+      runId: result.data.run_id,
+      report: result.data.report,
+      message: 'Projection completed successfully'
+    };
+  }
+
+  /**
+   * Get status and progress of a projection job
+   * @param {string} jobId - Projection job ID
+   * @returns {Promise<Object>} Job status
+   */
+  async getProjectionJob(jobId) {
+    const response = await axios.get(`${this.projectionServiceURL}/projections/${jobId}`);
+    return response.data;
+  }
 
+  /**
+   * Run projection by spawning a Python process (no projection service)
+   * @param {Object} params - Simulation parameters
+   * @returns {Promise<Object>} Simulation results
+   */
+  async spawnProjection(params = {}) {
+    try {
       // Run Python simulation script
       return new Promise((resolve, reject) => {
         const scriptPath = path.join(this.projectionDir, 'run_projection.py');
-        const pythonProcess = spawn(this.pythonPath, [scriptPath], {
+        // Each run writes into its own directory under projection_runs
+        const runId = crypto.randomUUID();
+        // The checkpoint lives in the run's own directory, so concurrent runs
+        // never share it; an interrupted run can be resumed by hand with
+        // --run-id <runId> --checkpoint <same path> --resume
+        const args = [
+          scriptPath,
+          '--run-id', runId,
+          '--checkpoint', path.join(this.runsDir, runId, 'simulation_checkpoint.pkl')
+        ];
+        const pythonProcess = spawn(this.pythonPath, args, {
           cwd: this.projectionDir,
           env: { ...process.env, PYTHONUNBUFFERED: '1' }
         });
@@ -53,12 +159,11 @@ class ProjectionService {
           if (code === 0) {
             try {
               // Read generated report
-              const reportPath = path.join(this.projectionDir, 'simulation_report.json');
-              const reportData = await fs.readFile(reportPath, 'utf8');
-              const report = JSON.parse(reportData);
+              const report = await this.readRunReport(runId);
 
               resolve({
                 success: true,
+                runId,
                 report,
                 message: 'Projection completed successfully'
               });
@@ -80,18 +185,79 @@ class ProjectionService {
     }
   }
 
+  /**
+   * Resolve a run id, defaulting to the most recently completed run
+   * @param {string} [runId] - Projection run ID
+   * @returns {Promise<string|null>} Run ID, or null if no run has completed
+   */
+  async resolveRunId(runId) {
+    if (runId) {
+      if (!RUN_ID_PATTERN.test(runId)) {
+        throw new Error(`Invalid run id: ${runId}`);
+      }
+      return runId;
+    }
+    const runs = await this.listRuns();
+    return runs.length ? runs[runs.length - 1].run_id : null;
+  }
+
+  /**
+   * List completed projection runs (oldest first)
+   * @returns {Promise<Array>} Run index records
+   */
+  async listRuns() {
+    try {
+      const index = await fs.readFile(path.join(this.runsDir, 'index.jsonl'), 'utf8');
+      return index.split('\n').filter((line) => line.trim()).map((line) => JSON.parse(line));
+    } catch (error) {
+      if (error.code === 'ENOENT') {
+        return [];
+      }
+      throw error;
+    }
+  }
+
+  /**
+   * Read the report of one run
+   * @param {string} runId - Projection run ID
+   * @returns {Promise<Object>} Simulation report
+   */
+  async readRunReport(runId) {
+    const reportPath = path.join(this.runsDir, runId, 'simulation_report.json');
+    const reportData = await fs.readFile(reportPath, 'utf8');
+    return JSON.parse(reportData);
+  }
+
+  /**
+   * Get path of a run artifact (chart or summary)
+   * @param {string} filename - Artifact file name
+   * @param {string} [runId] - Projection run ID (default: latest run)
+   * @returns {Promise<string|null>} Artifact path, or null if no run has completed
+   */
+  async getArtifactPath(filename, runId) {
+    const resolvedRunId = await this.resolveRunId(runId);
+    return resolvedRunId ? path.join(this.runsDir, resolvedRunId, filename) : null;
+  }
+
   /**
    * Get projection report if available
+   * @param {string} [runId] - Projection run ID (default: latest run)
    * @returns {Promise<Object>} Projection report
    */
-  async getProjectionReport() {
+  async getProjectionReport(runId) {
     try {
-      const reportPath = path.join(this.projectionDir, 'simulation_report.json');
-      const reportData = await fs.readFile(reportPath, 'utf8');
-      const report = JSON.parse(reportData);
+      const resolvedRunId = await this.resolveRunId(runId);
+      if (!resolvedRunId) {
+        return {
+          success: false,
+          message: 'No projection report available. Run projection first.'
+        };
+      }
+      const report = await this.readRunReport(resolvedRunId);
 
       return {
         success: true,
+        runId: resolvedRunId,
         report
       };
     } catch (error) {
@@ -156,6 +322,64 @@ class ProjectionService {
     }
   }
 
+  /**
+   * Get XAI explanations for several candidate recommendations in one request
+   * @param {Array} recommendations - Candidate questions, best first (all_recommendations)
+   * @param {Object} student - Student data
+   * @param {Array} knowledgeVector - Knowledge state vector
+   * @param {number} [topK=10] - Number of candidates to explain
+   * @returns {Promise<Array>} One XAI explanation per candidate
+   */
+  async getXAIExplanations(recommendations, student, knowledgeVector, topK = 10) {
+    const candidates = recommendations.slice(0, topK);
+    try {
+      const response = await axios.post(
+        `${this.dktServiceURL}/explain_recommendations`,
+        {
+          student: {
+            student_id: student._id?.toString() || student.studentId,
+            anxiety_level: student.stressIndicators?.stressLevel / 100 || 0.5,
+            history: student.history || []
+          },
+          questions: candidates.map(rec => ({
+            question_id: rec.question_id,
+            topic_id: rec.topic_id,
+            topic_name: rec.topic_name,
+            difficulty: rec.difficulty ?? 1.0,
+            predicted_success_rate: rec.predicted_success_rate ?? 0.5
+          })),
+          knowledge_vector: knowledgeVector,
+          top_k: topK
+        },
+        {
+          timeout: 10000,
+          headers: { 'Content-Type': 'application/json' }
+        }
+      );
+
+      return response.data.explanations.map(explanation => ({
+        success: true,
+        question_id: explanation.question_id,
+        explanation: explanation.explanation,
+        xai_data: explanation.xai_data,
+        key_factors: explanation.key_factors,
+        confidence: explanation.confidence
+      }));
+    } catch (error) {
+      console.error('XAI batch explanation error:', error.message);
+      return candidates.map(rec => ({
+        success: false,
+        question_id: rec.question_id,
+        explanation: this.generateFallbackExplanation({
+          recommended_topic: rec.topic_name,
+          predicted_success_rate: rec.predicted_success_rate
+        }),
+        key_factors: ['Adaptive Learning Recommendation'],
+        confidence: rec.predicted_success_rate || 0.5
+      }));
+    }
+  }
+
   /**
    * Generate fallback explanation if XAI service unavailable
    */
@@ -177,9 +401,10 @@ This recommendation aligns with your learning goals and current progress. Contin
 
   /**
    * Check if projection visualizations are available
+   * @param {string} [runId] - Projection run ID (default: latest run)
    * @returns {Promise<Object>} Available visualizations
    */
-  async getVisualizations() {
+  async getVisualizations(runId) {
     try {
       const vizFiles = [
         'learning_curves.png',
@@ -187,12 +412,16 @@ This recommendation aligns with your learning goals and current progress. Contin
         'improvement_metrics.png'
       ];
 
+      const resolvedRunId = await this.resolveRunId(runId);
       const available = {};
       for (const file of vizFiles) {
-        const filePath = path.join(this.projectionDir, file);
+        available[file] = null;
+        if (!resolvedRunId) {
+          continue;
+        }
         try {
-          await fs.access(filePath);
-          available[file] = `/api/projections/visualization/${file}`;
+          await fs.access(path.join(this.runsDir, resolvedRunId, file));
+          available[file] = `/api/projections/visualization/${file}?runId=${resolvedRunId}`;
         } catch {
           available[file] = null;
         }
@@ -200,6 +429,7 @@ This recommendation aligns with your learning goals and current progress. Contin
 
       return {
         success: true,
+        runId: resolvedRunId,
         visualizations: available
       };
     } catch (error) {